@@ -0,0 +1,248 @@
+import atexit
+import cProfile
+import json
+import os
+import re
+import threading
+from functools import wraps
+from time import perf_counter_ns
+from types import FunctionType
+
+from app_info import APP_NAME, APP_VERSION
+from app_paths import get_app_data_path
+
+PROFILE_FLAG = "--profile"
+CPROFILE_FLAG = "--profile-cprofile"
+PROFILE_ENV = "CADERNETA_PROFILE"
+CPROFILE_ENV = "CADERNETA_PROFILE_CPROFILE"
+TRACE_PATH_ENV = "CADERNETA_PROFILE_PATH"
+DEFAULT_TRACE_FILE = "profile_trace.json"
+DEFAULT_CPROFILE_DIR = "profile_spans"
+# Limite de eventos guardados: uma sessão longa não pode crescer sem fim na memória.
+MAX_EVENTS = 200000
+
+SERVICE_MODULES = (
+    "services.backup_service",
+    "services.balance_service",
+    "services.client_service",
+    "services.dashboard_service",
+    "services.import_service",
+    "services.payment_service",
+    "services.report_pdf_service",
+    "services.sale_service",
+    "services.search_service",
+)
+
+_lock = threading.Lock()
+_local = threading.local()
+_events = []
+_thread_names = {}
+_settings = {
+    "enabled": False,
+    "trace_path": None,
+    "cprofile_dir": None,
+    "dropped": 0,
+    "span_count": 0,
+}
+_origin_ns = perf_counter_ns()
+
+
+class _NullSpan:
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+
+    def __init__(self, name, category):
+        self.name = name
+        self.category = category
+        self.profiler = None
+        self.started_ns = 0
+
+    def __enter__(self):
+        depth = getattr(_local, "depth", 0)
+        _local.depth = depth + 1
+        # O cProfile não aceita perfis aninhados: só o span mais externo de cada thread é perfilado.
+        if depth == 0 and _settings["cprofile_dir"] is not None:
+            self.profiler = cProfile.Profile()
+            try:
+                self.profiler.enable()
+            except ValueError:
+                self.profiler = None
+        self.started_ns = perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        ended_ns = perf_counter_ns()
+        _local.depth -= 1
+        if self.profiler is not None:
+            self.profiler.disable()
+        _record(self.name, self.category, self.started_ns, ended_ns, exc_type)
+        if self.profiler is not None:
+            _dump_cprofile(self.profiler, self.name)
+        return False
+
+
+def span(name, category="app"):
+    if not _settings["enabled"]:
+        return _NULL_SPAN
+    return _Span(name, category)
+
+
+def traced(name=None, category="app"):
+    def decorator(func):
+        span_name = name or f"{func.__module__}.{func.__qualname__}"
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name, category):
+                return func(*args, **kwargs)
+
+        wrapper.__profiled__ = True
+        return wrapper
+
+    return decorator
+
+
+def instrument_module(module, category):
+    # Troca as funções públicas do módulo por versões com span. Só vale para quem
+    # importar os nomes depois disto, por isso o perfil é ligado antes da interface.
+    wrapped = {}
+    for attr, value in list(vars(module).items()):
+        if attr.startswith("_") or not callable(value) or isinstance(value, type):
+            continue
+        if getattr(value, "__module__", None) != module.__name__ or getattr(value, "__profiled__", False):
+            continue
+        span_category = "export" if attr.startswith("export_") else category
+        wrapper = traced(f"{module.__name__.rsplit('.', 1)[-1]}.{attr}", span_category)(value)
+        setattr(module, attr, wrapper)
+        wrapped[value] = wrapper
+    return wrapped
+
+
+def instrument_services():
+    import importlib
+
+    modules = []
+    for module_name in SERVICE_MODULES:
+        try:
+            modules.append(importlib.import_module(module_name))
+        except ImportError:
+            continue
+
+    wrapped = {}
+    for module in modules:
+        wrapped.update(instrument_module(module, "service"))
+
+    # Um serviço que importou outro com "from ... import" ainda guarda a função
+    # original (a importação de CSV chama os create_*_bulk assim): troca também.
+    for module in modules:
+        for attr, value in list(vars(module).items()):
+            if isinstance(value, FunctionType) and value in wrapped:
+                setattr(module, attr, wrapped[value])
+
+
+def enable_profiling(trace_path=None, cprofile_dir=None):
+    _settings["trace_path"] = str(trace_path or os.getenv(TRACE_PATH_ENV) or get_app_data_path(DEFAULT_TRACE_FILE))
+    _settings["cprofile_dir"] = str(cprofile_dir) if cprofile_dir else None
+    if _settings["enabled"]:
+        return
+    _settings["enabled"] = True
+    atexit.register(_write_trace_on_exit)
+
+
+def is_profiling_enabled():
+    return _settings["enabled"]
+
+
+def configure_from_environment(argv=()):
+    # Ligado por CADERNETA_PROFILE=1 ou por --profile; o cProfile por span é opcional.
+    argv = list(argv)
+    wants_cprofile = CPROFILE_FLAG in argv or bool(os.getenv(CPROFILE_ENV))
+    if not (PROFILE_FLAG in argv or wants_cprofile or os.getenv(PROFILE_ENV)):
+        return False
+
+    cprofile_dir = get_app_data_path(DEFAULT_CPROFILE_DIR) if wants_cprofile else None
+    enable_profiling(cprofile_dir=cprofile_dir)
+    instrument_services()
+    return True
+
+
+def get_trace():
+    with _lock:
+        events = list(_events)
+        thread_names = dict(_thread_names)
+        dropped = _settings["dropped"]
+
+    metadata = [
+        {"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": tid, "args": {"name": thread_name}}
+        for tid, thread_name in thread_names.items()
+    ]
+    return {
+        "traceEvents": metadata + events,
+        "displayTimeUnit": "ms",
+        "otherData": {"app": APP_NAME, "version": APP_VERSION, "dropped_events": dropped},
+    }
+
+
+def write_trace(path=None):
+    path = path or _settings["trace_path"] or get_app_data_path(DEFAULT_TRACE_FILE)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(get_trace(), f, ensure_ascii=False)
+    return str(path)
+
+
+def reset_trace():
+    with _lock:
+        _events.clear()
+        _settings["dropped"] = 0
+
+
+def _record(name, category, started_ns, ended_ns, exc_type):
+    thread = threading.current_thread()
+    event = {
+        "name": name,
+        "cat": category,
+        "ph": "X",
+        "ts": (started_ns - _origin_ns) / 1000,
+        "dur": (ended_ns - started_ns) / 1000,
+        "pid": os.getpid(),
+        "tid": thread.ident,
+    }
+    if exc_type is not None:
+        event["args"] = {"error": exc_type.__name__}
+
+    with _lock:
+        _thread_names.setdefault(thread.ident, thread.name)
+        if len(_events) >= MAX_EVENTS:
+            _settings["dropped"] += 1
+            return
+        _events.append(event)
+
+
+def _dump_cprofile(profiler, name):
+    with _lock:
+        _settings["span_count"] += 1
+        sequence = _settings["span_count"]
+
+    safe_name = re.sub(r"[^A-Za-z0-9_.-]+", "_", name)
+    try:
+        os.makedirs(_settings["cprofile_dir"], exist_ok=True)
+        profiler.dump_stats(os.path.join(_settings["cprofile_dir"], f"{sequence:05d}_{safe_name}.prof"))
+    except OSError:
+        pass
+
+
+def _write_trace_on_exit():
+    try:
+        write_trace()
+    except Exception:
+        pass
@@ -0,0 +1,184 @@
+import argparse
+import math
+import os
+import random
+import tempfile
+from datetime import datetime, timedelta, timezone
+from itertools import accumulate
+from pathlib import Path
+from time import perf_counter
+
+from database.connection import get_db_path, reset_connections
+from database.writer import run_write, stop_writer
+from models.init_db import init_db
+from services.balance_service import rebuild_client_balances
+from services.client_service import create_clients_bulk
+from services.money import Money
+from services.payment_service import create_payments_bulk
+from services.sale_service import create_sales_bulk
+
+DEFAULT_SEED = 20240601
+DEFAULT_CLIENTS = 1000
+DEFAULT_SALES = 50000
+DEFAULT_PAYMENTS = 20000
+DEFAULT_DAYS = 730
+BATCH_SIZE = 10000
+DEFAULT_DATA_DIR = Path(tempfile.gettempdir()) / "caderneta_bench"
+
+FIRST_NAMES = (
+    "Ana", "Maria", "Francisca", "Antônia", "Adriana", "Juliana", "Márcia", "Fernanda", "Patrícia", "Aline",
+    "Sandra", "Camila", "Luciana", "Josefa", "Raimunda", "Beatriz", "Letícia", "Gabriela", "Débora", "Conceição",
+    "José", "João", "Antônio", "Francisco", "Carlos", "Paulo", "Pedro", "Lucas", "Luiz", "Marcos",
+    "Luís", "Gabriel", "Rafael", "Daniel", "Marcelo", "Bruno", "Eduardo", "Felipe", "Raimundo", "Rodrigo",
+)
+SURNAMES = (
+    "Silva", "Santos", "Oliveira", "Souza", "Rodrigues", "Ferreira", "Alves", "Pereira", "Lima", "Gomes",
+    "Costa", "Ribeiro", "Martins", "Carvalho", "Almeida", "Lopes", "Soares", "Fernandes", "Vieira", "Barbosa",
+    "Rocha", "Dias", "Nascimento", "Andrade", "Moreira", "Nunes", "Marques", "Machado", "Mendes", "Freitas",
+    "Cardoso", "Ramos", "Gonçalves", "Santana", "Teixeira", "Araújo", "Conceição", "Magalhães", "Brandão", "Pinto",
+)
+PRODUCTS = (
+    "Arroz 5kg", "Feijão carioca 1kg", "Açúcar cristal 2kg", "Café 500g", "Óleo de soja", "Leite integral",
+    "Pão francês", "Farinha de mandioca", "Macarrão", "Sabão em pó", "Detergente", "Papel higiênico",
+    "Carne moída", "Frango congelado", "Ovos (dúzia)", "Queijo muçarela", "Refrigerante 2L", "Cerveja lata",
+    "Gás de cozinha", "Biscoito recheado", "Manteiga", "Sardinha em lata", "Fubá", "Tomate", "Cebola",
+)
+DDDS = ("11", "21", "31", "41", "51", "61", "71", "81", "85", "91", "62", "27", "48", "83", "98")
+
+
+def use_data_dir(data_dir):
+    # O caminho do banco vem de LOCALAPPDATA; trocar a variável aponta o app para o banco sintético.
+    stop_writer()
+    os.environ["LOCALAPPDATA"] = str(Path(data_dir).resolve())
+    reset_connections()
+    return get_db_path()
+
+
+def generate_cpf(rng):
+    digits = [rng.randint(0, 9) for _ in range(9)]
+    for length in (9, 10):
+        total = sum(digit * weight for digit, weight in zip(digits, range(length + 1, 1, -1)))
+        check = total * 10 % 11
+        digits.append(check if check < 10 else 0)
+    return "".join(str(digit) for digit in digits)
+
+
+def generate_phone(rng):
+    return f"{rng.choice(DDDS)}9{rng.randint(0, 99999999):08d}"
+
+
+def generate_name(rng):
+    # Cerca de metade dos nomes leva dois sobrenomes, como nos cadastros reais.
+    surnames = rng.sample(SURNAMES, 2 if rng.random() < 0.5 else 1)
+    return " ".join((rng.choice(FIRST_NAMES), *surnames))
+
+
+def today_utc():
+    return datetime.now(timezone.utc).replace(tzinfo=None, hour=0, minute=0, second=0, microsecond=0)
+
+
+def random_timestamp(rng, today, days):
+    # Triangular com moda em 0: mais movimento nos dias recentes, cauda até `days` atrás.
+    day = today - timedelta(days=int(rng.triangular(0, days, 0)))
+    moment = day.replace(hour=rng.randint(7, 20), minute=rng.randint(0, 59), second=rng.randint(0, 59))
+    return moment.strftime("%Y-%m-%d %H:%M:%S")
+
+
+def amount_cents(rng, median_cents, sigma=0.8):
+    return max(100, int(rng.lognormvariate(math.log(median_cents), sigma)))
+
+
+def generate_dataset(
+    data_dir=DEFAULT_DATA_DIR,
+    clients=DEFAULT_CLIENTS,
+    sales=DEFAULT_SALES,
+    payments=DEFAULT_PAYMENTS,
+    days=DEFAULT_DAYS,
+    seed=DEFAULT_SEED,
+):
+    started = perf_counter()
+    db_path = use_data_dir(data_dir)
+    for suffix in ("", "-wal", "-shm"):
+        Path(f"{db_path}{suffix}").unlink(missing_ok=True)
+
+    init_db()
+    rng = random.Random(seed)
+    # As datas são relativas ao dia da geração para que "Hoje", o mês e a tendência
+    # do resumo tenham movimento; o conteúdo gerado depende só da semente.
+    today = today_utc()
+
+    client_ids = []
+    for start in range(0, clients, BATCH_SIZE):
+        batch = [
+            (generate_name(rng), generate_cpf(rng), generate_phone(rng), Money(rng.choice((0, 20000, 50000, 100000))))
+            for _ in range(min(BATCH_SIZE, clients - start))
+        ]
+        client_ids.extend(create_clients_bulk(batch))
+    created_at = [(random_timestamp(rng, today, days), client_id) for client_id in client_ids]
+
+    # Poucos clientes concentram a maior parte das compras (pesos de Pareto).
+    cum_weights = list(accumulate(rng.paretovariate(1.2) for _ in client_ids))
+
+    for start in range(0, sales, BATCH_SIZE):
+        count = min(BATCH_SIZE, sales - start)
+        buyers = rng.choices(client_ids, cum_weights=cum_weights, k=count)
+        create_sales_bulk([
+            (client_id, rng.choice(PRODUCTS), Money(amount_cents(rng, 3500)), random_timestamp(rng, today, days))
+            for client_id in buyers
+        ])
+
+    for start in range(0, payments, BATCH_SIZE):
+        count = min(BATCH_SIZE, payments - start)
+        payers = rng.choices(client_ids, cum_weights=cum_weights, k=count)
+        create_payments_bulk([
+            (client_id, Money(amount_cents(rng, 6000)), random_timestamp(rng, today, days))
+            for client_id in payers
+        ])
+
+    if created_at:
+        _set_created_at(created_at)
+    # Os resumos por período contam clientes por created_at; recalcula tudo a partir do histórico.
+    rebuild_client_balances()
+
+    return {
+        "db_path": str(db_path),
+        "seed": seed,
+        "clients": clients,
+        "sales": sales,
+        "payments": payments,
+        "days": days,
+        "elapsed_s": round(perf_counter() - started, 3),
+    }
+
+
+def _set_created_at(rows):
+    def command(cursor):
+        cursor.executemany("UPDATE clients SET created_at = ? WHERE id = ?", rows)
+
+    run_write(command)
+
+
+def add_dataset_arguments(parser):
+    parser.add_argument("--data-dir", default=str(DEFAULT_DATA_DIR), help="pasta usada como LOCALAPPDATA do banco sintético")
+    parser.add_argument("--clients", type=int, default=DEFAULT_CLIENTS, help="quantidade de clientes")
+    parser.add_argument("--sales", type=int, default=DEFAULT_SALES, help="quantidade de vendas")
+    parser.add_argument("--payments", type=int, default=DEFAULT_PAYMENTS, help="quantidade de pagamentos")
+    parser.add_argument("--days", type=int, default=DEFAULT_DAYS, help="janela de datas, em dias até hoje")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="semente do gerador aleatório")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gera um caderneta.db sintético e reproduzível para benchmarks.")
+    add_dataset_arguments(parser)
+    args = parser.parse_args(argv)
+
+    info = generate_dataset(args.data_dir, args.clients, args.sales, args.payments, args.days, args.seed)
+    print(
+        f"Banco gerado em {info['db_path']}: {info['clients']} clientes, {info['sales']} vendas, "
+        f"{info['payments']} pagamentos (semente {info['seed']}) em {info['elapsed_s']}s."
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
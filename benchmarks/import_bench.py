@@ -0,0 +1,183 @@
+import argparse
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+
+from app_paths import get_project_root
+from benchmarks.service_bench import git_revision
+
+DEFAULT_TARGET = "main"
+DEFAULT_RUNS = 5
+DEFAULT_TOP = 15
+# Variação acima disso (mais lento) é marcada como regressão na comparação.
+DEFAULT_REGRESSION_THRESHOLD = 0.2
+# Módulos que não podem ser carregados na abertura: só na primeira tela, exportação
+# ou consulta de licença que precisar deles.
+DEFERRED_MODULES = (
+    "reportlab",
+    "requests",
+    "certifi",
+    "urllib3",
+    "ui.clients_view",
+    "ui.sales_view",
+    "ui.payments_view",
+    "ui.reports_view",
+    "ui.backup_view",
+)
+
+_LINE_PATTERN = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)\s*$")
+
+
+def parse_importtime(output):
+    modules = []
+    for line in output.splitlines():
+        match = _LINE_PATTERN.match(line)
+        if match is None:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        modules.append({
+            "name": name,
+            "depth": len(indent) // 2,
+            "self_us": int(self_us),
+            "cumulative_us": int(cumulative_us),
+        })
+    return modules
+
+
+def run_importtime(code):
+    # Sem as variáveis do modo de perfil: ele importa todos os serviços de uma vez.
+    env = {key: value for key, value in os.environ.items() if not key.startswith("CADERNETA_PROFILE")}
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=get_project_root(),
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    modules = parse_importtime(completed.stderr)
+    if completed.returncode != 0:
+        error = completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else "falha sem saída"
+        raise RuntimeError(f"{code} falhou: {error}")
+    return modules
+
+
+def summarize_run(modules, target, preloaded=frozenset()):
+    total_us = next((module["cumulative_us"] for module in modules if module["name"] == target), None)
+    if total_us is None:
+        total_us = sum(module["self_us"] for module in modules)
+
+    # O que o próprio interpretador já carrega (site, .pth) não conta como abertura do app.
+    loaded = {module["name"] for module in modules} - preloaded
+    packages = defaultdict(int)
+    for module in modules:
+        if module["name"] in loaded:
+            packages[module["name"].split(".")[0]] += module["self_us"]
+    eager = [
+        name for name in DEFERRED_MODULES
+        if any(module == name or module.startswith(f"{name}.") for module in loaded)
+    ]
+    return {"total_us": total_us, "packages": dict(packages), "module_count": len(loaded), "eager": eager}
+
+
+def measure_startup(target=DEFAULT_TARGET, runs=DEFAULT_RUNS, top=DEFAULT_TOP):
+    preloaded = frozenset(module["name"] for module in run_importtime("pass"))
+    # Cada execução é um processo novo; o mínimo por pacote é a medida menos ruidosa.
+    summaries = [summarize_run(run_importtime(f"import {target}"), target, preloaded) for _ in range(runs)]
+
+    packages = {}
+    for summary in summaries:
+        for name, self_us in summary["packages"].items():
+            packages[name] = min(packages.get(name, self_us), self_us)
+    heaviest = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+    totals_ms = sorted(summary["total_us"] / 1000 for summary in summaries)
+
+    return {
+        "meta": {
+            "generated_at": datetime.now().isoformat(timespec="seconds"),
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "target": target,
+            "runs": runs,
+        },
+        "total_ms": {
+            "min": round(totals_ms[0], 3),
+            "median": round(totals_ms[len(totals_ms) // 2], 3),
+            "max": round(totals_ms[-1], 3),
+        },
+        "module_count": summaries[0]["module_count"],
+        "packages_ms": {name: round(self_us / 1000, 3) for name, self_us in heaviest},
+        "eager_deferred_modules": summaries[0]["eager"],
+    }
+
+
+def compare_reports(baseline, current, threshold=DEFAULT_REGRESSION_THRESHOLD):
+    base_ms = baseline.get("total_ms", {}).get("min")
+    current_ms = current["total_ms"]["min"]
+    if not base_ms:
+        return None
+    ratio = current_ms / base_ms
+    return {
+        "baseline_ms": base_ms,
+        "current_ms": current_ms,
+        "ratio": round(ratio, 3),
+        "regression": ratio > 1 + threshold,
+    }
+
+
+def print_report(report, comparison=None):
+    total = report["total_ms"]
+    print(f"import {report['meta']['target']}: mín={total['min']:.3f} ms  mediana={total['median']:.3f} ms  módulos={report['module_count']}")
+    for name, self_ms in report["packages_ms"].items():
+        print(f"  {name:<28} {self_ms:>10.3f} ms")
+    for name in report["eager_deferred_modules"]:
+        print(f"  carregado na abertura: {name}")
+    if comparison:
+        flag = "  REGRESSÃO" if comparison["regression"] else ""
+        print(f"  comparação: {comparison['baseline_ms']:.3f} -> {comparison['current_ms']:.3f} ms (x{comparison['ratio']}){flag}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mede o tempo de importação na abertura do app (python -X importtime).")
+    parser.add_argument("--target", default=DEFAULT_TARGET, help="módulo importado (padrão: main)")
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS, help="processos medidos")
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP, help="pacotes mais pesados listados")
+    parser.add_argument("--output", help="arquivo JSON de saída (padrão: saída padrão)")
+    parser.add_argument("--compare", help="JSON de uma execução anterior para comparar o tempo total")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_REGRESSION_THRESHOLD, help="tolerância antes de marcar regressão (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    try:
+        report = measure_startup(args.target, max(args.runs, 1), args.top)
+    except RuntimeError as exc:
+        print(exc, file=sys.stderr)
+        return 2
+
+    comparison = None
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        comparison = compare_reports(baseline, report, args.threshold)
+        report["comparison"] = comparison
+
+    payload = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        Path(args.output).write_text(payload, encoding="utf-8")
+        print_report(report, comparison)
+    else:
+        print(payload)
+
+    if report["eager_deferred_modules"]:
+        return 1
+    if comparison and comparison["regression"]:
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
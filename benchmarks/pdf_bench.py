@@ -0,0 +1,184 @@
+import argparse
+import json
+import math
+import random
+import sys
+import tracemalloc
+from pathlib import Path
+from time import perf_counter
+
+from benchmarks.dataset import DEFAULT_DATA_DIR, DEFAULT_SEED, amount_cents, generate_dataset, random_timestamp, today_utc
+from benchmarks.service_bench import git_revision
+from database.writer import stop_writer
+from services.client_service import create_client
+from services.money import Money
+from services.payment_service import create_payments_bulk
+from services.sale_service import create_sales_bulk
+
+DEFAULT_SIZES = (1000, 5000, 20000)
+DEFAULT_REPEAT = 3
+# Expoente de crescimento aceito entre dois tamanhos (1.0 = linear). Acima disso
+# o crescimento é tratado como superlinear e o benchmark falha.
+MAX_GROWTH_EXPONENT = 1.3
+# Abaixo disso o ruído domina a medição e a razão entre tamanhos não diz nada.
+MIN_GROWTH_TIME_MS = 50
+MIN_GROWTH_ALLOC_BYTES = 1024 * 1024
+STATEMENT_DAYS = 730
+
+# (nome, escala com o tamanho?) — a posição financeira tem tamanho fixo.
+EXPORTERS = (
+    ("export_financial_position_pdf", False),
+    ("export_balances_pdf", True),
+    ("export_client_statement_pdf", True),
+)
+
+
+def build_dataset(data_dir, size, seed):
+    # `size` é o número de movimentações: do banco inteiro e do cliente do extrato.
+    info = generate_dataset(
+        data_dir,
+        clients=max(10, size // 10),
+        sales=size * 2 // 3,
+        payments=size - size * 2 // 3,
+        seed=seed,
+    )
+
+    rng = random.Random(seed + size)
+    today = today_utc()
+    client_id = create_client("Cliente Extrato Benchmark", "00000000000", "11999999999", "0")
+    create_sales_bulk([
+        (client_id, "Venda benchmark", Money(amount_cents(rng, 3500)), random_timestamp(rng, today, STATEMENT_DAYS))
+        for _ in range(size * 2 // 3)
+    ])
+    create_payments_bulk([
+        (client_id, Money(amount_cents(rng, 6000)), random_timestamp(rng, today, STATEMENT_DAYS))
+        for _ in range(size - size * 2 // 3)
+    ])
+    info["statement_client_id"] = client_id
+    return info
+
+
+def exporter_args(name, info):
+    if name == "export_client_statement_pdf":
+        return (info["statement_client_id"], "Cliente Extrato Benchmark")
+    return ()
+
+
+def measure_exporter(export, args, repeat):
+    # Tempo e memória em execuções separadas: o tracemalloc deixa o código bem mais lento.
+    times_ms = []
+    output_bytes = None
+    for _ in range(repeat):
+        started = perf_counter()
+        path = Path(export(*args))
+        times_ms.append((perf_counter() - started) * 1000)
+        output_bytes = path.stat().st_size
+        path.unlink(missing_ok=True)
+
+    tracemalloc.start()
+    try:
+        path = Path(export(*args))
+        _current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    path.unlink(missing_ok=True)
+
+    return {
+        "min_ms": round(min(times_ms), 3),
+        "max_ms": round(max(times_ms), 3),
+        "peak_alloc_bytes": peak,
+        "output_bytes": output_bytes,
+    }
+
+
+def growth_exponent(size_a, value_a, size_b, value_b):
+    if not value_a or not value_b or size_a == size_b:
+        return None
+    return math.log(value_b / value_a) / math.log(size_b / size_a)
+
+
+def check_growth(results, max_exponent=MAX_GROWTH_EXPONENT):
+    failures = []
+    for name, scales in EXPORTERS:
+        if not scales:
+            continue
+        points = [(size, result[name]) for size, result in results if "min_ms" in result.get(name, {})]
+        for (size_a, stats_a), (size_b, stats_b) in zip(points, points[1:]):
+            checks = (
+                ("time", stats_a["min_ms"], stats_b["min_ms"], MIN_GROWTH_TIME_MS),
+                ("memory", stats_a["peak_alloc_bytes"], stats_b["peak_alloc_bytes"], MIN_GROWTH_ALLOC_BYTES),
+            )
+            for metric, value_a, value_b, floor in checks:
+                if value_a < floor:
+                    continue
+                exponent = growth_exponent(size_a, value_a, size_b, value_b)
+                if exponent is not None and exponent > max_exponent:
+                    failures.append({
+                        "exporter": name,
+                        "metric": metric,
+                        "sizes": [size_a, size_b],
+                        "exponent": round(exponent, 3),
+                    })
+    return failures
+
+
+def run_pdf_benchmarks(data_dir, sizes=DEFAULT_SIZES, repeat=DEFAULT_REPEAT, seed=DEFAULT_SEED):
+    # Sem o reportlab instalado o benchmark é marcado como ignorado.
+    try:
+        import reportlab
+        from services import report_pdf_service
+    except ImportError as exc:
+        return {"skipped": f"{type(exc).__name__}: {exc}"}
+
+    results = []
+    for size in sizes:
+        info = build_dataset(Path(data_dir) / f"pdf_{size}", size, seed)
+        size_results = {"dataset": info}
+        for name, _scales in EXPORTERS:
+            export = getattr(report_pdf_service, name)
+            size_results[name] = measure_exporter(export, exporter_args(name, info), repeat)
+        results.append((size, size_results))
+    stop_writer()
+
+    return {
+        "revision": git_revision(),
+        "sizes": list(sizes),
+        "repeat": repeat,
+        "max_growth_exponent": MAX_GROWTH_EXPONENT,
+        "results": {str(size): size_results for size, size_results in results},
+        "superlinear": check_growth(results),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mede os relatórios PDF em bancos sintéticos de vários tamanhos.")
+    parser.add_argument("--data-dir", default=str(DEFAULT_DATA_DIR), help="pasta base dos bancos sintéticos")
+    parser.add_argument("--sizes", default=",".join(str(size) for size in DEFAULT_SIZES), help="movimentações por cenário, separadas por vírgula")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="execuções cronometradas por relatório")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="semente do gerador aleatório")
+    parser.add_argument("--output", help="arquivo JSON de saída (padrão: saída padrão)")
+    args = parser.parse_args(argv)
+
+    sizes = sorted(int(size) for size in args.sizes.split(",") if size.strip())
+    report = run_pdf_benchmarks(args.data_dir, sizes, args.repeat, args.seed)
+
+    payload = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        Path(args.output).write_text(payload, encoding="utf-8")
+    else:
+        print(payload)
+
+    if "skipped" in report:
+        print(f"Benchmark de PDF ignorado: {report['skipped']}", file=sys.stderr)
+        return 2
+    for failure in report["superlinear"]:
+        print(
+            f"Crescimento superlinear: {failure['exporter']} ({failure['metric']}) "
+            f"{failure['sizes'][0]} -> {failure['sizes'][1]}: expoente {failure['exponent']}",
+            file=sys.stderr,
+        )
+    return 1 if report["superlinear"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,250 @@
+import argparse
+import importlib
+import json
+import math
+import platform
+import sqlite3
+import subprocess
+import sys
+from datetime import datetime
+from pathlib import Path
+from statistics import mean, median
+from time import perf_counter
+
+from app_paths import get_project_root
+from benchmarks.dataset import add_dataset_arguments, generate_dataset, use_data_dir
+from database.connection import get_connection
+from database.instrumentation import enable_instrumentation, get_query_stats, reset_query_stats
+from database.writer import stop_writer
+from models.init_db import init_db
+
+DEFAULT_REPEAT = 5
+DEFAULT_WRITES = 500
+# Variação acima disso (mais lento) é marcada como regressão na comparação.
+DEFAULT_REGRESSION_THRESHOLD = 0.2
+
+# (nome, módulo, função, argumentos). Funções ausentes na versão medida viram "skipped",
+# o que permite rodar a mesma suíte em versões antigas para comparar.
+READ_BENCHMARKS = (
+    ("get_all_clients", "services.client_service", "get_all_clients", ()),
+    ("get_all_sales", "services.sale_service", "get_all_sales", ()),
+    ("get_all_payments", "services.payment_service", "get_all_payments", ()),
+    ("get_dashboard_data", "services.dashboard_service", "get_dashboard_data", ()),
+    ("get_client_balances", "services.balance_service", "get_client_balances", ()),
+    ("_get_balances_data", "services.report_pdf_service", "_get_balances_data", ()),
+    ("_get_client_statement_data", "services.report_pdf_service", "_get_client_statement_data", ("{top_client}",)),
+)
+WRITE_BENCHMARKS = (
+    ("create_client", "services.client_service", "create_client", ("Cliente Benchmark", "00000000000", "11999999999", "100")),
+    ("create_sale", "services.sale_service", "create_sale", ("{top_client}", "Venda benchmark", "12.34")),
+    ("create_payment", "services.payment_service", "create_payment", ("{top_client}", "5.67")),
+)
+
+
+def resolve(module_name, func_name):
+    try:
+        return getattr(importlib.import_module(module_name), func_name), None
+    except (ImportError, AttributeError) as exc:
+        return None, f"{type(exc).__name__}: {exc}"
+
+
+def bind_args(args, context):
+    return tuple(context[arg[1:-1]] if isinstance(arg, str) and arg.startswith("{") else arg for arg in args)
+
+
+def summarize(samples_ms):
+    ordered = sorted(samples_ms)
+    p95_index = max(0, math.ceil(len(ordered) * 0.95) - 1)
+    return {
+        "runs": len(ordered),
+        "min_ms": round(ordered[0], 3),
+        "median_ms": round(median(ordered), 3),
+        "mean_ms": round(mean(ordered), 3),
+        "p95_ms": round(ordered[p95_index], 3),
+        "max_ms": round(ordered[-1], 3),
+    }
+
+
+def time_calls(func, args, runs, warmup=1):
+    for _ in range(warmup):
+        func(*args)
+
+    samples = []
+    result = None
+    for _ in range(runs):
+        started = perf_counter()
+        result = func(*args)
+        samples.append((perf_counter() - started) * 1000)
+
+    stats = summarize(samples)
+    if isinstance(result, (list, tuple)):
+        stats["rows"] = len(result)
+    return stats
+
+
+def run_benchmarks(benchmarks, context, runs, warmup, throughput=False):
+    results = {}
+    for name, module_name, func_name, args in benchmarks:
+        func, error = resolve(module_name, func_name)
+        if func is None:
+            results[name] = {"skipped": error}
+            continue
+        try:
+            stats = time_calls(func, bind_args(args, context), runs, warmup)
+        except Exception as exc:
+            results[name] = {"error": f"{type(exc).__name__}: {exc}"}
+            continue
+        if throughput and stats["mean_ms"]:
+            stats["ops_per_s"] = round(1000 / stats["mean_ms"], 1)
+        results[name] = stats
+    return results
+
+
+def top_client_id():
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute(
+        """
+        SELECT client_id FROM sales
+        GROUP BY client_id
+        ORDER BY COUNT(*) DESC, client_id ASC
+        LIMIT 1
+        """
+    )
+    row = cursor.fetchone()
+    conn.close()
+    return row["client_id"] if row is not None else None
+
+
+def dataset_counts():
+    conn = get_connection()
+    cursor = conn.cursor()
+    counts = {}
+    for table in ("clients", "sales", "payments"):
+        cursor.execute(f"SELECT COUNT(*) AS total FROM {table}")
+        counts[table] = cursor.fetchone()["total"]
+    conn.close()
+    return counts
+
+
+def git_revision():
+    try:
+        completed = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=get_project_root(),
+            capture_output=True,
+            text=True,
+            timeout=5,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return completed.stdout.strip() or None
+
+
+def run_suite(data_dir, repeat=DEFAULT_REPEAT, writes=DEFAULT_WRITES, query_stats=False):
+    db_path = use_data_dir(data_dir)
+    init_db()
+    context = {"top_client": top_client_id()}
+
+    if query_stats:
+        enable_instrumentation()
+        reset_query_stats()
+
+    # Leituras primeiro: as escritas alteram o banco e as contagens.
+    report = {
+        "meta": {
+            "generated_at": datetime.now().isoformat(timespec="seconds"),
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "db_path": str(db_path),
+            "dataset": dataset_counts(),
+            "repeat": repeat,
+            "writes": writes,
+        },
+        "reads": run_benchmarks(READ_BENCHMARKS, context, repeat, warmup=1),
+        "writes": run_benchmarks(WRITE_BENCHMARKS, context, writes, warmup=0, throughput=True),
+    }
+    if query_stats:
+        report["queries"] = get_query_stats()
+    stop_writer()
+    return report
+
+
+def compare_reports(baseline, current, threshold=DEFAULT_REGRESSION_THRESHOLD):
+    rows = []
+    for section in ("reads", "writes"):
+        for name, stats in current.get(section, {}).items():
+            base_stats = baseline.get(section, {}).get(name, {})
+            if "median_ms" not in stats or "median_ms" not in base_stats or not base_stats["median_ms"]:
+                continue
+            ratio = stats["median_ms"] / base_stats["median_ms"]
+            rows.append({
+                "name": name,
+                "baseline_ms": base_stats["median_ms"],
+                "current_ms": stats["median_ms"],
+                "ratio": round(ratio, 3),
+                "regression": ratio > 1 + threshold,
+            })
+    return rows
+
+
+def print_report(report, comparison=None, file=None):
+    # Por padrão no stderr: sem --output, o stdout fica só com o JSON.
+    file = file or sys.stderr
+    for section in ("reads", "writes"):
+        print(f"[{section}]", file=file)
+        for name, stats in report[section].items():
+            if "median_ms" in stats:
+                extra = f" rows={stats['rows']}" if "rows" in stats else ""
+                print(f"  {name:<28} mediana={stats['median_ms']:>10.3f} ms  p95={stats['p95_ms']:>10.3f} ms{extra}", file=file)
+            else:
+                print(f"  {name:<28} {stats.get('skipped') or stats.get('error')}", file=file)
+
+    if comparison:
+        print("[comparação]", file=file)
+    for row in comparison or ():
+        flag = "  REGRESSÃO" if row["regression"] else ""
+        print(f"  {row['name']:<28} {row['baseline_ms']:>10.3f} -> {row['current_ms']:>10.3f} ms (x{row['ratio']}){flag}", file=file)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mede os serviços em um banco sintético e grava os tempos em JSON.")
+    add_dataset_arguments(parser)
+    parser.add_argument("--generate", action="store_true", help="gera (ou recria) o banco sintético antes de medir")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="execuções por leitura")
+    parser.add_argument("--writes", type=int, default=DEFAULT_WRITES, help="chamadas por benchmark de escrita")
+    parser.add_argument("--query-stats", action="store_true", help="inclui no JSON as estatísticas por consulta SQL")
+    parser.add_argument("--output", help="arquivo JSON de saída (padrão: saída padrão)")
+    parser.add_argument("--compare", help="JSON de uma execução anterior para comparar as medianas")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_REGRESSION_THRESHOLD, help="tolerância antes de marcar regressão (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    db_path = use_data_dir(args.data_dir)
+    if args.generate or not db_path.exists():
+        info = generate_dataset(args.data_dir, args.clients, args.sales, args.payments, args.days, args.seed)
+        print(f"Banco sintético gerado em {info['elapsed_s']}s.", file=sys.stderr)
+
+    report = run_suite(args.data_dir, args.repeat, args.writes, args.query_stats)
+
+    comparison = None
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        comparison = compare_reports(baseline, report, args.threshold)
+        report["comparison"] = comparison
+
+    payload = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        Path(args.output).write_text(payload, encoding="utf-8")
+    else:
+        print(payload)
+    print_report(report, comparison)
+
+    if comparison and any(row["regression"] for row in comparison):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
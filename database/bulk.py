@@ -0,0 +1,154 @@
+import re
+from collections.abc import Mapping
+from datetime import date, datetime
+
+from database.connection import get_connection
+from database.writer import run_write
+
+DEFAULT_CHUNK_SIZE = 1000
+ISO_TIMESTAMP_PATTERN = re.compile(r"(\d{4})-(\d{1,2})-(\d{1,2})(?:[ T](\d{1,2}):(\d{2})(?::(\d{2}))?)?")
+BR_TIMESTAMP_PATTERN = re.compile(r"(\d{1,2})/(\d{1,2})/(\d{4})(?: (\d{1,2}):(\d{2})(?::(\d{2}))?)?")
+
+
+class BulkValidationError(ValueError):
+
+    def __init__(self, errors):
+        self.errors = errors
+        preview = "; ".join(f"linha {index + 1}: {message}" for index, message in errors[:5])
+        if len(errors) > 5:
+            preview += f"; ... (+{len(errors) - 5})"
+        super().__init__(f"{len(errors)} registro(s) inválido(s): {preview}")
+
+
+def row_values(row, fields, required_count):
+    if isinstance(row, Mapping):
+        return tuple(row.get(field) for field in fields)
+
+    values = tuple(row)
+    if not required_count <= len(values) <= len(fields):
+        raise ValueError(f"esperado de {required_count} a {len(fields)} campos, recebido {len(values)}")
+    return values + (None,) * (len(fields) - len(values))
+
+
+def normalize_timestamp(value):
+    if value is None or value == "":
+        return None
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    if isinstance(value, date):
+        return value.strftime("%Y-%m-%d 00:00:00")
+
+    raw_value = str(value).strip()
+    match = ISO_TIMESTAMP_PATTERN.fullmatch(raw_value)
+    if match:
+        year, month, day, hour, minute, second = match.groups()
+    else:
+        match = BR_TIMESTAMP_PATTERN.fullmatch(raw_value)
+        if not match:
+            raise ValueError(f"data inválida: {value!r}")
+        day, month, year, hour, minute, second = match.groups()
+
+    # Expressões regulares + datetime() são bem mais rápidas que strptime em lotes grandes.
+    try:
+        parsed = datetime(int(year), int(month), int(day), int(hour or 0), int(minute or 0), int(second or 0))
+    except ValueError:
+        raise ValueError(f"data inválida: {value!r}") from None
+    return f"{parsed.year:04d}-{parsed.month:02d}-{parsed.day:02d} {parsed.hour:02d}:{parsed.minute:02d}:{parsed.second:02d}"
+
+
+def validate_rows(rows, validate_row, client_index=None):
+    validated = []
+    errors = []
+    for index, row in enumerate(rows):
+        try:
+            validated.append((index, validate_row(row)))
+        except (TypeError, ValueError) as exc:
+            errors.append((index, str(exc)))
+
+    # Clientes inexistentes entram no mesmo relatório dos erros de formato, para
+    # que um lote com os dois problemas mostre tudo de uma vez.
+    if client_index is not None and validated:
+        conn = get_connection()
+        missing = set(find_missing_client_ids(conn.cursor(), (row[client_index] for _index, row in validated)))
+        conn.close()
+        errors.extend(
+            (index, f"cliente #{row[client_index]} não encontrado")
+            for index, row in validated
+            if row[client_index] in missing
+        )
+
+    if errors:
+        raise BulkValidationError(sorted(errors))
+    return [row for _index, row in validated]
+
+
+def parse_client_id(value):
+    try:
+        client_id = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"cliente inválido: {value!r}") from None
+    if client_id <= 0:
+        raise ValueError(f"cliente inválido: {value!r}")
+    return client_id
+
+
+def require_existing_clients(rows, client_index=0):
+    # Repete a verificação dentro da transação de escrita: um cliente pode ter sido
+    # excluído entre a validação do lote e a gravação.
+    def check(cursor):
+        missing = set(find_missing_client_ids(cursor, (row[client_index] for row in rows)))
+        if missing:
+            raise BulkValidationError(
+                [
+                    (index, f"cliente #{row[client_index]} não encontrado")
+                    for index, row in enumerate(rows)
+                    if row[client_index] in missing
+                ]
+            )
+
+    return check
+
+
+def find_missing_client_ids(cursor, client_ids, chunk_size=500):
+    pending = sorted(set(client_ids))
+    found = set()
+    for offset in range(0, len(pending), chunk_size):
+        chunk = pending[offset:offset + chunk_size]
+        placeholders = ", ".join("?" for _ in chunk)
+        cursor.execute(f"SELECT id FROM clients WHERE id IN ({placeholders})", chunk)
+        found.update(row["id"] for row in cursor.fetchall())
+    return [client_id for client_id in pending if client_id not in found]
+
+
+def insert_rows(table, columns, rows, chunk_size=DEFAULT_CHUNK_SIZE, value_sql=None, before_insert=None):
+    if chunk_size < 1:
+        raise ValueError("chunk_size deve ser maior que zero.")
+    if not rows:
+        return []
+
+    return run_write(_insert_rows_command, table, columns, rows, chunk_size, value_sql, before_insert)
+
+
+def _insert_rows_command(cursor, table, columns, rows, chunk_size, value_sql, before_insert):
+    placeholders = value_sql or ", ".join("?" for _ in columns)
+    sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})"
+
+    if before_insert is not None:
+        before_insert(cursor)
+
+    start_id = _current_sequence(cursor, table)
+    for offset in range(0, len(rows), chunk_size):
+        cursor.executemany(sql, rows[offset:offset + chunk_size])
+    end_id = _current_sequence(cursor, table)
+
+    # O gravador é o único escritor e roda em BEGIN IMMEDIATE: AUTOINCREMENT gera ids contíguos.
+    if end_id - start_id != len(rows):
+        raise RuntimeError(f"Sequência inesperada ao inserir em {table}.")
+
+    return list(range(start_id + 1, end_id + 1))
+
+
+def _current_sequence(cursor, table):
+    cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = ?", (table,))
+    row = cursor.fetchone()
+    return row["seq"] if row is not None else 0
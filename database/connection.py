@@ -1,19 +1,191 @@
 import sqlite3
 import os
+import threading
+import weakref
+from contextlib import contextmanager
 from pathlib import Path
 
+from database.instrumentation import get_cursor_factory
+
+PRAGMA_PROFILE = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "cache_size": -16000,
+    "mmap_size": 134217728,
+    "temp_store": "MEMORY",
+    "busy_timeout": 5000,
+}
+
+# Leitores não precisam de PRAGMAs de escrita; journal_mode já vem do banco.
+READ_ONLY_PRAGMAS = ("journal_mode", "synchronous")
+
+_local = threading.local()
+_registry_lock = threading.Lock()
+_open_connections = weakref.WeakSet()
+_generation = 0
+_db_path = None
+_db_path_base = None
+
+
+class ManagedConnection(sqlite3.Connection):
+
+    def cursor(self, factory=None):
+        return super().cursor(factory or get_cursor_factory())
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def executescript(self, sql_script):
+        return self.cursor().executescript(sql_script)
+
+    def close(self):
+        # A conexão pertence à thread e é reaproveitada; fechar apenas descarta
+        # o que não foi confirmado, como acontecia com a conexão por chamada.
+        if self.in_transaction:
+            self.rollback()
+
+    def force_close(self):
+        super().close()
+
+
 def get_connection():
-    db_path = get_db_path()
-    db_path.parent.mkdir(parents=True, exist_ok=True)
-    conn = sqlite3.connect(str(db_path))
+    conn = getattr(_local, "connection", None)
+    if conn is not None and getattr(_local, "generation", None) == _generation:
+        return conn
+
+    if conn is not None:
+        _discard(conn)
+
+    conn = _open_connection()
+    _local.connection = conn
+    _local.generation = _generation
+    return conn
+
+
+@contextmanager
+def read_session():
+    conn = _get_read_connection()
+    depth = getattr(_local, "read_depth", 0)
+
+    if depth == 0:
+        conn.execute("BEGIN")
+        # Em WAL o snapshot é fixado na primeira leitura da transação.
+        conn.execute("SELECT 1 FROM sqlite_master LIMIT 1").fetchall()
+
+    _local.read_depth = depth + 1
+    try:
+        yield conn
+    finally:
+        _local.read_depth = depth
+        if depth == 0 and conn.in_transaction:
+            conn.rollback()
+
+
+def _get_read_connection():
+    conn = getattr(_local, "read_connection", None)
+    if conn is not None and getattr(_local, "read_generation", None) == _generation:
+        return conn
+
+    if conn is not None:
+        _discard(conn)
+
+    profile = {name: value for name, value in PRAGMA_PROFILE.items() if name not in READ_ONLY_PRAGMAS}
+    conn = _open_connection(f"{Path(get_db_path()).resolve().as_uri()}?mode=ro", profile)
+    _local.read_connection = conn
+    _local.read_generation = _generation
+    _local.read_depth = 0
+    return conn
+
+
+def _open_connection(database=None, profile=None):
+    profile = dict(PRAGMA_PROFILE if profile is None else profile)
+    timeout = max(float(profile.get("busy_timeout") or 0) / 1000, 0)
+
+    conn = sqlite3.connect(
+        database or str(get_db_path()),
+        timeout=timeout,
+        factory=ManagedConnection,
+        check_same_thread=False,
+        uri=database is not None,
+    )
     conn.row_factory = sqlite3.Row
+    apply_pragmas(conn, profile)
+
+    with _registry_lock:
+        _open_connections.add(conn)
     return conn
 
+
+def apply_pragmas(conn, profile):
+    for name, value in profile.items():
+        if value is None:
+            continue
+        conn.execute(f"PRAGMA {name} = {value}")
+
+
+def configure_pragmas(**overrides):
+    PRAGMA_PROFILE.update(overrides)
+    reset_connections()
+
+
+def close_connection():
+    for attribute in ("connection", "read_connection"):
+        conn = getattr(_local, attribute, None)
+        setattr(_local, attribute, None)
+        if conn is not None:
+            _discard(conn)
+
+
+def close_all_connections():
+    global _generation
+
+    with _registry_lock:
+        connections = list(_open_connections)
+        _open_connections.clear()
+        _generation += 1
+
+    for conn in connections:
+        try:
+            conn.force_close()
+        except sqlite3.Error:
+            pass
+
+    _local.connection = None
+    _local.read_connection = None
+
+
+def reset_connections():
+    global _db_path, _db_path_base
+
+    close_all_connections()
+    _db_path = None
+    _db_path_base = None
+
+
+def _discard(conn):
+    with _registry_lock:
+        _open_connections.discard(conn)
+    try:
+        conn.force_close()
+    except sqlite3.Error:
+        pass
+
+
 def get_db_path():
+    global _db_path, _db_path_base
+
     local_app_data = os.getenv("LOCALAPPDATA") or str(Path.home() / "AppData" / "Local")
+    if _db_path is not None and _db_path_base == local_app_data:
+        return _db_path
+
     app_folder = Path(local_app_data) / "CadernetaDigitalPro"
     db_folder = app_folder / "database"
 
     db_folder.mkdir(parents=True, exist_ok=True)
 
-    return db_folder / "caderneta.db"
\ No newline at end of file
+    _db_path = db_folder / "caderneta.db"
+    _db_path_base = local_app_data
+    return _db_path
@@ -0,0 +1,238 @@
+import atexit
+import math
+import os
+import re
+import sqlite3
+import sys
+import threading
+from collections import deque
+from datetime import datetime
+from time import perf_counter
+
+from app_paths import get_app_data_path
+
+MAX_SAMPLES_PER_STATEMENT = 2048
+DEFAULT_SLOW_THRESHOLD_MS = 200
+ATTRIBUTED_PACKAGES = ("services.", "ui.", "models.", "benchmarks.")
+
+_lock = threading.Lock()
+_stats = {}
+_settings = {
+    "enabled": False,
+    "slow_threshold_ms": DEFAULT_SLOW_THRESHOLD_MS,
+    "slow_log_path": None,
+}
+
+
+class _StatementStats:
+
+    def __init__(self, caller, sql):
+        self.caller = caller
+        self.sql = sql
+        self.count = 0
+        self.total_ms = 0.0
+        self.rows = 0
+        self.samples = deque(maxlen=MAX_SAMPLES_PER_STATEMENT)
+
+    def p95_ms(self):
+        if not self.samples:
+            return 0.0
+        ordered = sorted(sample[0] for sample in self.samples)
+        index = max(0, math.ceil(len(ordered) * 0.95) - 1)
+        return ordered[index]
+
+    def as_dict(self):
+        return {
+            "caller": self.caller,
+            "sql": self.sql,
+            "count": self.count,
+            "total_ms": round(self.total_ms, 3),
+            "avg_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "p95_ms": round(self.p95_ms(), 3),
+            "rows": self.rows,
+        }
+
+
+class _Execution:
+
+    def __init__(self, stats, elapsed_ms):
+        self.stats = stats
+        self.sample = [elapsed_ms]
+        self.logged = False
+
+
+class InstrumentedCursor(sqlite3.Cursor):
+
+    def execute(self, sql, parameters=()):
+        start = perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            self._execution = _record_execution(sql, perf_counter() - start)
+
+    def executemany(self, sql, seq_of_parameters):
+        start = perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            self._execution = _record_execution(sql, perf_counter() - start)
+
+    def executescript(self, sql_script):
+        start = perf_counter()
+        try:
+            return super().executescript(sql_script)
+        finally:
+            self._execution = _record_execution(sql_script, perf_counter() - start)
+
+    def fetchone(self):
+        start = perf_counter()
+        row = super().fetchone()
+        self._record_fetch(perf_counter() - start, 0 if row is None else 1)
+        return row
+
+    def fetchmany(self, size=None):
+        start = perf_counter()
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        self._record_fetch(perf_counter() - start, len(rows))
+        return rows
+
+    def fetchall(self):
+        start = perf_counter()
+        rows = super().fetchall()
+        self._record_fetch(perf_counter() - start, len(rows))
+        return rows
+
+    def __next__(self):
+        start = perf_counter()
+        row = super().__next__()
+        self._record_fetch(perf_counter() - start, 1)
+        return row
+
+    def _record_fetch(self, elapsed, rows):
+        execution = getattr(self, "_execution", None)
+        if execution is not None:
+            _record_fetch(execution, elapsed, rows)
+
+
+def _normalize_sql(sql):
+    return re.sub(r"\s+", " ", str(sql)).strip()
+
+
+def _find_caller():
+    fallback = None
+    frame = sys._getframe(3)
+    while frame is not None:
+        module_name = frame.f_globals.get("__name__", "")
+        if module_name.startswith(ATTRIBUTED_PACKAGES):
+            return f"{module_name}.{frame.f_code.co_qualname}"
+        if fallback is None and not module_name.startswith("database."):
+            fallback = f"{module_name}.{frame.f_code.co_qualname}"
+        frame = frame.f_back
+    return fallback or "<desconhecido>"
+
+
+def _record_execution(sql, elapsed):
+    elapsed_ms = elapsed * 1000
+    caller = _find_caller()
+    key = (caller, _normalize_sql(sql))
+
+    with _lock:
+        stats = _stats.get(key)
+        if stats is None:
+            stats = _stats[key] = _StatementStats(*key)
+        execution = _Execution(stats, elapsed_ms)
+        stats.count += 1
+        stats.total_ms += elapsed_ms
+        stats.samples.append(execution.sample)
+
+    _check_slow(execution)
+    return execution
+
+
+def _record_fetch(execution, elapsed, rows):
+    elapsed_ms = elapsed * 1000
+    with _lock:
+        execution.sample[0] += elapsed_ms
+        execution.stats.total_ms += elapsed_ms
+        execution.stats.rows += rows
+
+    _check_slow(execution)
+
+
+def _check_slow(execution):
+    threshold = _settings["slow_threshold_ms"]
+    if execution.logged or threshold is None or execution.sample[0] < threshold:
+        return
+
+    execution.logged = True
+    try:
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        with open(_settings["slow_log_path"], "a", encoding="utf-8") as f:
+            f.write(
+                f"[{timestamp}] {execution.sample[0]:.1f} ms "
+                f"{execution.stats.caller} | {execution.stats.sql}\n"
+            )
+    except Exception:
+        pass
+
+
+def enable_instrumentation(slow_threshold_ms=DEFAULT_SLOW_THRESHOLD_MS, slow_log_path=None):
+    _settings["slow_threshold_ms"] = slow_threshold_ms
+    _settings["slow_log_path"] = str(slow_log_path or get_app_data_path("slow_queries.log"))
+    _settings["enabled"] = True
+
+
+def disable_instrumentation():
+    _settings["enabled"] = False
+
+
+def is_instrumentation_enabled():
+    return _settings["enabled"]
+
+
+def get_cursor_factory():
+    return InstrumentedCursor if _settings["enabled"] else sqlite3.Cursor
+
+
+def reset_query_stats():
+    with _lock:
+        _stats.clear()
+
+
+def get_query_stats():
+    with _lock:
+        rows = [stats.as_dict() for stats in _stats.values()]
+    return sorted(rows, key=lambda item: item["total_ms"], reverse=True)
+
+
+def dump_query_summary(path=None, limit=None):
+    stats = get_query_stats()
+    if limit is not None:
+        stats = stats[:limit]
+
+    lines = [f"{'total ms':>10} {'qtd':>7} {'p95 ms':>9} {'linhas':>9}  origem | sql"]
+    for item in stats:
+        lines.append(
+            f"{item['total_ms']:>10.1f} {item['count']:>7} {item['p95_ms']:>9.2f} {item['rows']:>9}  "
+            f"{item['caller']} | {item['sql']}"
+        )
+    summary = "\n".join(lines) + "\n"
+
+    if path is not None:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(summary)
+    return summary
+
+
+def _dump_summary_on_exit():
+    try:
+        dump_query_summary(get_app_data_path("sql_profile_summary.txt"))
+    except Exception:
+        pass
+
+
+if os.getenv("CADERNETA_SQL_PROFILE"):
+    enable_instrumentation(
+        slow_threshold_ms=float(os.getenv("CADERNETA_SLOW_QUERY_MS") or DEFAULT_SLOW_THRESHOLD_MS),
+    )
+    atexit.register(_dump_summary_on_exit)
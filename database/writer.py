@@ -0,0 +1,182 @@
+import atexit
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from database.connection import get_connection
+
+# Sem espera por padrão: enquanto um grupo é confirmado, os comandos que chegam
+# se acumulam na fila e formam o grupo seguinte.
+GROUP_COMMIT_WINDOW_MS = 0
+MAX_GROUP_SIZE = 200
+
+_STOP = object()
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+class _Command:
+
+    def __init__(self, func, args, exclusive=False):
+        self.func = func
+        self.args = args
+        self.exclusive = exclusive
+        self.future = Future()
+
+
+class DatabaseWriter:
+
+    def __init__(self, window_ms=None, max_group_size=MAX_GROUP_SIZE):
+        if window_ms is None:
+            window_ms = GROUP_COMMIT_WINDOW_MS
+        self.window = max(window_ms, 0) / 1000
+        self.max_group_size = max(int(max_group_size), 1)
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(target=self._run, name="caderneta-writer", daemon=True)
+        self.cursor = None
+        self.thread.start()
+
+    def submit(self, func, *args):
+        return self._enqueue(_Command(func, args))
+
+    def submit_exclusive(self, func, *args):
+        return self._enqueue(_Command(func, args, exclusive=True))
+
+    def stop(self, timeout=None):
+        self.queue.put(_STOP)
+        self.thread.join(timeout)
+
+    def in_writer_thread(self):
+        return threading.current_thread() is self.thread
+
+    def _enqueue(self, command):
+        if not self.thread.is_alive():
+            raise RuntimeError("Gravador do banco de dados encerrado.")
+        self.queue.put(command)
+        return command.future
+
+    def _run(self):
+        pending = None
+        while True:
+            command = pending if pending is not None else self.queue.get()
+            pending = None
+            if command is _STOP:
+                return
+
+            if command.exclusive:
+                self._run_exclusive(command)
+                continue
+
+            group = [command]
+            deadline = time.monotonic() + self.window
+            while len(group) < self.max_group_size:
+                try:
+                    next_command = self.queue.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+                # Comandos exclusivos e a parada esperam o grupo atual ser confirmado.
+                if next_command is _STOP or next_command.exclusive:
+                    pending = next_command
+                    break
+                group.append(next_command)
+
+            self._run_group(group)
+
+    def _run_exclusive(self, command):
+        if not command.future.set_running_or_notify_cancel():
+            return
+        try:
+            command.future.set_result(command.func(*command.args))
+        except BaseException as exc:
+            command.future.set_exception(exc)
+
+    def _run_group(self, group):
+        group = [command for command in group if command.future.set_running_or_notify_cancel()]
+        if not group:
+            return
+
+        conn = get_connection()
+        cursor = conn.cursor()
+        outcomes = []
+        # Com vários comandos, cada um roda em um savepoint: uma falha desfaz só o
+        # próprio comando. Sozinho, a transação já faz esse papel, e o savepoint só
+        # custaria: dentro dele a FTS5 grava o índice a cada instrução, deixando
+        # inserções em massa de vendas cerca de 5x mais lentas.
+        use_savepoints = len(group) > 1
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            self.cursor = cursor
+            for command in group:
+                if not use_savepoints:
+                    outcomes.append((command, command.func(cursor, *command.args), None))
+                    continue
+
+                cursor.execute("SAVEPOINT writer_command")
+                try:
+                    result = command.func(cursor, *command.args)
+                except Exception as exc:
+                    cursor.execute("ROLLBACK TO writer_command")
+                    cursor.execute("RELEASE writer_command")
+                    outcomes.append((command, None, exc))
+                else:
+                    cursor.execute("RELEASE writer_command")
+                    outcomes.append((command, result, None))
+            conn.commit()
+        except BaseException as exc:
+            if conn.in_transaction:
+                conn.rollback()
+            for command in group:
+                command.future.set_exception(exc)
+            return
+        finally:
+            self.cursor = None
+
+        # Os chamadores só recebem o resultado depois do commit.
+        for command, result, error in outcomes:
+            if error is not None:
+                command.future.set_exception(error)
+            else:
+                command.future.set_result(result)
+
+
+def get_writer():
+    global _writer
+
+    with _writer_lock:
+        if _writer is None or not _writer.thread.is_alive():
+            _writer = DatabaseWriter()
+        return _writer
+
+
+def run_write(func, *args):
+    writer = get_writer()
+    if writer.in_writer_thread():
+        return func(writer.cursor, *args)
+    return writer.submit(func, *args).result()
+
+
+def submit_write(func, *args):
+    return get_writer().submit(func, *args)
+
+
+def run_exclusive(func, *args):
+    writer = get_writer()
+    if writer.in_writer_thread():
+        return func(*args)
+    return writer.submit_exclusive(func, *args).result()
+
+
+def stop_writer(timeout=None):
+    global _writer
+
+    with _writer_lock:
+        writer = _writer
+        _writer = None
+
+    if writer is not None and writer.thread.is_alive():
+        writer.stop(timeout)
+
+
+atexit.register(stop_writer, 10)
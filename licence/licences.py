@@ -1,15 +1,21 @@
-import requests
 import uuid
+import hashlib
+import hmac
 import json
 import re
 import subprocess
 import os
+import platform
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import TimeoutError as FuturesTimeoutError
 from pathlib import Path
 from datetime import datetime
-import certifi
-import urllib3
+from app_info import APP_NAME
 from app_paths import get_app_data_path
 
+LICENSE_URL_ENV = "CADERNETA_LICENCA_URL"
 URL_API = "https://script.google.com/macros/s/AKfycbxce6gUv_mc7_tGuFAtGrQrnHwn4RqX8jlpicO5UqvF6b36FQ1f42vUovzw0LqGmeoY/exec"
 
 def get_license_file_path():
@@ -22,6 +28,15 @@ def get_license_file_path():
 LICENSE_FILE = get_license_file_path()
 MAC_DEBUG_FILE = get_app_data_path("mac_debug.log")
 LICENSE_DEBUG_FILE = get_app_data_path("licence_debug.log")
+LICENSE_CACHE_FILE = LICENSE_FILE.parent / "validacao.json"
+LICENSE_GRACE_DAYS = 7
+LICENSE_REQUEST_TIMEOUT = 12
+# Prazo total da validação, somando as tentativas em paralelo e o último recurso.
+LICENSE_DEADLINE = 20
+LICENSE_ATTEMPTS = ("json_default", "json_certifi", "form_default")
+
+_session = None
+_session_lock = threading.Lock()
 
 def log_mac_debug(message):
     try:
@@ -39,92 +54,303 @@ def log_license_debug(message):
     except Exception:
         pass
 
-def get_mac():
-    def normalize(mac_text):
-        clean = mac_text.strip().upper().replace("-", ":")
-        if re.fullmatch(r"([0-9A-F]{2}:){5}[0-9A-F]{2}", clean):
-            return clean
+MAC_PROBES = (
+    ("getmac_system32", ["C:\\Windows\\System32\\getmac.exe", "/fo", "csv", "/nh"]),
+    ("getmac_path", ["getmac", "/fo", "csv", "/nh"]),
+    ("ipconfig_all", ["ipconfig", "/all"]),
+    ("wmic_nic", ["wmic", "nic", "where", "NetEnabled=true", "get", "MACAddress"]),
+)
+MAC_PROBE_TIMEOUT = 6
+MAC_PATTERNS = (
+    r"[0-9A-Fa-f]{2}(?:-[0-9A-Fa-f]{2}){5}",
+    r"[0-9A-Fa-f]{2}(?::[0-9A-Fa-f]{2}){5}",
+)
+MAC_CACHE_FILE = LICENSE_FILE.parent / "dispositivo.json"
+MAC_CACHE_MAX_AGE_DAYS = 30
+FALLBACK_SOURCE = "uuid_getnode"
+
+def normalize_mac(mac_text):
+    clean = mac_text.strip().upper().replace("-", ":")
+    if re.fullmatch(r"([0-9A-F]{2}:){5}[0-9A-F]{2}", clean):
+        return clean
+    return None
+
+def is_valid_mac(mac):
+    return bool(mac) and mac != "00:00:00:00:00:00"
+
+def find_mac_in_output(output):
+    for pattern in MAC_PATTERNS:
+        for match in re.findall(pattern, output):
+            mac = normalize_mac(match)
+            if is_valid_mac(mac):
+                return mac
+    return None
+
+def read_cached_mac():
+    try:
+        with open(MAC_CACHE_FILE, "r", encoding="utf-8") as f:
+            dados = json.load(f)
+        detected_at = datetime.fromisoformat(dados["detectado_em"])
+    except Exception:
         return None
 
-    def valid_candidate(mac):
-        return mac and mac != "00:00:00:00:00:00"
-
-    def run_command(command):
-        try:
-            result = subprocess.run(
-                command,
-                capture_output=True,
-                text=True,
-                encoding="cp1252",
-                errors="ignore",
-                check=False,
-                timeout=6,
-            )
-            return result.stdout or ""
-        except Exception:
-            return ""
-
-    patterns = [
-        r"[0-9A-Fa-f]{2}(?:-[0-9A-Fa-f]{2}){5}",
-        r"[0-9A-Fa-f]{2}(?::[0-9A-Fa-f]{2}){5}",
-    ]
-
-    command_outputs = [
-        ("getmac_system32", run_command(["C:\\Windows\\System32\\getmac.exe", "/fo", "csv", "/nh"])),
-        ("getmac_path", run_command(["getmac", "/fo", "csv", "/nh"])),
-        ("ipconfig_all", run_command(["ipconfig", "/all"])),
-        ("wmic_nic", run_command(["wmic", "nic", "where", "NetEnabled=true", "get", "MACAddress"])),
-    ]
-
-    for source, output in command_outputs:
-        if not output:
-            log_mac_debug(f"{source}: sem saída")
-            continue
-
-        log_mac_debug(f"{source}: saída recebida ({len(output)} chars)")
-        for pattern in patterns:
-            for match in re.findall(pattern, output):
-                mac = normalize(match)
-                if valid_candidate(mac):
-                    log_mac_debug(f"MAC detectado via {source}: {mac}")
-                    return mac
-
-    fallback = uuid.getnode()
-    fallback_mac = ":".join(f"{(fallback >> elements) & 0xFF:02X}" for elements in range(40, -1, -8))
-    log_mac_debug(f"MAC fallback uuid.getnode(): {fallback_mac}")
-    return fallback_mac
-
-def validar_online(chave):
-    mac = get_mac()
+    # O cache vale só para esta máquina e por tempo limitado: uma troca de placa
+    # de rede ou uma cópia da pasta para outro computador força nova detecção.
+    mac = normalize_mac(str(dados.get("mac", "")))
+    age_days = (datetime.now() - detected_at).total_seconds() / 86400
+    if not is_valid_mac(mac) or dados.get("host") != platform.node() or not 0 <= age_days < MAC_CACHE_MAX_AGE_DAYS:
+        return None
+    return mac
+
+def write_cached_mac(mac, source):
     dados = {
-        "chave": chave,
         "mac": mac,
-        "mac_raw": mac.replace(":", "")
+        "origem": source,
+        "host": platform.node(),
+        "detectado_em": datetime.now().isoformat(timespec="seconds"),
     }
+    try:
+        with open(MAC_CACHE_FILE, "w", encoding="utf-8") as f:
+            json.dump(dados, f)
+    except Exception:
+        pass
+
+def run_mac_probe(command, processes, stop_event):
+    if stop_event.is_set():
+        return ""
+    try:
+        process = subprocess.Popen(
+            command,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            encoding="cp1252",
+            errors="ignore",
+        )
+    except Exception:
+        return ""
+
+    processes.append(process)
+    # Outra sonda pode ter vencido enquanto este processo era criado.
+    if stop_event.is_set():
+        process.kill()
+    try:
+        output, _ = process.communicate(timeout=MAC_PROBE_TIMEOUT)
+        return output or ""
+    except Exception:
+        process.kill()
+        process.communicate()
+        return ""
+
+def get_fallback_mac():
+    node = uuid.getnode()
+    return ":".join(f"{(node >> elements) & 0xFF:02X}" for elements in range(40, -1, -8))
+
+def detect_mac():
+    # Todas as sondas rodam ao mesmo tempo, mas os resultados são lidos na ordem de
+    # MAC_PROBES: um MAC só vale depois que as sondas de maior prioridade terminaram
+    # sem nenhum. Assim o MAC é sempre o mesmo da ativação (o ipconfig, por exemplo,
+    # costuma listar adaptadores virtuais ou de VPN primeiro). As sondas restantes são
+    # encerradas; o uuid.getnode() corre junto, como reserva.
+    started = time.perf_counter()
+    processes = []
+    stop_event = threading.Event()
+    executor = ThreadPoolExecutor(max_workers=len(MAC_PROBES) + 1, thread_name_prefix="caderneta-mac")
+    try:
+        fallback_future = executor.submit(get_fallback_mac)
+        futures = [
+            (executor.submit(run_mac_probe, command, processes, stop_event), source)
+            for source, command in MAC_PROBES
+        ]
+        for position, (future, source) in enumerate(futures):
+            output = future.result()
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            if not output:
+                log_mac_debug(f"{source}: sem saída ({elapsed_ms:.0f} ms)")
+                continue
+
+            log_mac_debug(f"{source}: saída recebida ({len(output)} chars, {elapsed_ms:.0f} ms)")
+            mac = find_mac_in_output(output)
+            if mac:
+                pending = [name for other, name in futures[position + 1:] if not other.done()]
+                if pending:
+                    log_mac_debug(f"Sondas canceladas: {', '.join(pending)}")
+                log_mac_debug(f"MAC detectado via {source}: {mac} ({elapsed_ms:.0f} ms)")
+                return mac, source
+
+        fallback_mac = fallback_future.result()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        log_mac_debug(f"MAC fallback uuid.getnode(): {fallback_mac} ({elapsed_ms:.0f} ms)")
+        return fallback_mac, FALLBACK_SOURCE
+    finally:
+        stop_event.set()
+        for process in processes:
+            if process.poll() is None:
+                try:
+                    process.kill()
+                except Exception:
+                    pass
+        executor.shutdown(wait=False, cancel_futures=True)
+
+def get_mac(use_cache=True):
+    if use_cache:
+        cached = read_cached_mac()
+        if cached:
+            log_mac_debug(f"MAC do cache: {cached}")
+            return cached
+
+    mac, source = detect_mac()
+    # Um uuid.getnode() com o bit multicast ligado é um número aleatório, não um MAC:
+    # guardá-lo fixaria um valor que não identifica a máquina.
+    if source != FALLBACK_SOURCE or not int(mac.replace(":", ""), 16) & 0x010000000000:
+        write_cached_mac(mac, source)
+    return mac
+
+def get_license_url():
+    # CADERNETA_LICENCA_URL aponta a validação para outro servidor (ex.: um stub local em testes).
+    return os.getenv(LICENSE_URL_ENV) or URL_API
+
+def get_session():
+    global _session
+
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    with _session_lock:
+        if _session is None:
+            # Uma sessão para todas as tentativas: a conexão TLS aberta é reaproveitada.
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=2, pool_maxsize=len(LICENSE_ATTEMPTS) + 1, max_retries=0)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+        return _session
+
+def post_attempt(session, url, options, timeout):
+    started = time.perf_counter()
+    response = session.post(url, timeout=timeout, **options)
+    return response, (time.perf_counter() - started) * 1000
 
-    attempts = [
-        ("json_default", lambda: requests.post(URL_API, json=dados, timeout=12)),
-        ("json_certifi", lambda: requests.post(URL_API, json=dados, timeout=12, verify=certifi.where())),
-        ("form_default", lambda: requests.post(URL_API, data=dados, timeout=12)),
-    ]
+def race_attempts(session, url, attempts, deadline):
+    # As tentativas correm juntas; a primeira resposta com conteúdo vence. As demais
+    # terminam sozinhas no próprio timeout e o resultado delas é descartado.
+    errors = []
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        return None, errors
 
-    urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
-    attempts.append(("json_insecure", lambda: requests.post(URL_API, json=dados, timeout=12, verify=False)))
+    executor = ThreadPoolExecutor(max_workers=len(attempts), thread_name_prefix="caderneta-licenca")
+    try:
+        futures = {
+            executor.submit(post_attempt, session, url, options, min(LICENSE_REQUEST_TIMEOUT, remaining)): name
+            for name, options in attempts
+        }
+        for future in as_completed(futures, timeout=remaining):
+            attempt_name = futures[future]
+            try:
+                response, elapsed_ms = future.result()
+            except Exception as exc:
+                errors.append(exc)
+                log_license_debug(f"{attempt_name}: excecao={type(exc).__name__} detalhe={exc}")
+                continue
 
-    for attempt_name, request_fn in attempts:
-        try:
-            response = request_fn()
             text = (response.text or "").strip()
             log_license_debug(
-                f"{attempt_name}: status={response.status_code} body={text[:220]}"
+                f"{attempt_name}: status={response.status_code} tempo={elapsed_ms:.0f}ms body={text[:220]}"
             )
             if text:
-                return text
-        except Exception as exc:
-            log_license_debug(f"{attempt_name}: excecao={type(exc).__name__} detalhe={exc}")
+                return text, errors
+    except FuturesTimeoutError:
+        log_license_debug("prazo total da validação esgotado")
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+    return None, errors
+
+def validar_online(chave, url=None, deadline_seconds=LICENSE_DEADLINE):
+    # A pilha HTTP só é carregada quando há de fato uma consulta ao servidor:
+    # com a licença já salva, a abertura do app não paga por ela.
+    import certifi
+    import requests
+    import urllib3
+
+    url = url or get_license_url()
+    deadline = time.monotonic() + deadline_seconds
+    mac = get_mac()
+    dados = {
+        "chave": chave,
+        "mac": mac,
+        "mac_raw": mac.replace(":", "")
+    }
+
+    options = {
+        "json_default": {"json": dados},
+        "json_certifi": {"json": dados, "verify": certifi.where()},
+        "form_default": {"data": dados},
+    }
+    session = get_session()
+    resultado, errors = race_attempts(session, url, [(name, options[name]) for name in LICENSE_ATTEMPTS], deadline)
+    if resultado:
+        return resultado
+
+    # Sem verificação de certificado só como último recurso, e apenas se alguma
+    # tentativa falhou no TLS: é o único caso em que ela pode dar outro resultado.
+    if any(isinstance(exc, requests.exceptions.SSLError) for exc in errors):
+        urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+        resultado, _errors = race_attempts(session, url, [("json_insecure", {"json": dados, "verify": False})], deadline)
+        if resultado:
+            return resultado
 
     return "ERRO_CONEXAO"
 
+def license_cache_key(mac):
+    # Chave atrelada à máquina: o cache copiado para outro computador não confere.
+    # Serve para detectar edição ou cópia do arquivo, não como proteção criptográfica forte.
+    return hashlib.sha256(f"{APP_NAME}:{platform.node()}:{mac}".encode("utf-8")).digest()
+
+def sign_license_cache(chave_hash, mac, validated_at):
+    message = f"{chave_hash}|{mac}|{validated_at}".encode("utf-8")
+    return hmac.new(license_cache_key(mac), message, hashlib.sha256).hexdigest()
+
+def hash_chave(chave):
+    return hashlib.sha256(chave.encode("utf-8")).hexdigest()
+
+def salvar_validacao(chave):
+    mac = get_mac()
+    validated_at = datetime.now().isoformat(timespec="seconds")
+    chave_hash = hash_chave(chave)
+    dados = {
+        "chave": chave_hash,
+        "mac": mac,
+        "validado_em": validated_at,
+        "assinatura": sign_license_cache(chave_hash, mac, validated_at),
+    }
+    try:
+        with open(LICENSE_CACHE_FILE, "w", encoding="utf-8") as f:
+            json.dump(dados, f)
+    except Exception:
+        pass
+
+def validacao_em_cache(chave):
+    try:
+        with open(LICENSE_CACHE_FILE, "r", encoding="utf-8") as f:
+            dados = json.load(f)
+        validated_at = datetime.fromisoformat(dados["validado_em"])
+        assinatura = str(dados["assinatura"])
+    except Exception:
+        return False
+
+    mac = get_mac()
+    if dados.get("chave") != hash_chave(chave) or dados.get("mac") != mac:
+        return False
+    expected = sign_license_cache(dados["chave"], mac, dados["validado_em"])
+    if not hmac.compare_digest(assinatura, expected):
+        log_license_debug("cache de validação com assinatura inválida")
+        return False
+
+    # Data no futuro indica relógio adiantado/atrasado: consulta o servidor de novo.
+    age_days = (datetime.now() - validated_at).total_seconds() / 86400
+    return 0 <= age_days < LICENSE_GRACE_DAYS
+
 def retorno_eh_ok(resultado):
     if resultado is None:
         return False
@@ -151,18 +377,30 @@ def ler_chave_salva():
         dados = json.load(f)
     return dados.get("chave")
 
-def verificar_licenca_salva_online():
+def verificar_licenca_salva_online(usar_cache=True):
     chave = ler_chave_salva()
     if not chave:
         return False
 
+    # Dentro do período de carência a última validação OK basta, sem ir à rede.
+    if usar_cache and validacao_em_cache(chave):
+        log_license_debug("validação em cache dentro da carência")
+        return True
+
     resultado = validar_online(chave)
-    return retorno_eh_ok(resultado)
+    if not retorno_eh_ok(resultado):
+        # Uma recusa do servidor (e não falha de rede) invalida a carência guardada.
+        if resultado != "ERRO_CONEXAO":
+            LICENSE_CACHE_FILE.unlink(missing_ok=True)
+        return False
+    salvar_validacao(chave)
+    return True
 
 def ativar_licenca(chave):
     resultado = validar_online(chave)
     if retorno_eh_ok(resultado):
         salvar_licenca(chave)
+        salvar_validacao(chave)
         return True, "Licença ativada com sucesso."
 
     mensagens = {
@@ -1,23 +1,45 @@
-from ui.main_window import MainWindow
+import sys
+
+from app_profiling import configure_from_environment, span
+
+# O perfil precisa ser ligado antes de importar a interface: as telas importam
+# as funções dos serviços pelo nome, e só as versões já instrumentadas são medidas.
+configure_from_environment(sys.argv[1:])
+
+from tkinter import messagebox
+
+from ui.main_window import MainWindow, prewarm_views
 from models.init_db import init_db
 from ui.splash_screen import SplashScreen
 from ui.license_activation_window import LicenseActivationWindow
+from ui.startup import StartupOrchestrator, StartupStep
 from licence.licences import possui_arquivo_licenca
 from app_paths import get_asset_path
 from services.backup_service import create_startup_backup
+from services.client_directory import client_directory
+from ui.task_runner import shutdown_executor
 
-if __name__ == "__main__":
-    init_db()
+# Tempo mínimo da splash na tela, para que ela não apenas pisque em aberturas rápidas.
+MIN_SPLASH_MS = 700
 
-    try:
-        create_startup_backup(max_files=7)
-    except Exception:
-        pass
 
+def build_startup_steps():
+    # Só a migração do banco segura a splash; o backup e o aquecimento das telas
+    # e da lista de clientes continuam em segundo plano depois dela.
+    return [
+        StartupStep("database", init_db),
+        StartupStep("backup", lambda: create_startup_backup(max_files=7), required=False, after=("database",)),
+        StartupStep("views", prewarm_views, required=False),
+        StartupStep("clients", client_directory.ensure_loaded, required=False, after=("database",)),
+    ]
+
+
+if __name__ == "__main__":
     splash_path = get_asset_path("splash.png")
     icon_path = get_asset_path("icone.ico")
 
-    app = MainWindow(license_active=possui_arquivo_licenca())
+    with span("startup.main_window", "startup"):
+        app = MainWindow(license_active=possui_arquivo_licenca(), initial_view=None)
     app.withdraw()
 
     splash = SplashScreen(app, splash_image_path=str(splash_path), icon_path=str(icon_path))
@@ -55,5 +77,21 @@ if __name__ == "__main__":
         else:
             show_activation_window()
 
-    app.after(1800, start_flow)
+    def on_startup_ready(orchestrator):
+        error = orchestrator.errors.get("database")
+        if error is not None:
+            try:
+                if splash.winfo_exists():
+                    splash.destroy()
+            except Exception:
+                pass
+            messagebox.showerror("Erro ao iniciar", f"Não foi possível abrir o banco de dados:\n{error}")
+            app.destroy()
+            return
+
+        app.show_dashboard()
+        start_flow()
+
+    StartupOrchestrator(app, build_startup_steps(), on_startup_ready, min_display_ms=MIN_SPLASH_MS).start()
     app.mainloop()
+    shutdown_executor()
@@ -6,7 +6,14 @@ a = Analysis(
     pathex=[],
     binaries=[],
     datas=[('assets', 'assets')],
-    hiddenimports=[],
+    hiddenimports=[
+        'ui.dashboard_view',
+        'ui.clients_view',
+        'ui.sales_view',
+        'ui.payments_view',
+        'ui.reports_view',
+        'ui.backup_view',
+    ],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
@@ -1,9 +1,7 @@
 from database.connection import get_connection
 
-def init_db():
-    conn = get_connection()
-    cursor = conn.cursor()
 
+def _create_base_schema(cursor):
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS clients (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -45,5 +43,564 @@ def init_db():
         )
     """)
 
-    conn.commit()
-    conn.close()
+
+def _create_ledger_indexes(cursor):
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_sales_client_date ON sales (client_id, date)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_payments_client_date ON payments (client_id, date)")
+
+
+def _last_movement_sql(client_ref):
+    return f"""
+        (SELECT MAX(last_date) FROM (
+            SELECT MAX(date) AS last_date FROM sales WHERE client_id = {client_ref}
+            UNION ALL
+            SELECT MAX(date) AS last_date FROM payments WHERE client_id = {client_ref}
+        ))
+    """
+
+
+def _create_balance_triggers(cursor):
+    for table, total_column in (("sales", "total_sold"), ("payments", "total_paid")):
+        sign = "+" if table == "sales" else "-"
+        reverse_sign = "-" if table == "sales" else "+"
+
+        cursor.execute(f"DROP TRIGGER IF EXISTS trg_{table}_balance_insert")
+        cursor.execute(f"""
+            CREATE TRIGGER trg_{table}_balance_insert AFTER INSERT ON {table}
+            BEGIN
+                INSERT OR IGNORE INTO client_balances (client_id)
+                SELECT NEW.client_id WHERE NEW.client_id IS NOT NULL;
+
+                UPDATE client_balances
+                SET {total_column} = {total_column} + COALESCE(NEW.amount, 0),
+                    total_open = total_open {sign} COALESCE(NEW.amount, 0),
+                    last_movement_at = CASE
+                        WHEN last_movement_at IS NULL OR NEW.date > last_movement_at THEN NEW.date
+                        ELSE last_movement_at
+                    END
+                WHERE client_id = NEW.client_id;
+
+                UPDATE ledger_totals
+                SET {total_column} = {total_column} + COALESCE(NEW.amount, 0)
+                WHERE id = 1;
+            END
+        """)
+
+        cursor.execute(f"DROP TRIGGER IF EXISTS trg_{table}_balance_delete")
+        cursor.execute(f"""
+            CREATE TRIGGER trg_{table}_balance_delete AFTER DELETE ON {table}
+            BEGIN
+                UPDATE client_balances
+                SET {total_column} = {total_column} - COALESCE(OLD.amount, 0),
+                    total_open = total_open {reverse_sign} COALESCE(OLD.amount, 0),
+                    last_movement_at = {_last_movement_sql("OLD.client_id")}
+                WHERE client_id = OLD.client_id;
+
+                UPDATE ledger_totals
+                SET {total_column} = {total_column} - COALESCE(OLD.amount, 0)
+                WHERE id = 1;
+            END
+        """)
+
+        cursor.execute(f"DROP TRIGGER IF EXISTS trg_{table}_balance_update")
+        cursor.execute(f"""
+            CREATE TRIGGER trg_{table}_balance_update AFTER UPDATE OF client_id, amount, date ON {table}
+            BEGIN
+                UPDATE client_balances
+                SET {total_column} = {total_column} - COALESCE(OLD.amount, 0),
+                    total_open = total_open {reverse_sign} COALESCE(OLD.amount, 0),
+                    last_movement_at = {_last_movement_sql("OLD.client_id")}
+                WHERE client_id = OLD.client_id;
+
+                INSERT OR IGNORE INTO client_balances (client_id)
+                SELECT NEW.client_id WHERE NEW.client_id IS NOT NULL;
+
+                UPDATE client_balances
+                SET {total_column} = {total_column} + COALESCE(NEW.amount, 0),
+                    total_open = total_open {sign} COALESCE(NEW.amount, 0),
+                    last_movement_at = {_last_movement_sql("NEW.client_id")}
+                WHERE client_id = NEW.client_id;
+
+                UPDATE ledger_totals
+                SET {total_column} = {total_column} - COALESCE(OLD.amount, 0) + COALESCE(NEW.amount, 0)
+                WHERE id = 1;
+            END
+        """)
+
+    cursor.execute("DROP TRIGGER IF EXISTS trg_clients_balance_insert")
+    cursor.execute("""
+        CREATE TRIGGER trg_clients_balance_insert AFTER INSERT ON clients
+        BEGIN
+            INSERT OR IGNORE INTO client_balances (client_id) VALUES (NEW.id);
+            UPDATE ledger_totals SET total_clients = total_clients + 1 WHERE id = 1;
+        END
+    """)
+
+    cursor.execute("DROP TRIGGER IF EXISTS trg_clients_balance_delete")
+    cursor.execute("""
+        CREATE TRIGGER trg_clients_balance_delete AFTER DELETE ON clients
+        BEGIN
+            DELETE FROM client_balances WHERE client_id = OLD.id;
+            UPDATE ledger_totals SET total_clients = total_clients - 1 WHERE id = 1;
+        END
+    """)
+
+
+def balances_from_history_sql():
+    return """
+        SELECT
+            ids.client_id AS client_id,
+            COALESCE(s.total, 0) AS total_sold,
+            COALESCE(p.total, 0) AS total_paid,
+            COALESCE(s.total, 0) - COALESCE(p.total, 0) AS total_open,
+            CASE
+                WHEN s.last_date IS NULL THEN p.last_date
+                WHEN p.last_date IS NULL OR s.last_date > p.last_date THEN s.last_date
+                ELSE p.last_date
+            END AS last_movement_at
+        FROM (
+            SELECT id AS client_id FROM clients
+            UNION
+            SELECT client_id FROM sales WHERE client_id IS NOT NULL
+            UNION
+            SELECT client_id FROM payments WHERE client_id IS NOT NULL
+        ) ids
+        LEFT JOIN (
+            SELECT client_id, SUM(amount) AS total, MAX(date) AS last_date
+            FROM sales
+            GROUP BY client_id
+        ) s ON s.client_id = ids.client_id
+        LEFT JOIN (
+            SELECT client_id, SUM(amount) AS total, MAX(date) AS last_date
+            FROM payments
+            GROUP BY client_id
+        ) p ON p.client_id = ids.client_id
+    """
+
+
+def ledger_totals_from_history_sql():
+    return """
+        SELECT
+            (SELECT COUNT(*) FROM clients) AS total_clients,
+            (SELECT COALESCE(SUM(amount), 0) FROM sales) AS total_sold,
+            (SELECT COALESCE(SUM(amount), 0) FROM payments) AS total_paid
+    """
+
+
+def rebuild_balance_tables(cursor):
+    cursor.execute("DELETE FROM client_balances")
+    cursor.execute(f"""
+        INSERT INTO client_balances (client_id, total_sold, total_paid, total_open, last_movement_at)
+        {balances_from_history_sql()}
+    """)
+
+    cursor.execute("DELETE FROM ledger_totals")
+    cursor.execute(f"""
+        INSERT INTO ledger_totals (id, total_clients, total_sold, total_paid)
+        SELECT 1, total_clients, total_sold, total_paid FROM ({ledger_totals_from_history_sql()})
+    """)
+
+
+def _migration_001_ledger_indexes(cursor):
+    _create_ledger_indexes(cursor)
+
+
+def _migration_002_client_balances(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS client_balances (
+            client_id INTEGER PRIMARY KEY,
+            total_sold REAL NOT NULL DEFAULT 0,
+            total_paid REAL NOT NULL DEFAULT 0,
+            total_open REAL NOT NULL DEFAULT 0,
+            last_movement_at TIMESTAMP
+        )
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_client_balances_open ON client_balances (total_open)")
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS ledger_totals (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            total_clients INTEGER NOT NULL DEFAULT 0,
+            total_sold REAL NOT NULL DEFAULT 0,
+            total_paid REAL NOT NULL DEFAULT 0
+        )
+    """)
+
+    _create_balance_triggers(cursor)
+    rebuild_balance_tables(cursor)
+
+
+BALANCE_TRIGGERS = (
+    "trg_sales_balance_insert",
+    "trg_sales_balance_delete",
+    "trg_sales_balance_update",
+    "trg_payments_balance_insert",
+    "trg_payments_balance_delete",
+    "trg_payments_balance_update",
+    "trg_clients_balance_insert",
+    "trg_clients_balance_delete",
+)
+
+
+def _rebuild_table(cursor, table, create_sql, select_sql):
+    cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = ?", (table,))
+    sequence_row = cursor.fetchone()
+
+    cursor.execute(create_sql.format(table=f"{table}_new"))
+    cursor.execute(f"INSERT INTO {table}_new {select_sql}")
+    cursor.execute(f"DROP TABLE {table}")
+    cursor.execute(f"ALTER TABLE {table}_new RENAME TO {table}")
+
+    if sequence_row is not None:
+        cursor.execute(
+            "UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name = ?",
+            (sequence_row["seq"], table),
+        )
+
+
+def _migration_003_integer_cents(cursor):
+    for trigger_name in BALANCE_TRIGGERS:
+        cursor.execute(f"DROP TRIGGER IF EXISTS {trigger_name}")
+
+    _rebuild_table(
+        cursor,
+        "clients",
+        """
+        CREATE TABLE {table} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            cpf TEXT,
+            phone TEXT,
+            credit_limit INTEGER DEFAULT 0
+        )
+        """,
+        """
+        (id, name, cpf, phone, credit_limit)
+        SELECT id, name, cpf, phone, CAST(ROUND(credit_limit * 100) AS INTEGER) FROM clients
+        """,
+    )
+
+    _rebuild_table(
+        cursor,
+        "sales",
+        """
+        CREATE TABLE {table} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            client_id INTEGER,
+            description TEXT NOT NULL DEFAULT '',
+            amount INTEGER,
+            date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (client_id) REFERENCES clients(id)
+        )
+        """,
+        """
+        (id, client_id, description, amount, date)
+        SELECT id, client_id, description, CAST(ROUND(amount * 100) AS INTEGER), date FROM sales
+        """,
+    )
+
+    _rebuild_table(
+        cursor,
+        "payments",
+        """
+        CREATE TABLE {table} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            client_id INTEGER,
+            amount INTEGER,
+            date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (client_id) REFERENCES clients(id)
+        )
+        """,
+        """
+        (id, client_id, amount, date)
+        SELECT id, client_id, CAST(ROUND(amount * 100) AS INTEGER), date FROM payments
+        """,
+    )
+
+    _create_ledger_indexes(cursor)
+
+    cursor.execute("DROP TABLE client_balances")
+    cursor.execute("""
+        CREATE TABLE client_balances (
+            client_id INTEGER PRIMARY KEY,
+            total_sold INTEGER NOT NULL DEFAULT 0,
+            total_paid INTEGER NOT NULL DEFAULT 0,
+            total_open INTEGER NOT NULL DEFAULT 0,
+            last_movement_at TIMESTAMP
+        )
+    """)
+    cursor.execute("CREATE INDEX idx_client_balances_open ON client_balances (total_open)")
+
+    cursor.execute("DROP TABLE ledger_totals")
+    cursor.execute("""
+        CREATE TABLE ledger_totals (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            total_clients INTEGER NOT NULL DEFAULT 0,
+            total_sold INTEGER NOT NULL DEFAULT 0,
+            total_paid INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+
+    _create_balance_triggers(cursor)
+    rebuild_balance_tables(cursor)
+
+
+def _migration_004_date_indexes(cursor):
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_sales_date ON sales (date)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_payments_date ON payments (date)")
+
+
+FTS_TOKENIZER = "unicode61 remove_diacritics 2"
+
+
+def _digits_sql(expression):
+    for separator in (".", "-", " ", "(", ")", "/"):
+        expression = f"REPLACE({expression}, '{separator}', '')"
+    return expression
+
+
+def _migration_005_full_text_search(cursor):
+    cursor.execute(f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS clients_fts USING fts5(
+            name, cpf, phone,
+            tokenize = '{FTS_TOKENIZER}',
+            prefix = '2 3'
+        )
+    """)
+    cursor.execute(f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS sales_fts USING fts5(
+            description,
+            content = 'sales',
+            content_rowid = 'id',
+            tokenize = '{FTS_TOKENIZER}',
+            prefix = '2 3'
+        )
+    """)
+
+    new_cpf_digits = _digits_sql("COALESCE(NEW.cpf, '')")
+    new_phone_digits = _digits_sql("COALESCE(NEW.phone, '')")
+    client_values = f"NEW.id, NEW.name, {new_cpf_digits}, {new_phone_digits}"
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_clients_fts_insert AFTER INSERT ON clients
+        BEGIN
+            INSERT INTO clients_fts (rowid, name, cpf, phone) VALUES ({client_values});
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_clients_fts_update AFTER UPDATE OF name, cpf, phone ON clients
+        BEGIN
+            DELETE FROM clients_fts WHERE rowid = OLD.id;
+            INSERT INTO clients_fts (rowid, name, cpf, phone) VALUES ({client_values});
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_clients_fts_delete AFTER DELETE ON clients
+        BEGIN
+            DELETE FROM clients_fts WHERE rowid = OLD.id;
+        END
+    """)
+
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_sales_fts_insert AFTER INSERT ON sales
+        BEGIN
+            INSERT INTO sales_fts (rowid, description) VALUES (NEW.id, NEW.description);
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_sales_fts_update AFTER UPDATE OF description ON sales
+        BEGIN
+            INSERT INTO sales_fts (sales_fts, rowid, description) VALUES ('delete', OLD.id, OLD.description);
+            INSERT INTO sales_fts (rowid, description) VALUES (NEW.id, NEW.description);
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_sales_fts_delete AFTER DELETE ON sales
+        BEGIN
+            INSERT INTO sales_fts (sales_fts, rowid, description) VALUES ('delete', OLD.id, OLD.description);
+        END
+    """)
+
+    cpf_digits = _digits_sql("COALESCE(cpf, '')")
+    phone_digits = _digits_sql("COALESCE(phone, '')")
+    cursor.execute("DELETE FROM clients_fts")
+    cursor.execute(f"""
+        INSERT INTO clients_fts (rowid, name, cpf, phone)
+        SELECT id, name, {cpf_digits}, {phone_digits} FROM clients
+    """)
+    cursor.execute("INSERT INTO sales_fts (sales_fts) VALUES ('rebuild')")
+
+
+ROLLUP_PERIODS = (
+    ("daily_rollups", "day", "date({})"),
+    ("monthly_rollups", "month", "strftime('%Y-%m', {})"),
+)
+ROLLUP_COLUMNS = ("sales_count", "sales_amount", "payments_count", "payments_amount", "new_clients")
+
+
+def _rollup_change_sql(date_expression, assignments):
+    statements = []
+    for table, key, period_sql in ROLLUP_PERIODS:
+        period = period_sql.format(date_expression)
+        statements.append(f"INSERT OR IGNORE INTO {table} ({key}) SELECT {period} WHERE {period} IS NOT NULL;")
+        statements.append(f"UPDATE {table} SET {assignments} WHERE {key} = {period};")
+    return "\n".join(statements)
+
+
+def _create_rollup_triggers(cursor):
+    for table, prefix in (("sales", "sales"), ("payments", "payments")):
+        add_new = f"{prefix}_count = {prefix}_count + 1, {prefix}_amount = {prefix}_amount + COALESCE(NEW.amount, 0)"
+        remove_old = f"{prefix}_count = {prefix}_count - 1, {prefix}_amount = {prefix}_amount - COALESCE(OLD.amount, 0)"
+
+        cursor.execute(f"DROP TRIGGER IF EXISTS trg_{table}_rollup_insert")
+        cursor.execute(f"""
+            CREATE TRIGGER trg_{table}_rollup_insert AFTER INSERT ON {table}
+            BEGIN
+                {_rollup_change_sql("NEW.date", add_new)}
+            END
+        """)
+
+        cursor.execute(f"DROP TRIGGER IF EXISTS trg_{table}_rollup_delete")
+        cursor.execute(f"""
+            CREATE TRIGGER trg_{table}_rollup_delete AFTER DELETE ON {table}
+            BEGIN
+                {_rollup_change_sql("OLD.date", remove_old)}
+            END
+        """)
+
+        cursor.execute(f"DROP TRIGGER IF EXISTS trg_{table}_rollup_update")
+        cursor.execute(f"""
+            CREATE TRIGGER trg_{table}_rollup_update AFTER UPDATE OF amount, date ON {table}
+            BEGIN
+                {_rollup_change_sql("OLD.date", remove_old)}
+                {_rollup_change_sql("NEW.date", add_new)}
+            END
+        """)
+
+    cursor.execute("DROP TRIGGER IF EXISTS trg_clients_rollup_insert")
+    cursor.execute(f"""
+        CREATE TRIGGER trg_clients_rollup_insert AFTER INSERT ON clients
+        BEGIN
+            UPDATE clients SET created_at = CURRENT_TIMESTAMP WHERE id = NEW.id AND created_at IS NULL;
+            {_rollup_change_sql("COALESCE(NEW.created_at, CURRENT_TIMESTAMP)", "new_clients = new_clients + 1")}
+        END
+    """)
+
+    cursor.execute("DROP TRIGGER IF EXISTS trg_clients_rollup_delete")
+    cursor.execute(f"""
+        CREATE TRIGGER trg_clients_rollup_delete AFTER DELETE ON clients
+        BEGIN
+            {_rollup_change_sql("OLD.created_at", "new_clients = new_clients - 1")}
+        END
+    """)
+
+
+def daily_rollups_from_history_sql():
+    return """
+        SELECT
+            day,
+            SUM(sales_count) AS sales_count,
+            SUM(sales_amount) AS sales_amount,
+            SUM(payments_count) AS payments_count,
+            SUM(payments_amount) AS payments_amount,
+            SUM(new_clients) AS new_clients
+        FROM (
+            SELECT date(date) AS day, COUNT(*) AS sales_count, COALESCE(SUM(amount), 0) AS sales_amount,
+                   0 AS payments_count, 0 AS payments_amount, 0 AS new_clients
+            FROM sales
+            WHERE date(date) IS NOT NULL
+            GROUP BY date(date)
+            UNION ALL
+            SELECT date(date), 0, 0, COUNT(*), COALESCE(SUM(amount), 0), 0
+            FROM payments
+            WHERE date(date) IS NOT NULL
+            GROUP BY date(date)
+            UNION ALL
+            SELECT date(created_at), 0, 0, 0, 0, COUNT(*)
+            FROM clients
+            WHERE date(created_at) IS NOT NULL
+            GROUP BY date(created_at)
+        )
+        GROUP BY day
+    """
+
+
+def rebuild_rollup_tables(cursor):
+    columns = ", ".join(ROLLUP_COLUMNS)
+    sums = ", ".join(f"SUM({column})" for column in ROLLUP_COLUMNS)
+
+    cursor.execute("DELETE FROM daily_rollups")
+    cursor.execute(f"INSERT INTO daily_rollups (day, {columns}) {daily_rollups_from_history_sql()}")
+
+    # O mês é a soma dos seus dias.
+    cursor.execute("DELETE FROM monthly_rollups")
+    cursor.execute(f"""
+        INSERT INTO monthly_rollups (month, {columns})
+        SELECT substr(day, 1, 7), {sums} FROM daily_rollups GROUP BY substr(day, 1, 7)
+    """)
+
+
+def _migration_006_rollups(cursor):
+    cursor.execute("PRAGMA table_info(clients)")
+    if "created_at" not in [column["name"] for column in cursor.fetchall()]:
+        # Clientes antigos ficam sem data de cadastro e não entram em "novos clientes".
+        cursor.execute("ALTER TABLE clients ADD COLUMN created_at TIMESTAMP")
+
+    for table, key, _period_sql in ROLLUP_PERIODS:
+        cursor.execute(f"""
+            CREATE TABLE IF NOT EXISTS {table} (
+                {key} TEXT PRIMARY KEY,
+                sales_count INTEGER NOT NULL DEFAULT 0,
+                sales_amount INTEGER NOT NULL DEFAULT 0,
+                payments_count INTEGER NOT NULL DEFAULT 0,
+                payments_amount INTEGER NOT NULL DEFAULT 0,
+                new_clients INTEGER NOT NULL DEFAULT 0
+            ) WITHOUT ROWID
+        """)
+
+    _create_rollup_triggers(cursor)
+    rebuild_rollup_tables(cursor)
+
+
+MIGRATIONS = [
+    (1, _migration_001_ledger_indexes),
+    (2, _migration_002_client_balances),
+    (3, _migration_003_integer_cents),
+    (4, _migration_004_date_indexes),
+    (5, _migration_005_full_text_search),
+    (6, _migration_006_rollups),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def get_schema_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def init_db():
+    conn = get_connection()
+    current_version = get_schema_version(conn)
+    if current_version >= SCHEMA_VERSION:
+        return
+
+    cursor = conn.cursor()
+    try:
+        cursor.execute("BEGIN IMMEDIATE")
+        # Outra instância pode ter migrado o banco enquanto aguardávamos o lock.
+        current_version = get_schema_version(conn)
+
+        if current_version == 0:
+            _create_base_schema(cursor)
+
+        for version, migration in MIGRATIONS:
+            if version <= current_version:
+                continue
+            migration(cursor)
+            cursor.execute(f"PRAGMA user_version = {int(version)}")
+
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
@@ -1,8 +1,11 @@
 from datetime import datetime
 from pathlib import Path
 import shutil
+import sqlite3
 
-from database.connection import get_db_path
+from database.connection import close_all_connections, get_connection, get_db_path
+from database.writer import run_exclusive
+from services.events import publish_reload
 
 
 def create_startup_backup(max_files=7):
@@ -17,7 +20,14 @@ def create_startup_backup(max_files=7):
     backup_name = f"caderneta_backup_{timestamp}.db"
     backup_path = backup_dir / backup_name
 
-    shutil.copy2(db_path, backup_path)
+    # Com WAL, parte dos dados confirmados pode estar no arquivo -wal;
+    # a API de backup do SQLite gera uma cópia consistente do banco inteiro.
+    backup_conn = sqlite3.connect(str(backup_path))
+    try:
+        get_connection().backup(backup_conn)
+    finally:
+        backup_conn.close()
+
     _cleanup_old_backups(backup_dir, max_files=max_files)
 
     return backup_path
@@ -65,7 +75,20 @@ def restore_backup(backup_file_path):
     if not backup_path.exists():
         raise FileNotFoundError("Arquivo de backup não encontrado.")
 
+    # Roda no gravador: escritas já enfileiradas terminam antes e as seguintes
+    # só começam depois que o arquivo foi substituído.
+    db_path = run_exclusive(_replace_database, backup_path)
+    publish_reload()
+    return db_path
+
+
+def _replace_database(backup_path):
     db_path = get_db_path()
     db_path.parent.mkdir(parents=True, exist_ok=True)
+
+    close_all_connections()
+    for suffix in ("-wal", "-shm"):
+        Path(f"{db_path}{suffix}").unlink(missing_ok=True)
+
     shutil.copy2(backup_path, db_path)
     return db_path
@@ -0,0 +1,205 @@
+import argparse
+
+from database.connection import read_session
+from database.writer import run_write
+from models.init_db import (
+    ROLLUP_COLUMNS,
+    balances_from_history_sql,
+    daily_rollups_from_history_sql,
+    init_db,
+    ledger_totals_from_history_sql,
+    rebuild_balance_tables,
+    rebuild_rollup_tables,
+)
+
+def get_client_balances():
+    with read_session() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            """
+            SELECT
+                c.id AS client_id,
+                c.name AS client_name,
+                COALESCE(b.total_sold, 0) AS total_sold,
+                COALESCE(b.total_paid, 0) AS total_paid,
+                COALESCE(b.total_open, 0) AS total_open,
+                b.last_movement_at
+            FROM clients c
+            LEFT JOIN client_balances b ON b.client_id = c.id
+            ORDER BY total_open DESC, c.name ASC
+            """
+        )
+        rows = cursor.fetchall()
+    return rows
+
+
+def get_open_balances():
+    with read_session() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            """
+            SELECT c.id, c.name, b.total_open AS saldo
+            FROM client_balances b
+            INNER JOIN clients c ON c.id = b.client_id
+            WHERE b.total_open > 0
+            ORDER BY c.id ASC
+            """
+        )
+        rows = cursor.fetchall()
+    return rows
+
+
+def get_client_open_balance(client_id):
+    with read_session() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            """
+            SELECT c.id, c.name, COALESCE(b.total_open, 0) AS saldo
+            FROM clients c
+            LEFT JOIN client_balances b ON b.client_id = c.id
+            WHERE c.id = ?
+            """,
+            (client_id,),
+        )
+        row = cursor.fetchone()
+    return row
+
+
+def get_ledger_totals():
+    with read_session() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT total_clients, total_sold, total_paid FROM ledger_totals WHERE id = 1")
+        row = cursor.fetchone()
+
+    if row is None:
+        return {"total_clients": 0, "total_sold": 0, "total_paid": 0}
+    return dict(row)
+
+
+def rebuild_client_balances():
+    run_write(_rebuild_materialized_tables)
+
+
+def _rebuild_materialized_tables(cursor):
+    rebuild_balance_tables(cursor)
+    rebuild_rollup_tables(cursor)
+
+
+def verify_client_balances():
+    # Histórico e saldos materializados lidos no mesmo snapshot.
+    with read_session() as conn:
+        cursor = conn.cursor()
+
+        cursor.execute(
+            f"""
+            SELECT
+                expected.client_id,
+                expected.total_sold AS expected_sold,
+                expected.total_paid AS expected_paid,
+                expected.total_open AS expected_open,
+                b.total_sold AS stored_sold,
+                b.total_paid AS stored_paid,
+                b.total_open AS stored_open
+            FROM ({balances_from_history_sql()}) expected
+            LEFT JOIN client_balances b ON b.client_id = expected.client_id
+            """
+        )
+        expected_rows = cursor.fetchall()
+
+        cursor.execute("SELECT COUNT(*) AS total FROM client_balances")
+        stored_count = cursor.fetchone()["total"]
+
+        cursor.execute(f"SELECT * FROM ({ledger_totals_from_history_sql()})")
+        expected_totals = dict(cursor.fetchone())
+        stored_totals = get_ledger_totals()
+
+    mismatches = []
+    for row in expected_rows:
+        for field in ("sold", "paid", "open"):
+            stored = row[f"stored_{field}"]
+            expected = row[f"expected_{field}"]
+            if stored != expected:
+                mismatches.append(
+                    {
+                        "client_id": row["client_id"],
+                        "field": f"total_{field}",
+                        "expected": expected,
+                        "stored": stored,
+                    }
+                )
+
+    if stored_count != len(expected_rows):
+        mismatches.append(
+            {"client_id": None, "field": "row_count", "expected": len(expected_rows), "stored": stored_count}
+        )
+
+    for field, expected in expected_totals.items():
+        if stored_totals[field] != expected:
+            mismatches.append(
+                {"client_id": None, "field": field, "expected": expected, "stored": stored_totals[field]}
+            )
+
+    return mismatches
+
+
+def verify_rollups():
+    columns = ", ".join(ROLLUP_COLUMNS)
+    with read_session() as conn:
+        cursor = conn.cursor()
+        cursor.execute(f"SELECT day, {columns} FROM ({daily_rollups_from_history_sql()})")
+        expected_daily = {row["day"]: row for row in cursor.fetchall()}
+        cursor.execute(f"SELECT day, {columns} FROM daily_rollups")
+        stored_daily = {row["day"]: row for row in cursor.fetchall()}
+        cursor.execute(f"SELECT month, {columns} FROM monthly_rollups")
+        stored_monthly = {row["month"]: row for row in cursor.fetchall()}
+
+    expected_monthly = {}
+    for day, row in expected_daily.items():
+        totals = expected_monthly.setdefault(day[:7], dict.fromkeys(ROLLUP_COLUMNS, 0))
+        for column in ROLLUP_COLUMNS:
+            totals[column] += row[column]
+
+    mismatches = []
+    for expected_rows, stored_rows in ((expected_daily, stored_daily), (expected_monthly, stored_monthly)):
+        # Períodos zerados por exclusões continuam na tabela e não contam como divergência.
+        for period in sorted(set(expected_rows) | set(stored_rows)):
+            for column in ROLLUP_COLUMNS:
+                expected = expected_rows[period][column] if period in expected_rows else 0
+                stored = stored_rows[period][column] if period in stored_rows else 0
+                if expected != stored:
+                    mismatches.append({"period": period, "field": column, "expected": expected, "stored": stored})
+    return mismatches
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Verifica ou reconstrói os saldos por cliente e os resumos por período.")
+    parser.add_argument("--rebuild", action="store_true", help="recalcula saldos e resumos por período a partir do histórico")
+    args = parser.parse_args(argv)
+
+    init_db()
+
+    if args.rebuild:
+        rebuild_client_balances()
+        print("Saldos e resumos reconstruídos a partir do histórico.")
+
+    mismatches = verify_client_balances()
+    rollup_mismatches = verify_rollups()
+    if not mismatches and not rollup_mismatches:
+        print("Saldos e resumos por período consistentes com o histórico.")
+        return 0
+
+    for item in mismatches:
+        print(
+            f"Divergência cliente={item['client_id']} campo={item['field']} "
+            f"esperado={item['expected']} armazenado={item['stored']}"
+        )
+    for item in rollup_mismatches:
+        print(
+            f"Divergência período={item['period']} campo={item['field']} "
+            f"esperado={item['expected']} armazenado={item['stored']}"
+        )
+    return 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,243 @@
+import re
+import sys
+import threading
+import unicodedata
+from bisect import bisect_left, insort
+
+from services.client_service import get_all_clients, get_client
+from services.events import ENTITY_CLIENT, OPERATION_DELETE, OPERATION_RELOAD, subscribe
+
+DEFAULT_PREFIX_LIMIT = 20
+
+
+def fold_name(text):
+    # Mesma regra da busca FTS: sem acentos e sem diferenciar maiúsculas.
+    decomposed = unicodedata.normalize("NFKD", str(text or ""))
+    return "".join(char for char in decomposed if not unicodedata.combining(char)).casefold().strip()
+
+
+def digits_only(text):
+    return re.sub(r"\D", "", str(text or ""))
+
+
+def client_label(client):
+    return f"{client['name']} (#{client['id']})"
+
+
+class ClientRecord:
+    __slots__ = ("id", "name", "cpf", "phone", "credit_limit")
+
+    def __init__(self, row):
+        self.id = row["id"]
+        self.name = row["name"]
+        self.cpf = row["cpf"]
+        self.phone = row["phone"]
+        self.credit_limit = row["credit_limit"]
+
+    def __getitem__(self, key):
+        # Mesmo acesso por chave das linhas sqlite3.Row usadas pelas telas.
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def keys(self):
+        return list(self.__slots__)
+
+    @property
+    def label(self):
+        return client_label(self)
+
+
+class ClientDirectory:
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.loaded = False
+        self.by_id = {}
+        self.by_label = {}
+        self.ordered = []
+        self.name_index = []
+        self.cpf_index = []
+        self.loads = 0
+
+    def get(self, client_id):
+        self.ensure_loaded()
+        try:
+            return self.by_id.get(int(client_id))
+        except (TypeError, ValueError):
+            return None
+
+    def id_for_label(self, label):
+        self.ensure_loaded()
+        return self.by_label.get(label)
+
+    def label_for(self, client_id):
+        record = self.get(client_id)
+        return record.label if record is not None else None
+
+    def all(self):
+        self.ensure_loaded()
+        with self.lock:
+            return [self.by_id[client_id] for _name, client_id in self.ordered]
+
+    def labels(self):
+        return [record.label for record in self.all()]
+
+    def find_by_prefix(self, prefix, limit=DEFAULT_PREFIX_LIMIT):
+        self.ensure_loaded()
+        key = fold_name(prefix)
+        matches = []
+        with self.lock:
+            position = bisect_left(self.name_index, (key,))
+            while position < len(self.name_index) and len(matches) < limit:
+                folded, client_id = self.name_index[position]
+                if not folded.startswith(key):
+                    break
+                matches.append(self.by_id[client_id])
+                position += 1
+        return matches
+
+    def find_by_cpf_prefix(self, prefix, limit=DEFAULT_PREFIX_LIMIT):
+        self.ensure_loaded()
+        key = digits_only(prefix)
+        if not key:
+            return []
+        matches = []
+        with self.lock:
+            position = bisect_left(self.cpf_index, (key,))
+            while position < len(self.cpf_index) and len(matches) < limit:
+                cpf, client_id = self.cpf_index[position]
+                if not cpf.startswith(key):
+                    break
+                matches.append(self.by_id[client_id])
+                position += 1
+        return matches
+
+    def find(self, text, limit=DEFAULT_PREFIX_LIMIT):
+        # "#12" busca pelo id; só dígitos (com ou sem pontuação) buscam id e CPF; o resto, o nome.
+        text = str(text or "").strip()
+        if not text:
+            return []
+
+        id_match = re.fullmatch(r"#\s*(\d+)", text)
+        if id_match:
+            record = self.get(id_match.group(1))
+            return [record] if record is not None else []
+
+        if re.fullmatch(r"[\d.\-/ ]+", text):
+            matches = []
+            record = self.get(digits_only(text))
+            if record is not None:
+                matches.append(record)
+            for record in self.find_by_cpf_prefix(text, limit):
+                if len(matches) >= limit:
+                    break
+                if record not in matches:
+                    matches.append(record)
+            return matches
+
+        return self.find_by_prefix(text, limit)
+
+    def ensure_loaded(self):
+        if self.loaded:
+            return
+        with self.lock:
+            if self.loaded:
+                return
+            rows = get_all_clients()
+            self.by_id = {}
+            self.by_label = {}
+            self.ordered = []
+            self.name_index = []
+            self.cpf_index = []
+            for row in rows:
+                record = ClientRecord(row)
+                self.by_id[record.id] = record
+                self.by_label[record.label] = record.id
+                self.ordered.append((record.name, record.id))
+                self.name_index.append((fold_name(record.name), record.id))
+                if digits_only(record.cpf):
+                    self.cpf_index.append((digits_only(record.cpf), record.id))
+            # get_all_clients já vem ordenado por nome e id; os índices de busca não.
+            self.name_index.sort()
+            self.cpf_index.sort()
+            self.loaded = True
+            self.loads += 1
+
+    def invalidate(self):
+        with self.lock:
+            self.loaded = False
+            self.by_id = {}
+            self.by_label = {}
+            self.ordered = []
+            self.name_index = []
+            self.cpf_index = []
+
+    def apply_change(self, event):
+        if not self.loaded:
+            return
+        if event.operation == OPERATION_RELOAD:
+            self.invalidate()
+            return
+
+        with self.lock:
+            self._remove(event.entity_id)
+            if event.operation != OPERATION_DELETE:
+                row = get_client(event.entity_id)
+                if row is not None:
+                    self._add(ClientRecord(row))
+
+    def memory_stats(self):
+        with self.lock:
+            record_bytes = sum(
+                sys.getsizeof(record) + sum(sys.getsizeof(getattr(record, field)) for field in ClientRecord.__slots__)
+                for record in self.by_id.values()
+            )
+            label_bytes = sum(sys.getsizeof(label) for label in self.by_label)
+            index_bytes = sum(
+                sys.getsizeof(entry) + sys.getsizeof(entry[0]) for entry in self.name_index + self.cpf_index
+            )
+            container_bytes = (
+                sys.getsizeof(self.by_id)
+                + sys.getsizeof(self.by_label)
+                + sys.getsizeof(self.ordered)
+                + sys.getsizeof(self.name_index)
+                + sys.getsizeof(self.cpf_index)
+                + sum(sys.getsizeof(entry) for entry in self.ordered)
+            )
+            return {
+                "loaded": self.loaded,
+                "clients": len(self.by_id),
+                "loads": self.loads,
+                "approx_bytes": record_bytes + label_bytes + index_bytes + container_bytes,
+            }
+
+    def _add(self, record):
+        self.by_id[record.id] = record
+        self.by_label[record.label] = record.id
+        insort(self.ordered, (record.name, record.id))
+        insort(self.name_index, (fold_name(record.name), record.id))
+        if digits_only(record.cpf):
+            insort(self.cpf_index, (digits_only(record.cpf), record.id))
+
+    def _remove(self, client_id):
+        record = self.by_id.pop(client_id, None)
+        if record is None:
+            return
+        self.by_label.pop(record.label, None)
+        self._discard_sorted(self.ordered, (record.name, record.id))
+        self._discard_sorted(self.name_index, (fold_name(record.name), record.id))
+        self._discard_sorted(self.cpf_index, (digits_only(record.cpf), record.id))
+
+    def _discard_sorted(self, entries, key):
+        position = bisect_left(entries, key)
+        if position < len(entries) and entries[position] == key:
+            del entries[position]
+
+
+client_directory = ClientDirectory()
+
+# Assina na importação do módulo para ser atualizado antes das telas, que
+# consultam o diretório ao receber o mesmo evento.
+subscribe(client_directory.apply_change, (ENTITY_CLIENT,))
@@ -1,4 +1,17 @@
+from database.bulk import DEFAULT_CHUNK_SIZE, insert_rows, row_values, validate_rows
 from database.connection import get_connection
+from database.writer import run_write
+from services.events import (
+    ENTITY_CLIENT,
+    OPERATION_DELETE,
+    OPERATION_INSERT,
+    OPERATION_UPDATE,
+    publish,
+    publish_reload,
+)
+from services.money import Money, parse_amount_cents
+
+CLIENT_FIELDS = ("name", "cpf", "phone", "credit_limit")
 
 def get_all_clients():
     conn = get_connection()
@@ -8,46 +21,78 @@ def get_all_clients():
     conn.close()
     return rows
 
-def create_client(name, cpf, phone, credit_limit):
+def get_client(client_id):
     conn = get_connection()
     cursor = conn.cursor()
+    cursor.execute("SELECT * FROM clients WHERE id = ?", (client_id,))
+    row = cursor.fetchone()
+    conn.close()
+    return row
+
+def create_client(name, cpf, phone, credit_limit):
+    client_id = run_write(_insert_client, name, cpf, phone, Money.coerce(credit_limit))
+    publish(ENTITY_CLIENT, OPERATION_INSERT, client_id, client_id)
+    return client_id
+
+def _insert_client(cursor, name, cpf, phone, credit_limit):
     cursor.execute(
         "INSERT INTO clients (name, cpf, phone, credit_limit) VALUES (?, ?, ?, ?)",
         (name, cpf, phone, credit_limit)
     )
-    conn.commit()
-    conn.close()
+    return cursor.lastrowid
+
+def _validate_client_row(row):
+    name, cpf, phone, credit_limit = row_values(row, CLIENT_FIELDS, 1)
+
+    name = str(name or "").strip()
+    if not name:
+        raise ValueError("informe o nome do cliente")
+
+    return name, cpf, phone, parse_amount_cents(Money(0) if credit_limit is None else credit_limit)
+
+def create_clients_bulk(clients, chunk_size=DEFAULT_CHUNK_SIZE):
+    rows = validate_rows(clients, _validate_client_row)
+    ids = insert_rows("clients", CLIENT_FIELDS, rows, chunk_size=chunk_size)
+    if ids:
+        publish_reload(ENTITY_CLIENT)
+    return ids
 
 def update_client(client_id, name, cpf, phone, credit_limit):
-    conn = get_connection()
-    cursor = conn.cursor()
+    run_write(_update_client, client_id, name, cpf, phone, Money.coerce(credit_limit))
+    publish(ENTITY_CLIENT, OPERATION_UPDATE, client_id, client_id)
+
+def _update_client(cursor, client_id, name, cpf, phone, credit_limit):
     cursor.execute(
         "UPDATE clients SET name = ?, cpf = ?, phone = ?, credit_limit = ? WHERE id = ?",
         (name, cpf, phone, credit_limit, client_id)
     )
-    conn.commit()
-    conn.close()
 
 def client_has_related_records(client_id):
     conn = get_connection()
     cursor = conn.cursor()
+    has_records = _has_related_records(cursor, client_id)
+    conn.close()
+    return has_records
 
+def _has_related_records(cursor, client_id):
     cursor.execute("SELECT COUNT(1) AS total FROM payments WHERE client_id = ?", (client_id,))
     payments_count = cursor.fetchone()["total"]
 
     cursor.execute("SELECT COUNT(1) AS total FROM sales WHERE client_id = ?", (client_id,))
     sales_count = cursor.fetchone()["total"]
 
-    conn.close()
     return (payments_count + sales_count) > 0
 
 def delete_client(client_id):
-    if client_has_related_records(client_id):
+    was_deleted = run_write(_delete_client, client_id)
+    if was_deleted:
+        publish(ENTITY_CLIENT, OPERATION_DELETE, client_id, client_id)
+    return was_deleted
+
+def _delete_client(cursor, client_id):
+    # Verificação e exclusão na mesma transação do gravador.
+    if _has_related_records(cursor, client_id):
         return False
 
-    conn = get_connection()
-    cursor = conn.cursor()
     cursor.execute("DELETE FROM clients WHERE id = ?", (client_id,))
-    conn.commit()
-    conn.close()
     return True
@@ -1,25 +1,89 @@
-from database.connection import get_connection
+from datetime import datetime, timezone
 
-def get_dashboard_data():
-    conn = get_connection()
-    cursor = conn.cursor()
+from database.connection import read_session
+from services.balance_service import get_ledger_totals
 
-    cursor.execute("SELECT COUNT(*) as total FROM clients")
-    total_clients = cursor.fetchone()["total"]
+PERIOD_TODAY = "today"
+PERIOD_MONTH = "month"
+PERIOD_LAST_12_MONTHS = "12_months"
+DEFAULT_PERIOD = PERIOD_MONTH
+TREND_MONTHS = 12
 
-    cursor.execute("SELECT COALESCE(SUM(amount),0) as total FROM sales")
-    total_sales = cursor.fetchone()["total"]
+ROLLUP_FIELDS = ("sales_count", "sales_amount", "payments_count", "payments_amount", "new_clients")
 
-    cursor.execute("SELECT COALESCE(SUM(amount),0) as total FROM payments")
-    total_paid = cursor.fetchone()["total"]
+def get_dashboard_data(period=DEFAULT_PERIOD):
+    with read_session():
+        totals = get_ledger_totals()
+        summary = get_period_summary(period)
+        trend = get_monthly_trend()
 
+    total_clients = totals["total_clients"]
+    total_sales = totals["total_sold"]
+    total_paid = totals["total_paid"]
     total_open = total_sales - total_paid
 
-    conn.close()
-
     return {
         "total_clients": total_clients,
         "total_sales": total_sales,
         "total_paid": total_paid,
-        "total_open": total_open
+        "total_open": total_open,
+        "period": period,
+        "period_summary": summary,
+        "trend": trend,
     }
+
+
+def get_period_summary(period=DEFAULT_PERIOD):
+    # As datas são gravadas com CURRENT_TIMESTAMP (UTC); os períodos seguem a mesma referência.
+    if period == PERIOD_TODAY:
+        sql = f"SELECT {', '.join(ROLLUP_FIELDS)} FROM daily_rollups WHERE day = date('now')"
+    elif period == PERIOD_MONTH:
+        sql = f"SELECT {', '.join(ROLLUP_FIELDS)} FROM monthly_rollups WHERE month = strftime('%Y-%m', 'now')"
+    elif period == PERIOD_LAST_12_MONTHS:
+        sums = ", ".join(f"COALESCE(SUM({field}), 0) AS {field}" for field in ROLLUP_FIELDS)
+        sql = (
+            f"SELECT {sums} FROM monthly_rollups "
+            f"WHERE month >= strftime('%Y-%m', 'now', 'start of month', '-{TREND_MONTHS - 1} months')"
+        )
+    else:
+        raise ValueError(f"Período inválido: {period}")
+
+    with read_session() as conn:
+        cursor = conn.cursor()
+        cursor.execute(sql)
+        row = cursor.fetchone()
+
+    if row is None:
+        return dict.fromkeys(ROLLUP_FIELDS, 0)
+    return dict(row)
+
+
+def get_monthly_trend(months=TREND_MONTHS):
+    month_keys = _last_month_keys(months)
+
+    with read_session() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT month, sales_amount, payments_amount FROM monthly_rollups WHERE month >= ? ORDER BY month ASC",
+            (month_keys[0],),
+        )
+        rows = {row["month"]: row for row in cursor.fetchall()}
+
+    # Meses sem movimento não têm linha no resumo e aparecem zerados no gráfico.
+    return [
+        {
+            "month": key,
+            "sales_amount": rows[key]["sales_amount"] if key in rows else 0,
+            "payments_amount": rows[key]["payments_amount"] if key in rows else 0,
+        }
+        for key in month_keys
+    ]
+
+
+def _last_month_keys(months):
+    now = datetime.now(timezone.utc)
+    month_index = now.year * 12 + now.month - 1
+    return [
+        f"{index // 12:04d}-{index % 12 + 1:02d}"
+        for index in range(month_index - months + 1, month_index + 1)
+    ]
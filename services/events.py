@@ -0,0 +1,86 @@
+import threading
+import traceback
+from collections import namedtuple
+from contextlib import contextmanager
+
+ENTITY_CLIENT = "client"
+ENTITY_SALE = "sale"
+ENTITY_PAYMENT = "payment"
+
+OPERATION_INSERT = "insert"
+OPERATION_UPDATE = "update"
+OPERATION_DELETE = "delete"
+# Mudança em massa (importação, restauração): quem assina deve recarregar tudo.
+OPERATION_RELOAD = "reload"
+
+ChangeEvent = namedtuple("ChangeEvent", ("entity", "operation", "entity_id", "client_id"))
+
+_subscribers = {}
+_subscribers_lock = threading.Lock()
+_next_token = 0
+_local = threading.local()
+
+
+def subscribe(callback, entities=None):
+    global _next_token
+
+    with _subscribers_lock:
+        _next_token += 1
+        token = _next_token
+        _subscribers[token] = (callback, frozenset(entities) if entities else None)
+
+    def unsubscribe():
+        with _subscribers_lock:
+            _subscribers.pop(token, None)
+
+    return unsubscribe
+
+
+def publish(entity, operation, entity_id=None, client_id=None):
+    event = ChangeEvent(entity, operation, entity_id, client_id)
+
+    pending = getattr(_local, "pending", None)
+    if pending is not None:
+        if event not in pending:
+            pending.append(event)
+        return event
+
+    _dispatch(event)
+    return event
+
+
+def _dispatch(event):
+    entity = event.entity
+    with _subscribers_lock:
+        subscribers = list(_subscribers.values())
+
+    # Chamado depois do commit, na thread de quem gravou.
+    for callback, entities in subscribers:
+        if entity is None or entities is None or entity in entities:
+            # A gravação já foi confirmada; um assinante com erro não pode desfazê-la.
+            try:
+                callback(event)
+            except Exception:
+                traceback.print_exc()
+
+
+def publish_reload(entity=None):
+    return publish(entity, OPERATION_RELOAD)
+
+
+@contextmanager
+def batched_events():
+    # Agrupa os eventos da thread (ex.: lotes de uma importação) e publica cada
+    # evento distinto uma única vez ao final.
+    if getattr(_local, "pending", None) is not None:
+        yield
+        return
+
+    _local.pending = []
+    try:
+        yield
+    finally:
+        pending = _local.pending
+        _local.pending = None
+        for event in pending:
+            _dispatch(event)
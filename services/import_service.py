@@ -0,0 +1,305 @@
+import csv
+from pathlib import Path
+
+from database.bulk import BulkValidationError, normalize_timestamp
+from database.connection import get_connection
+from services.client_service import create_clients_bulk
+from services.events import batched_events
+from services.payment_service import create_payments_bulk
+from services.sale_service import create_sales_bulk
+from services.validators import only_digits, parse_money_text, validate_client_fields
+
+DEFAULT_BATCH_SIZE = 1000
+PROGRESS_EVERY_ROWS = 500
+
+COLUMN_ALIASES = {
+    "name": ("nome", "name", "cliente"),
+    "cpf": ("cpf",),
+    "phone": ("telefone", "phone", "celular"),
+    "credit_limit": ("limite", "limite_credito", "limite de crédito", "limite de credito", "credit_limit"),
+    "description": ("descricao", "descrição", "description"),
+    "amount": ("valor", "amount"),
+    "date": ("data", "date"),
+}
+
+
+class ImportCancelled(Exception):
+    pass
+
+
+def import_clients_csv(path, **options):
+    return _run_import(path, _ClientsImport(), **options)
+
+
+def import_sales_csv(path, **options):
+    return _run_import(path, _SalesImport(), **options)
+
+
+def import_payments_csv(path, **options):
+    return _run_import(path, _PaymentsImport(), **options)
+
+
+class _ClientsImport:
+    required_columns = ("name", "cpf", "phone", "credit_limit")
+
+    def start(self, cpf_index):
+        self.cpf_index = cpf_index
+
+    def normalize(self, record):
+        name, cpf, phone, credit_limit = validate_client_fields(
+            record.get("name"),
+            record.get("cpf"),
+            record.get("phone"),
+            record.get("credit_limit"),
+            # Planilhas exportadas trazem o limite como "1.000,00" ou "R$ 50,00".
+            parse_limit=parse_money_text,
+        )
+        if cpf in self.cpf_index:
+            raise ValueError(f"CPF {cpf} já cadastrado.")
+        self.cpf_index[cpf] = None
+        return name, cpf, phone, credit_limit
+
+    def insert(self, rows):
+        ids = create_clients_bulk(rows)
+        for row, client_id in zip(rows, ids):
+            self.cpf_index[row[1]] = client_id
+        return ids
+
+    def discard(self, rows):
+        for row in rows:
+            self.cpf_index.pop(row[1], None)
+
+
+class _SalesImport:
+    required_columns = ("cpf", "description", "amount")
+
+    def start(self, cpf_index):
+        self.cpf_index = cpf_index
+
+    def normalize(self, record):
+        client_id = _resolve_client(self.cpf_index, record.get("cpf"))
+
+        description = str(record.get("description") or "").strip()
+        if not description:
+            raise ValueError("informe a descrição da venda.")
+
+        return client_id, description, _parse_amount(record.get("amount")), normalize_timestamp(record.get("date"))
+
+    def insert(self, rows):
+        return create_sales_bulk(rows)
+
+    def discard(self, rows):
+        pass
+
+
+class _PaymentsImport:
+    required_columns = ("cpf", "amount")
+
+    def start(self, cpf_index):
+        self.cpf_index = cpf_index
+
+    def normalize(self, record):
+        client_id = _resolve_client(self.cpf_index, record.get("cpf"))
+        return client_id, _parse_amount(record.get("amount")), normalize_timestamp(record.get("date"))
+
+    def insert(self, rows):
+        return create_payments_bulk(rows)
+
+    def discard(self, rows):
+        pass
+
+
+def _resolve_client(cpf_index, raw_cpf):
+    cpf = only_digits(raw_cpf)
+    if len(cpf) != 11:
+        raise ValueError("CPF inválido. Informe 11 números.")
+
+    client_id = cpf_index.get(cpf)
+    if client_id is None:
+        raise ValueError(f"cliente com CPF {cpf} não encontrado.")
+    return client_id
+
+
+def _parse_amount(raw_amount):
+    try:
+        return parse_money_text(raw_amount)
+    except ValueError:
+        raise ValueError("valor inválido. Use até 2 casas decimais.") from None
+
+
+def _load_cpf_index():
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute("SELECT id, cpf FROM clients WHERE cpf IS NOT NULL AND cpf != '' ORDER BY id ASC")
+
+    cpf_index = {}
+    for row in cursor:
+        cpf_index.setdefault(only_digits(row["cpf"]), row["id"])
+
+    conn.close()
+    return cpf_index
+
+
+def _read_lines(file, counter):
+    for line in file:
+        counter["bytes"] += len(line.encode("utf-8"))
+        yield line
+
+
+def _detect_delimiter(header_line):
+    return ";" if header_line.count(";") > header_line.count(",") else ","
+
+
+def _map_header(header):
+    mapping = {}
+    for position, raw_name in enumerate(header):
+        name = raw_name.strip().lower()
+        for field, aliases in COLUMN_ALIASES.items():
+            if name in aliases and field not in mapping:
+                mapping[field] = position
+    return mapping
+
+
+def _parse_records(reader, mapping):
+    for line_number, values in enumerate(reader, start=2):
+        if not any(value.strip() for value in values):
+            continue
+        record = {
+            field: values[position] if position < len(values) else ""
+            for field, position in mapping.items()
+        }
+        yield line_number, values, record
+
+
+def _normalize_records(records, importer, report):
+    for line_number, values, record in records:
+        try:
+            yield line_number, values, importer.normalize(record)
+        except ValueError as exc:
+            report.add(line_number, str(exc), values)
+
+
+def _batches(items, batch_size):
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class _ErrorReport:
+
+    def __init__(self, path, delimiter):
+        self.path = Path(path)
+        self.delimiter = delimiter
+        self.count = 0
+        self._file = None
+        self._writer = None
+
+    def add(self, line_number, message, values):
+        if self._writer is None:
+            self._file = open(self.path, "w", encoding="utf-8-sig", newline="")
+            self._writer = csv.writer(self._file, delimiter=self.delimiter)
+            self._writer.writerow(["linha", "erro", "conteudo"])
+        self._writer.writerow([line_number, message, self.delimiter.join(values)])
+        self.count += 1
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+
+def _insert_batch(importer, batch, report):
+    rows = [row for _line, _values, row in batch]
+    try:
+        importer.insert(rows)
+        return len(rows)
+    except BulkValidationError as exc:
+        importer.discard(rows)
+        rejected = {index for index, _message in exc.errors}
+        for index, message in exc.errors:
+            line_number, values, _row = batch[index]
+            report.add(line_number, message, values)
+
+    # O lote é atômico: reenvia apenas as linhas que passaram na validação.
+    remaining = [item for index, item in enumerate(batch) if index not in rejected]
+    if not remaining:
+        return 0
+    return _insert_batch(importer, remaining, report)
+
+
+def _run_import(
+    path,
+    importer,
+    dry_run=False,
+    batch_size=DEFAULT_BATCH_SIZE,
+    error_report_path=None,
+    progress_callback=None,
+    encoding="utf-8-sig",
+):
+    source_path = Path(path)
+    if not source_path.exists():
+        raise FileNotFoundError("Arquivo CSV não encontrado.")
+
+    total_bytes = source_path.stat().st_size
+    report_path = error_report_path or source_path.with_name(f"{source_path.stem}_erros.csv")
+    counter = {"bytes": 0}
+    result = {
+        "processed": 0,
+        "imported": 0,
+        "errors": 0,
+        "dry_run": dry_run,
+        "error_report_path": None,
+        "cancelled": False,
+    }
+
+    def notify():
+        if progress_callback is not None and progress_callback(result["processed"], counter["bytes"], total_bytes) is False:
+            raise ImportCancelled()
+
+    with open(source_path, "r", encoding=encoding, newline="") as source:
+        lines = _read_lines(source, counter)
+        header_line = next(lines, "")
+        delimiter = _detect_delimiter(header_line)
+        header = next(csv.reader([header_line], delimiter=delimiter), [])
+        mapping = _map_header(header)
+
+        missing = [field for field in importer.required_columns if field not in mapping]
+        if missing:
+            raise ValueError(f"Colunas obrigatórias ausentes no CSV: {', '.join(missing)}")
+
+        importer.start(_load_cpf_index())
+        report = _ErrorReport(report_path, delimiter)
+        records = _parse_records(csv.reader(lines, delimiter=delimiter), mapping)
+
+        def counted(items):
+            for item in items:
+                result["processed"] += 1
+                if result["processed"] % PROGRESS_EVERY_ROWS == 0:
+                    notify()
+                yield item
+
+        try:
+            # Os lotes gravados viram um único evento de recarga ao final.
+            with batched_events():
+                for batch in _batches(_normalize_records(counted(records), importer, report), batch_size):
+                    if dry_run:
+                        result["imported"] += len(batch)
+                        continue
+
+                    result["imported"] += _insert_batch(importer, batch, report)
+        except ImportCancelled:
+            result["cancelled"] = True
+        finally:
+            report.close()
+
+    if progress_callback is not None and not result["cancelled"]:
+        progress_callback(result["processed"], total_bytes, total_bytes)
+
+    result["errors"] = report.count
+    if report.count:
+        result["error_report_path"] = str(report.path)
+    return result
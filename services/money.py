@@ -0,0 +1,109 @@
+import re
+import sqlite3
+from decimal import Decimal, ROUND_HALF_UP
+
+MONEY_INPUT_PATTERN = re.compile(r"\d+(?:[\.,]\d{1,2})?")
+
+
+class Money:
+    __slots__ = ("cents",)
+
+    def __init__(self, cents=0):
+        self.cents = int(cents)
+
+    @classmethod
+    def from_cents(cls, cents):
+        return cls(cents or 0)
+
+    @classmethod
+    def from_input(cls, text):
+        raw_value = str(text or "").strip()
+        if not MONEY_INPUT_PATTERN.fullmatch(raw_value):
+            raise ValueError(f"Valor monetário inválido: {text!r}")
+
+        whole, _, fraction = raw_value.replace(",", ".").partition(".")
+        return cls(int(whole) * 100 + int(fraction.ljust(2, "0")))
+
+    @classmethod
+    def from_reais(cls, value):
+        amount = Decimal(str(value)).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+        return cls(int(amount * 100))
+
+    @classmethod
+    def coerce(cls, value):
+        # Números soltos vêm da API antiga, que recebia reais em float.
+        if isinstance(value, Money):
+            return value
+        if isinstance(value, str):
+            return cls.from_input(value)
+        if value is None:
+            return cls(0)
+        return cls.from_reais(value)
+
+    def to_decimal(self):
+        return Decimal(self.cents) / 100
+
+    def format(self):
+        sign = "-" if self.cents < 0 else ""
+        reais, cents = divmod(abs(self.cents), 100)
+        return f"{sign}R$ {reais:,}".replace(",", ".") + f",{cents:02d}"
+
+    def __str__(self):
+        return self.format()
+
+    def __repr__(self):
+        return f"Money({self.cents})"
+
+    def __int__(self):
+        return self.cents
+
+    def __bool__(self):
+        return self.cents != 0
+
+    def __eq__(self, other):
+        if isinstance(other, Money):
+            return self.cents == other.cents
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self.cents)
+
+    def __lt__(self, other):
+        if isinstance(other, Money):
+            return self.cents < other.cents
+        return NotImplemented
+
+    def __le__(self, other):
+        if isinstance(other, Money):
+            return self.cents <= other.cents
+        return NotImplemented
+
+    def __add__(self, other):
+        if isinstance(other, Money):
+            return Money(self.cents + other.cents)
+        return NotImplemented
+
+    def __sub__(self, other):
+        if isinstance(other, Money):
+            return Money(self.cents - other.cents)
+        return NotImplemented
+
+    def __neg__(self):
+        return Money(-self.cents)
+
+
+def parse_amount_cents(value):
+    # As APIs em lote não aceitam números soltos: Money.coerce leria um int como
+    # reais, e um valor já em centavos seria gravado 100 vezes maior.
+    if not isinstance(value, Money):
+        raise ValueError(f"valor deve ser Money (use Money.from_cents para centavos): {value!r}")
+    if value.cents < 0:
+        raise ValueError("o valor não pode ser negativo")
+    return value.cents
+
+
+def format_currency(cents):
+    return Money.from_cents(cents).format()
+
+
+sqlite3.register_adapter(Money, lambda money: money.cents)
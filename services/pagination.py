@@ -0,0 +1,68 @@
+from datetime import datetime
+
+from database.bulk import normalize_timestamp
+from services.money import Money
+
+DEFAULT_PAGE_SIZE = 200
+MAX_PAGE_SIZE = 2000
+
+
+def clamp_page_size(limit):
+    return max(1, min(int(limit or DEFAULT_PAGE_SIZE), MAX_PAGE_SIZE))
+
+
+def normalize_filters(client_id=None, date_from=None, date_to=None, min_amount=None, max_amount=None):
+    # Campo vazio do formulário vale como filtro ausente, igual em todas as funções.
+    values = (client_id, date_from, date_to, min_amount, max_amount)
+    return tuple(None if isinstance(value, str) and not value.strip() else value for value in values)
+
+
+def has_filters(client_id=None, date_from=None, date_to=None, min_amount=None, max_amount=None):
+    return any(value is not None for value in normalize_filters(client_id, date_from, date_to, min_amount, max_amount))
+
+
+def build_ledger_filters(alias, client_id=None, date_from=None, date_to=None, min_amount=None, max_amount=None):
+    client_id, date_from, date_to, min_amount, max_amount = normalize_filters(
+        client_id, date_from, date_to, min_amount, max_amount
+    )
+    clauses = []
+    params = []
+
+    if client_id is not None:
+        clauses.append(f"{alias}.client_id = ?")
+        params.append(int(client_id))
+
+    if date_from is not None:
+        clauses.append(f"{alias}.date >= ?")
+        params.append(normalize_timestamp(date_from))
+
+    if date_to is not None:
+        clauses.append(f"{alias}.date <= ?")
+        params.append(_end_of_day(date_to))
+
+    if min_amount is not None:
+        clauses.append(f"{alias}.amount >= ?")
+        params.append(Money.coerce(min_amount).cents)
+
+    if max_amount is not None:
+        clauses.append(f"{alias}.amount <= ?")
+        params.append(Money.coerce(max_amount).cents)
+
+    return clauses, params
+
+
+def where_sql(clauses):
+    return f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+
+def ledger_from_sql(table, alias, clauses):
+    # Mesmo FROM/WHERE para a página e o resumo: os totais batem com as linhas listadas.
+    return f"FROM {table} {alias} INNER JOIN clients c ON c.id = {alias}.client_id {where_sql(clauses)}"
+
+
+def _end_of_day(value):
+    normalized = normalize_timestamp(value)
+    # Uma data sem horário inclui o dia inteiro.
+    if isinstance(value, datetime) or (isinstance(value, str) and len(value.strip()) > 10):
+        return normalized
+    return f"{normalized[:10]} 23:59:59"
@@ -1,11 +1,62 @@
+from database.bulk import (
+    DEFAULT_CHUNK_SIZE,
+    insert_rows,
+    normalize_timestamp,
+    parse_client_id,
+    require_existing_clients,
+    row_values,
+    validate_rows,
+)
 from database.connection import get_connection
+from database.writer import run_write
+from services.events import ENTITY_PAYMENT, OPERATION_INSERT, publish, publish_reload
+from services.money import Money, parse_amount_cents
+from services.pagination import DEFAULT_PAGE_SIZE, build_ledger_filters, clamp_page_size, has_filters, ledger_from_sql
+
+PAYMENT_FIELDS = ("client_id", "amount", "date")
 
 def create_payment(client_id, amount):
+    payment_id = run_write(_insert_payment, client_id, Money.coerce(amount))
+    publish(ENTITY_PAYMENT, OPERATION_INSERT, payment_id, client_id)
+    return payment_id
+
+def _insert_payment(cursor, client_id, amount):
+    cursor.execute("INSERT INTO payments (client_id, amount) VALUES (?, ?)", (client_id, amount))
+    return cursor.lastrowid
+
+def _validate_payment_row(row):
+    client_id, amount, date = row_values(row, PAYMENT_FIELDS, 2)
+    return parse_client_id(client_id), parse_amount_cents(amount), normalize_timestamp(date)
+
+def create_payments_bulk(payments, chunk_size=DEFAULT_CHUNK_SIZE):
+    rows = validate_rows(payments, _validate_payment_row, client_index=0)
+    ids = insert_rows(
+        "payments",
+        PAYMENT_FIELDS,
+        rows,
+        chunk_size=chunk_size,
+        value_sql="?, ?, COALESCE(?, CURRENT_TIMESTAMP)",
+        before_insert=require_existing_clients(rows),
+    )
+    if ids:
+        publish_reload(ENTITY_PAYMENT)
+    return ids
+
+def get_payment(payment_id):
     conn = get_connection()
     cursor = conn.cursor()
-    cursor.execute("INSERT INTO payments (client_id, amount) VALUES (?, ?)", (client_id, amount))
-    conn.commit()
+    cursor.execute(
+        """
+        SELECT p.id, p.client_id, c.name AS client_name, p.amount, p.date
+        FROM payments p
+        INNER JOIN clients c ON c.id = p.client_id
+        WHERE p.id = ?
+        """,
+        (payment_id,),
+    )
+    row = cursor.fetchone()
     conn.close()
+    return row
 
 def get_all_payments():
     conn = get_connection()
@@ -21,3 +72,56 @@ def get_all_payments():
     rows = cursor.fetchall()
     conn.close()
     return rows
+
+def get_payments_page(
+    before_id=None,
+    limit=DEFAULT_PAGE_SIZE,
+    client_id=None,
+    date_from=None,
+    date_to=None,
+    min_amount=None,
+    max_amount=None,
+):
+    clauses, params = build_ledger_filters("p", client_id, date_from, date_to, min_amount, max_amount)
+    if before_id is not None:
+        clauses.append("p.id < ?")
+        params.append(int(before_id))
+
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute(
+        f"""
+        SELECT p.id, p.client_id, c.name AS client_name, p.amount, p.date
+        {ledger_from_sql("payments", "p", clauses)}
+        ORDER BY p.id DESC
+        LIMIT ?
+        """,
+        (*params, clamp_page_size(limit)),
+    )
+    rows = cursor.fetchall()
+    conn.close()
+    return rows
+
+def get_payments_summary(client_id=None, date_from=None, date_to=None, min_amount=None, max_amount=None):
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    if not has_filters(client_id, date_from, date_to, min_amount, max_amount):
+        cursor.execute(f"SELECT COUNT(*) AS total_count {ledger_from_sql('payments', 'p', [])}")
+        total_count = cursor.fetchone()["total_count"]
+        cursor.execute("SELECT total_paid AS total_amount FROM ledger_totals WHERE id = 1")
+        row = cursor.fetchone()
+        conn.close()
+        return {"total_count": total_count, "total_amount": row["total_amount"] if row else 0}
+
+    clauses, params = build_ledger_filters("p", client_id, date_from, date_to, min_amount, max_amount)
+    cursor.execute(
+        f"""
+        SELECT COUNT(*) AS total_count, COALESCE(SUM(p.amount), 0) AS total_amount
+        {ledger_from_sql("payments", "p", clauses)}
+        """,
+        params,
+    )
+    row = cursor.fetchone()
+    conn.close()
+    return dict(row)
@@ -2,13 +2,17 @@ from datetime import datetime
 from pathlib import Path
 import re
 
-from database.connection import get_connection, get_db_path
+from database.connection import get_db_path, read_session
+from services.balance_service import get_client_balances
 from services.dashboard_service import get_dashboard_data
+from services.money import Money
 
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+# O reportlab é importado dentro das funções que montam o PDF: ele sozinho pesa
+# boa parte da abertura do app e só é necessário na primeira exportação.
+
+# Tabelas muito longas são divididas em blocos: o reportlab quebra uma tabela
+# gigante página a página recalculando o restante, o que cresce de forma quadrática.
+TABLE_CHUNK_ROWS = 500
 
 
 def _reports_dir():
@@ -24,7 +28,9 @@ def _timestamp():
 
 
 def _format_currency(amount):
-    return f"R$ {amount:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+    if not isinstance(amount, Money):
+        amount = Money.from_cents(amount)
+    return amount.format()
 
 
 def _sanitize_filename(text):
@@ -41,6 +47,9 @@ def _format_cpf(value):
 
 
 def _base_table_style():
+    from reportlab.lib import colors
+    from reportlab.platypus import TableStyle
+
     return TableStyle(
         [
             ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#E5E7EB")),
@@ -56,8 +65,26 @@ def _base_table_style():
     )
 
 
+def _chunked_tables(table_data, col_widths):
+    from reportlab.platypus import Table
+
+    header, rows = table_data[0], table_data[1:]
+    tables = []
+    # Blocos de tamanho par mantêm o zebrado contínuo entre um bloco e outro.
+    for offset in range(0, max(len(rows), 1), TABLE_CHUNK_ROWS):
+        table = Table([header] + rows[offset:offset + TABLE_CHUNK_ROWS], colWidths=col_widths, repeatRows=1)
+        table.setStyle(_base_table_style())
+        tables.append(table)
+    return tables
+
+
 def export_financial_position_pdf():
-    data = get_dashboard_data()
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table
+
+    with read_session():
+        data = get_dashboard_data()
 
     report_path = _reports_dir() / f"posicao_financeira_{_timestamp()}.pdf"
     doc = SimpleDocTemplate(str(report_path), pagesize=A4)
@@ -87,29 +114,15 @@ def export_financial_position_pdf():
 
 
 def _get_balances_data():
-    conn = get_connection()
-    cursor = conn.cursor()
-
-    cursor.execute(
-        """
-        SELECT
-            c.id AS client_id,
-            c.name AS client_name,
-            COALESCE((SELECT SUM(s.amount) FROM sales s WHERE s.client_id = c.id), 0) AS total_sold,
-            COALESCE((SELECT SUM(p.amount) FROM payments p WHERE p.client_id = c.id), 0) AS total_paid,
-            COALESCE((SELECT SUM(s.amount) FROM sales s WHERE s.client_id = c.id), 0)
-            - COALESCE((SELECT SUM(p.amount) FROM payments p WHERE p.client_id = c.id), 0) AS total_open
-        FROM clients c
-        ORDER BY total_open DESC, c.name ASC
-        """
-    )
-
-    rows = cursor.fetchall()
-    conn.close()
-    return rows
+    with read_session():
+        return get_client_balances()
 
 
 def export_balances_pdf():
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer
+
     rows = _get_balances_data()
 
     report_path = _reports_dir() / f"saldos_clientes_{_timestamp()}.pdf"
@@ -135,53 +148,55 @@ def export_balances_pdf():
             ]
         )
 
-    table = Table(table_data, colWidths=[190, 110, 110, 110])
-    table.setStyle(_base_table_style())
-    elements.append(table)
+    elements.extend(_chunked_tables(table_data, [190, 110, 110, 110]))
 
     doc.build(elements)
     return str(report_path)
 
 
 def _get_client_statement_data(client_id):
-    conn = get_connection()
-    cursor = conn.cursor()
-
-    cursor.execute(
-        """
-        SELECT id, amount, date, 'Venda' AS entry_type
-        FROM sales
-        WHERE client_id = ?
-        UNION ALL
-        SELECT id, amount, date, 'Pagamento' AS entry_type
-        FROM payments
-        WHERE client_id = ?
-        ORDER BY date ASC, id ASC
-        """,
-        (client_id, client_id),
-    )
+    with read_session() as conn:
+        cursor = conn.cursor()
+
+        cursor.execute(
+            """
+            SELECT id, amount, date, 'Venda' AS entry_type
+            FROM sales
+            WHERE client_id = ?
+            UNION ALL
+            SELECT id, amount, date, 'Pagamento' AS entry_type
+            FROM payments
+            WHERE client_id = ?
+            ORDER BY date ASC, id ASC
+            """,
+            (client_id, client_id),
+        )
 
-    rows = cursor.fetchall()
-    conn.close()
+        rows = cursor.fetchall()
     return rows
 
 
 def _get_client_basic_data(client_id):
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT name, cpf FROM clients WHERE id = ?", (client_id,))
-    row = cursor.fetchone()
-    conn.close()
+    with read_session() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT name, cpf FROM clients WHERE id = ?", (client_id,))
+        row = cursor.fetchone()
     return row
 
 
 def export_client_statement_pdf(client_id, client_name):
-    client_data = _get_client_basic_data(client_id)
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer
+
+    # Cadastro e movimentações do mesmo snapshot; o PDF é montado fora da transação.
+    with read_session():
+        client_data = _get_client_basic_data(client_id)
+        rows = _get_client_statement_data(client_id)
+
     display_name = client_data["name"] if client_data and client_data["name"] else client_name
     cpf_display = _format_cpf(client_data["cpf"] if client_data else "")
 
-    rows = _get_client_statement_data(client_id)
-
     report_path = _reports_dir() / f"extrato_{_sanitize_filename(display_name)}_{_timestamp()}.pdf"
     doc = SimpleDocTemplate(str(report_path), pagesize=A4)
     styles = getSampleStyleSheet()
@@ -196,10 +211,10 @@ def export_client_statement_pdf(client_id, client_name):
     ]
 
     table_data = [["Data", "Tipo", "Valor", "Saldo Acumulado"]]
-    running_balance = 0.0
+    running_balance = 0
 
     for row in rows:
-        amount = float(row["amount"])
+        amount = int(row["amount"] or 0)
         if row["entry_type"] == "Venda":
             running_balance += amount
         else:
@@ -218,9 +233,7 @@ def export_client_statement_pdf(client_id, client_name):
     if len(table_data) == 1:
         table_data.append(["-", "Sem movimentações", "-", _format_currency(0)])
 
-    table = Table(table_data, colWidths=[110, 130, 110, 170])
-    table.setStyle(_base_table_style())
-    elements.append(table)
+    elements.extend(_chunked_tables(table_data, [110, 130, 110, 170]))
 
     doc.build(elements)
     return str(report_path)
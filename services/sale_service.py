@@ -1,14 +1,70 @@
+from database.bulk import (
+    DEFAULT_CHUNK_SIZE,
+    insert_rows,
+    normalize_timestamp,
+    parse_client_id,
+    require_existing_clients,
+    row_values,
+    validate_rows,
+)
 from database.connection import get_connection
+from database.writer import run_write
+from services.events import ENTITY_SALE, OPERATION_INSERT, publish, publish_reload
+from services.money import Money, parse_amount_cents
+from services.pagination import DEFAULT_PAGE_SIZE, build_ledger_filters, clamp_page_size, has_filters, ledger_from_sql
+
+SALE_FIELDS = ("client_id", "description", "amount", "date")
 
 def create_sale(client_id, description, amount):
-    conn = get_connection()
-    cursor = conn.cursor()
+    sale_id = run_write(_insert_sale, client_id, description, Money.coerce(amount))
+    publish(ENTITY_SALE, OPERATION_INSERT, sale_id, client_id)
+    return sale_id
+
+def _insert_sale(cursor, client_id, description, amount):
     cursor.execute(
         "INSERT INTO sales (client_id, description, amount) VALUES (?, ?, ?)",
         (client_id, description, amount),
     )
-    conn.commit()
+    return cursor.lastrowid
+
+def _validate_sale_row(row):
+    client_id, description, amount, date = row_values(row, SALE_FIELDS, 3)
+
+    description = str(description or "").strip()
+    if not description:
+        raise ValueError("informe a descrição da venda")
+
+    return parse_client_id(client_id), description, parse_amount_cents(amount), normalize_timestamp(date)
+
+def create_sales_bulk(sales, chunk_size=DEFAULT_CHUNK_SIZE):
+    rows = validate_rows(sales, _validate_sale_row, client_index=0)
+    ids = insert_rows(
+        "sales",
+        SALE_FIELDS,
+        rows,
+        chunk_size=chunk_size,
+        value_sql="?, ?, ?, COALESCE(?, CURRENT_TIMESTAMP)",
+        before_insert=require_existing_clients(rows),
+    )
+    if ids:
+        publish_reload(ENTITY_SALE)
+    return ids
+
+def get_sale(sale_id):
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute(
+        """
+        SELECT s.id, s.client_id, c.name AS client_name, s.description, s.amount, s.date
+        FROM sales s
+        INNER JOIN clients c ON c.id = s.client_id
+        WHERE s.id = ?
+        """,
+        (sale_id,),
+    )
+    row = cursor.fetchone()
     conn.close()
+    return row
 
 def get_all_sales():
     conn = get_connection()
@@ -24,3 +80,56 @@ def get_all_sales():
     rows = cursor.fetchall()
     conn.close()
     return rows
+
+def get_sales_page(
+    before_id=None,
+    limit=DEFAULT_PAGE_SIZE,
+    client_id=None,
+    date_from=None,
+    date_to=None,
+    min_amount=None,
+    max_amount=None,
+):
+    clauses, params = build_ledger_filters("s", client_id, date_from, date_to, min_amount, max_amount)
+    if before_id is not None:
+        clauses.append("s.id < ?")
+        params.append(int(before_id))
+
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute(
+        f"""
+        SELECT s.id, s.client_id, c.name AS client_name, s.description, s.amount, s.date
+        {ledger_from_sql("sales", "s", clauses)}
+        ORDER BY s.id DESC
+        LIMIT ?
+        """,
+        (*params, clamp_page_size(limit)),
+    )
+    rows = cursor.fetchall()
+    conn.close()
+    return rows
+
+def get_sales_summary(client_id=None, date_from=None, date_to=None, min_amount=None, max_amount=None):
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    if not has_filters(client_id, date_from, date_to, min_amount, max_amount):
+        cursor.execute(f"SELECT COUNT(*) AS total_count {ledger_from_sql('sales', 's', [])}")
+        total_count = cursor.fetchone()["total_count"]
+        cursor.execute("SELECT total_sold AS total_amount FROM ledger_totals WHERE id = 1")
+        row = cursor.fetchone()
+        conn.close()
+        return {"total_count": total_count, "total_amount": row["total_amount"] if row else 0}
+
+    clauses, params = build_ledger_filters("s", client_id, date_from, date_to, min_amount, max_amount)
+    cursor.execute(
+        f"""
+        SELECT COUNT(*) AS total_count, COALESCE(SUM(s.amount), 0) AS total_amount
+        {ledger_from_sql("sales", "s", clauses)}
+        """,
+        params,
+    )
+    row = cursor.fetchone()
+    conn.close()
+    return dict(row)
@@ -0,0 +1,67 @@
+import re
+
+from database.connection import get_connection
+
+DEFAULT_CLIENT_RESULTS = 20
+DEFAULT_SALE_RESULTS = 50
+# Pontuação entre dígitos, como em CPF e telefone com máscara.
+DIGIT_SEPARATORS = re.compile(r"(?<=\d)[.\-/() ]+(?=\d)")
+
+
+def build_match_query(text):
+    # O índice guarda CPF e telefone só com dígitos: "123.456.789-01" e
+    # "(11) 91234-5678" viram um único termo antes da separação em palavras.
+    text = DIGIT_SEPARATORS.sub("", str(text or "").lower())
+    tokens = re.findall(r"\w+", text)
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+def search_clients(text, limit=DEFAULT_CLIENT_RESULTS):
+    match_query = build_match_query(text)
+    if not match_query:
+        return []
+
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute(
+        """
+        SELECT c.id, c.name, c.cpf, c.phone, c.credit_limit
+        FROM clients_fts
+        INNER JOIN clients c ON c.id = clients_fts.rowid
+        WHERE clients_fts MATCH ?
+        ORDER BY bm25(clients_fts, 10.0, 5.0, 2.0), c.name ASC
+        LIMIT ?
+        """,
+        (match_query, int(limit)),
+    )
+    rows = cursor.fetchall()
+    conn.close()
+    return rows
+
+
+def search_sales(text, limit=DEFAULT_SALE_RESULTS):
+    match_query = build_match_query(text)
+    if not match_query:
+        return []
+
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute(
+        """
+        SELECT s.id, s.client_id, c.name AS client_name, s.description, s.amount, s.date
+        FROM (
+            SELECT rowid, rank AS score
+            FROM sales_fts
+            WHERE sales_fts MATCH ?
+            ORDER BY rank, rowid DESC
+            LIMIT ?
+        ) matches
+        INNER JOIN sales s ON s.id = matches.rowid
+        INNER JOIN clients c ON c.id = s.client_id
+        ORDER BY matches.score, s.id DESC
+        """,
+        (match_query, int(limit)),
+    )
+    rows = cursor.fetchall()
+    conn.close()
+    return rows
@@ -0,0 +1,46 @@
+import re
+
+from services.money import Money
+
+
+def only_digits(value):
+    return re.sub(r"\D", "", str(value or ""))
+
+
+def parse_money_text(value):
+    cleaned = str(value or "").replace("R$", "").strip()
+    if "," in cleaned:
+        cleaned = cleaned.replace(".", "").replace(",", ".")
+    return Money.from_input(cleaned)
+
+
+def validate_client_fields(name, cpf, phone, raw_limit, parse_limit=Money.from_input):
+    name = str(name or "").strip()
+    cpf = only_digits(str(cpf or "").strip())
+    phone = only_digits(str(phone or "").strip())
+    raw_limit = str(raw_limit or "").strip()
+
+    if not name:
+        raise ValueError("informe o nome.")
+
+    if not cpf:
+        raise ValueError("informe o CPF.")
+
+    if len(cpf) != 11:
+        raise ValueError("CPF inválido. Informe 11 números.")
+
+    if not phone:
+        raise ValueError("informe o telefone.")
+
+    if len(phone) not in (10, 11):
+        raise ValueError("telefone inválido. Informe 10 ou 11 números.")
+
+    if not raw_limit:
+        raise ValueError("informe o limite de crédito.")
+
+    try:
+        credit_limit = parse_limit(raw_limit)
+    except ValueError:
+        raise ValueError("limite de crédito inválido. Use até 2 casas decimais.") from None
+
+    return name, cpf, phone, credit_limit
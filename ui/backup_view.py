@@ -6,6 +6,7 @@ import subprocess
 from pathlib import Path
 from database.connection import get_db_path
 from services.backup_service import create_startup_backup, get_latest_backups, restore_backup
+from ui.table_style import configure_table_style
 
 
 class BackupView(ctk.CTkFrame):
@@ -45,9 +46,7 @@ class BackupView(ctk.CTkFrame):
 
         ctk.CTkLabel(self, text="Últimos backups", font=("Arial", 16, "bold")).pack(pady=(8, 6))
 
-        style = ttk.Style()
-        style.configure("Table.Treeview", rowheight=28, borderwidth=1, relief="solid")
-        style.configure("Table.Treeview.Heading", relief="solid")
+        configure_table_style()
 
         self.tree = ttk.Treeview(self, columns=("Arquivo", "Data/Hora", "Tamanho"), show="headings", style="Table.Treeview")
         for col in ("Arquivo", "Data/Hora", "Tamanho"):
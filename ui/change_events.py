@@ -0,0 +1,108 @@
+import queue
+import threading
+import tkinter as tk
+from tkinter import TclError
+
+from services.events import ChangeEvent, OPERATION_RELOAD, subscribe
+
+POLL_INTERVAL_MS = 100
+# Acima disso os eventos guardados de uma tela oculta viram uma recarga por entidade.
+MAX_HELD_EVENTS = 200
+
+
+def bind_changes(widget, callback, entities=None):
+    pending = queue.SimpleQueue()
+    held = []
+    state = {"active": True}
+
+    def on_event(event):
+        if not state["active"]:
+            return
+        # Gravações feitas na thread da interface chegam na hora; as de outras
+        # threads (importação, tarefas em segundo plano) esperam o próximo ciclo.
+        if threading.current_thread() is threading.main_thread():
+            deliver([event])
+        else:
+            pending.put(event)
+
+    def deliver(events):
+        # Tela oculta pela janela principal: guarda os eventos e aplica só ao voltar.
+        if not widget.winfo_ismapped():
+            held.extend(events)
+            if len(held) > MAX_HELD_EVENTS:
+                held[:] = [ChangeEvent(entity, OPERATION_RELOAD, None, None) for entity in _entities(held)]
+            return
+
+        for event in _coalesce(events):
+            if not state["active"]:
+                return
+            callback(event)
+
+    def poll():
+        if not state["active"]:
+            return
+        try:
+            if not widget.winfo_exists():
+                stop()
+                return
+        except TclError:
+            stop()
+            return
+
+        events = []
+        while True:
+            try:
+                events.append(pending.get_nowait())
+            except queue.Empty:
+                break
+        if events:
+            deliver(events)
+        widget.after(POLL_INTERVAL_MS, poll)
+
+    def on_map(event):
+        if event.widget is not widget or not held or not state["active"]:
+            return
+        events = list(held)
+        held.clear()
+        deliver(events)
+
+    unsubscribe = subscribe(on_event, entities)
+
+    def stop(_event=None):
+        if _event is not None and _event.widget is not widget:
+            return
+        state["active"] = False
+        unsubscribe()
+
+    # O CTkFrame redireciona bind() para o canvas interno; o evento então viria do
+    # canvas e a comparação com o widget falharia. O bind do tkinter liga no próprio frame.
+    tk.Misc.bind(widget, "<Destroy>", stop, add="+")
+    tk.Misc.bind(widget, "<Map>", on_map, add="+")
+    widget.after(POLL_INTERVAL_MS, poll)
+    return stop
+
+
+def _coalesce(events):
+    # Uma recarga torna redundantes os demais eventos da mesma entidade.
+    reloaded = {event.entity for event in events if event.operation == OPERATION_RELOAD}
+    if None in reloaded:
+        return [next(event for event in events if event.entity is None and event.operation == OPERATION_RELOAD)]
+
+    coalesced = []
+    for event in events:
+        if event.entity in reloaded:
+            if event.operation == OPERATION_RELOAD and event not in coalesced:
+                coalesced.append(event)
+            continue
+        coalesced.append(event)
+    return coalesced
+
+
+def _entities(events):
+    entities = []
+    for event in events:
+        if event.entity is None:
+            return [None]
+        if event.entity not in entities:
+            entities.append(event.entity)
+    return entities
@@ -0,0 +1,158 @@
+import tkinter as tk
+
+import customtkinter as ctk
+
+from services.client_directory import client_directory
+
+MAX_SUGGESTIONS = 12
+SEARCH_DELAY_MS = 120
+LIST_BACKGROUND = "#1f2937"
+LIST_FOREGROUND = "#F9FAFB"
+LIST_SELECTED = "#2563EB"
+
+
+class ClientPicker(ctk.CTkFrame):
+
+    def __init__(self, master, width=260, placeholder_text="Cliente (nome, CPF ou #id)", on_select=None):
+        super().__init__(master, fg_color="transparent")
+        self.on_select = on_select
+        self.client_id = None
+        self.matches = []
+        self.search_job = None
+        self.popup = None
+        self.listbox = None
+
+        self.entry = ctk.CTkEntry(self, width=width, placeholder_text=placeholder_text)
+        self.entry.pack(fill="x", expand=True)
+        self.entry.bind("<KeyRelease>", self.on_key_release)
+        self.entry.bind("<Down>", lambda _event: self.move_selection(1))
+        self.entry.bind("<Up>", lambda _event: self.move_selection(-1))
+        self.entry.bind("<Return>", lambda _event: self.choose_highlighted())
+        self.entry.bind("<Escape>", lambda _event: self.hide_suggestions())
+        self.entry.bind("<FocusOut>", lambda _event: self.after(150, self.on_focus_lost))
+        # O bind() do CTkFrame iria para o canvas interno; o do tkinter liga no próprio frame.
+        tk.Misc.bind(self, "<Destroy>", self.on_destroy, add="+")
+
+    def get(self):
+        return self.client_id
+
+    def set_client(self, client_id):
+        record = client_directory.get(client_id) if client_id is not None else None
+        self.client_id = record.id if record is not None else None
+        self.entry.delete(0, "end")
+        if record is not None:
+            self.entry.insert(0, record.label)
+        self.hide_suggestions()
+
+    def clear(self):
+        self.set_client(None)
+
+    def refresh(self):
+        # Depois de uma mudança nos clientes: mantém a seleção se ela ainda existir.
+        if self.client_id is not None:
+            self.set_client(self.client_id)
+
+    def on_key_release(self, event):
+        if event.keysym in ("Up", "Down", "Return", "Escape", "Tab"):
+            return
+        # Texto editado à mão deixa de corresponder ao cliente escolhido.
+        self.client_id = None
+        if self.search_job is not None:
+            self.after_cancel(self.search_job)
+        self.search_job = self.after(SEARCH_DELAY_MS, self.update_suggestions)
+
+    def update_suggestions(self):
+        self.search_job = None
+        text = self.entry.get().strip()
+        # A carga do diretório roda em segundo plano pela tela; até lá não há sugestões.
+        if not text or not client_directory.loaded:
+            self.hide_suggestions()
+            return
+
+        self.matches = client_directory.find(text, MAX_SUGGESTIONS)
+        if not self.matches:
+            self.hide_suggestions()
+            return
+        self.show_suggestions()
+
+    def show_suggestions(self):
+        if self.popup is None:
+            self.popup = tk.Toplevel(self)
+            self.popup.overrideredirect(True)
+            self.popup.attributes("-topmost", True)
+            self.listbox = tk.Listbox(
+                self.popup,
+                activestyle="none",
+                exportselection=False,
+                borderwidth=0,
+                highlightthickness=1,
+                background=LIST_BACKGROUND,
+                foreground=LIST_FOREGROUND,
+                selectbackground=LIST_SELECTED,
+                font=("Arial", 12),
+            )
+            self.listbox.pack(fill="both", expand=True)
+            self.listbox.bind("<ButtonRelease-1>", lambda _event: self.choose_highlighted())
+
+        self.listbox.delete(0, "end")
+        for record in self.matches:
+            self.listbox.insert("end", record.label)
+        self.listbox.configure(height=len(self.matches))
+        self.listbox.selection_set(0)
+
+        self.popup.geometry(
+            f"{self.entry.winfo_width()}x{self.listbox.winfo_reqheight()}"
+            f"+{self.entry.winfo_rootx()}+{self.entry.winfo_rooty() + self.entry.winfo_height()}"
+        )
+        self.popup.deiconify()
+        self.popup.lift()
+
+    def hide_suggestions(self):
+        if self.popup is not None:
+            self.popup.withdraw()
+
+    def suggestions_visible(self):
+        return self.popup is not None and self.popup.winfo_viewable()
+
+    def move_selection(self, step):
+        if not self.suggestions_visible():
+            self.update_suggestions()
+            return "break"
+
+        selection = self.listbox.curselection()
+        index = (selection[0] if selection else -1) + step
+        index = max(0, min(index, len(self.matches) - 1))
+        self.listbox.selection_clear(0, "end")
+        self.listbox.selection_set(index)
+        self.listbox.see(index)
+        return "break"
+
+    def choose_highlighted(self):
+        if not self.suggestions_visible():
+            return "break"
+
+        selection = self.listbox.curselection()
+        if selection:
+            self.set_client(self.matches[selection[0]].id)
+            self.entry.icursor("end")
+            if self.on_select is not None:
+                self.on_select(self.client_id)
+        return "break"
+
+    def on_focus_lost(self):
+        try:
+            focused = self.focus_get()
+        except (KeyError, tk.TclError):
+            focused = None
+        if focused is not self.listbox:
+            self.hide_suggestions()
+
+    def on_destroy(self, event):
+        if event.widget is not self:
+            return
+        if self.search_job is not None:
+            self.after_cancel(self.search_job)
+            self.search_job = None
+        if self.popup is not None:
+            self.popup.destroy()
+            self.popup = None
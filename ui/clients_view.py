@@ -1,14 +1,29 @@
 import customtkinter as ctk
-from tkinter import ttk
 from tkinter import messagebox
 import re
-from services.client_service import get_all_clients, create_client, update_client, delete_client
+from bisect import bisect_left
+from services.client_service import create_client, update_client, delete_client
+from services.client_directory import client_directory
+from services.events import ENTITY_CLIENT, OPERATION_DELETE, OPERATION_RELOAD
+from services.money import Money
+from services.validators import validate_client_fields
+from services.import_service import import_clients_csv
+from services.search_service import search_clients
+from ui.change_events import bind_changes
+from ui.csv_import import start_csv_import
+from ui.task_runner import TaskRunner
+from ui.virtual_table import VirtualTable
+from ui.table_style import configure_table_style
+
+SEARCH_DEBOUNCE_MS = 200
+SEARCH_RESULTS_LIMIT = 200
 
 class ClientsView(ctk.CTkFrame):
 
     def __init__(self, master):
         super().__init__(master)
         self.pack(fill="both", expand=True)
+        self.task_runner = TaskRunner(self)
 
         ctk.CTkLabel(self, text="Clientes", font=("Arial", 22, "bold")).pack(pady=20)
 
@@ -55,43 +70,99 @@ class ClientsView(ctk.CTkFrame):
         self.cancel_button = ctk.CTkButton(buttons_row, text="Cancelar", command=self.reset_form, state="disabled")
         self.cancel_button.pack(side="left", padx=5)
 
+        ctk.CTkButton(buttons_row, text="Importar CSV", command=self.import_csv).pack(side="left", padx=5)
+
         self.validation_label = ctk.CTkLabel(self, text="", text_color="red")
         self.validation_label.pack(pady=(2, 8))
 
-        style = ttk.Style()
-        style.configure("Table.Treeview", rowheight=28, borderwidth=1, relief="solid")
-        style.configure("Table.Treeview.Heading", relief="solid")
+        self.search_job = None
+        self.search_entry = ctk.CTkEntry(self, placeholder_text="Buscar cliente por nome, CPF ou telefone")
+        self.search_entry.pack(fill="x", padx=20)
+        self.search_entry.bind("<KeyRelease>", self.on_search_changed)
+
+        configure_table_style()
 
-        self.tree = ttk.Treeview(self, columns=("ID","Nome","CPF","Telefone","Limite"), show="headings", style="Table.Treeview")
-        for col in ("ID","Nome","CPF","Telefone","Limite"):
-            self.tree.heading(col, text=col, anchor="center")
-            self.tree.column(col, anchor="center")
-        self.tree.bind("<<TreeviewSelect>>", self.on_select_client)
-        self.tree.tag_configure("evenrow", background="#FFFFFF")
-        self.tree.tag_configure("oddrow", background="#F3F4F6")
-        self.tree.pack(fill="both", expand=True, padx=20, pady=20)
+        self.table = VirtualTable(
+            self,
+            columns=("ID","Nome","CPF","Telefone","Limite"),
+            format_row=self.client_values,
+            row_id=lambda client: client["id"],
+            on_select=self.on_select_client,
+        )
+        self.table.pack(fill="both", expand=True, padx=20, pady=20)
 
+        # Chaves (nome, id) na ordem da tabela, para posicionar linhas sem reconsultar o banco.
+        self.row_keys = []
         self.load_clients()
 
+        bind_changes(self, self.on_clients_changed, (ENTITY_CLIENT,))
+
     def load_clients(self):
-        for row in self.tree.get_children():
-            self.tree.delete(row)
-
-        for idx, client in enumerate(get_all_clients()):
-            tag = "evenrow" if idx % 2 == 0 else "oddrow"
-            display_name = f"{client['name']}"
-            display_limit = self.format_currency(client["credit_limit"])
-            self.tree.insert("", "end", values=(
-                client["id"],
-                display_name,
-                self.format_cpf(client["cpf"]),
-                self.format_phone(client["phone"]),
-                display_limit
-            ), tags=(tag,))
+        search_text = self.search_entry.get().strip()
+        if search_text:
+            self.task_runner.run(
+                search_clients,
+                search_text,
+                SEARCH_RESULTS_LIMIT,
+                on_success=self.show_clients,
+                on_error=self.show_load_error,
+                key="clients",
+            )
+        else:
+            self.task_runner.run(client_directory.all, on_success=self.show_clients, on_error=self.show_load_error, key="clients")
+
+    def show_clients(self, clients):
+        self.row_keys = [(client["name"], client["id"]) for client in clients]
+        self.table.set_rows(clients)
+
+    def client_values(self, client):
+        display_name = f"{client['name']}"
+        display_limit = self.format_currency(client["credit_limit"])
+        return (
+            client["id"],
+            display_name,
+            self.format_cpf(client["cpf"]),
+            self.format_phone(client["phone"]),
+            display_limit
+        )
+
+    def on_clients_changed(self, event):
+        if event.operation == OPERATION_RELOAD or self.search_entry.get().strip():
+            self.load_clients()
+        elif event.operation == OPERATION_DELETE:
+            self.remove_client_row(event.entity_id)
+        else:
+            # O diretório já foi atualizado pelo mesmo evento.
+            self.upsert_client_row(client_directory.get(event.entity_id))
+
+    def remove_client_row(self, client_id):
+        index = self.table.index_of(client_id)
+        if index is None:
+            return
+
+        self.table.remove_row(index)
+        del self.row_keys[index]
+
+    def upsert_client_row(self, client):
+        if client is None:
+            return
+
+        self.remove_client_row(client["id"])
+        index = bisect_left(self.row_keys, (client["name"], client["id"]))
+        self.row_keys.insert(index, (client["name"], client["id"]))
+        self.table.insert_row(index, client)
+
+    def on_search_changed(self, _event=None):
+        if self.search_job is not None:
+            self.after_cancel(self.search_job)
+        self.search_job = self.after(SEARCH_DEBOUNCE_MS, self.run_search)
+
+    def run_search(self):
+        self.search_job = None
+        self.load_clients()
 
     def format_currency(self, value):
-        amount = float(value or 0)
-        return f"R$ {amount:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+        return Money.from_cents(value).format()
 
     def parse_currency(self, value):
         if value is None:
@@ -101,42 +172,17 @@ class ClientsView(ctk.CTkFrame):
         return cleaned
 
     def validate_form(self):
-        name = self.name_entry.get().strip()
-        cpf = re.sub(r"\D", "", self.cpf_entry.get().strip())
-        phone = re.sub(r"\D", "", self.phone_entry.get().strip())
-        raw_limit = (self.limit_entry.get() or "").strip()
-
-        if not name:
-            self.show_error("Erro: informe o nome.")
-            return None
-
-        if not cpf:
-            self.show_error("Erro: informe o CPF.")
-            return None
-
-        if len(cpf) != 11:
-            self.show_error("Erro: CPF inválido. Informe 11 números.")
-            return None
-
-        if not phone:
-            self.show_error("Erro: informe o telefone.")
-            return None
-
-        if len(phone) not in (10, 11):
-            self.show_error("Erro: telefone inválido. Informe 10 ou 11 números.")
-            return None
-
-        if not raw_limit:
-            self.show_error("Erro: informe o limite de crédito.")
+        try:
+            return validate_client_fields(
+                self.name_entry.get(),
+                self.cpf_entry.get(),
+                self.phone_entry.get(),
+                self.limit_entry.get(),
+            )
+        except ValueError as exc:
+            self.show_error(f"Erro: {exc}")
             return None
 
-        if not re.fullmatch(r"\d+(?:[\.,]\d{1,2})?", raw_limit):
-            self.show_error("Erro: limite de crédito inválido. Use até 2 casas decimais.")
-            return None
-
-        credit_limit = float(raw_limit.replace(",", "."))
-        return name, cpf, phone, credit_limit
-
     def save_client(self):
         validated_data = self.validate_form()
         if not validated_data:
@@ -149,7 +195,6 @@ class ClientsView(ctk.CTkFrame):
         create_client(name, cpf, phone, credit_limit)
 
         self.reset_form()
-        self.load_clients()
         self.show_success("Cliente salvo com sucesso.")
 
     def edit_client(self):
@@ -166,7 +211,6 @@ class ClientsView(ctk.CTkFrame):
         self.clear_error()
         update_client(self.selected_client_id, name, cpf, phone, credit_limit)
         self.reset_form()
-        self.load_clients()
         self.show_success("Cliente atualizado com sucesso.")
 
     def remove_client(self):
@@ -184,36 +228,25 @@ class ClientsView(ctk.CTkFrame):
             return
 
         self.reset_form()
-        self.load_clients()
         self.show_success("Cliente removido com sucesso.")
 
-    def on_select_client(self, _event=None):
-        selected_items = self.tree.selection()
-        if not selected_items:
-            return
-
-        values = self.tree.item(selected_items[0], "values")
-        if not values:
-            return
-
-        self.selected_client_id = int(values[0])
+    def import_csv(self):
+        start_csv_import(self, import_clients_csv, self.show_status)
 
-        selected_name = values[1]
-        match = re.match(r"^(.*)\s\(#\d+\)$", selected_name)
-        if match:
-            selected_name = match.group(1)
+    def on_select_client(self, client):
+        self.selected_client_id = client["id"]
 
         self.name_entry.delete(0, "end")
-        self.name_entry.insert(0, selected_name)
+        self.name_entry.insert(0, client["name"])
 
         self.cpf_entry.delete(0, "end")
-        self.cpf_entry.insert(0, values[2])
+        self.cpf_entry.insert(0, self.format_cpf(client["cpf"]))
 
         self.phone_entry.delete(0, "end")
-        self.phone_entry.insert(0, values[3])
+        self.phone_entry.insert(0, self.format_phone(client["phone"]))
 
         self.limit_entry.delete(0, "end")
-        self.limit_entry.insert(0, self.parse_currency(values[4]))
+        self.limit_entry.insert(0, self.parse_currency(self.format_currency(client["credit_limit"])))
 
         self.update_button.configure(state="normal")
         self.delete_button.configure(state="normal")
@@ -230,9 +263,7 @@ class ClientsView(ctk.CTkFrame):
         self.phone_entry.delete(0, "end")
         self.limit_entry.delete(0, "end")
 
-        selected_items = self.tree.selection()
-        if selected_items:
-            self.tree.selection_remove(selected_items)
+        self.table.clear_selection()
 
         self.update_button.configure(state="disabled")
         self.delete_button.configure(state="disabled")
@@ -274,11 +305,17 @@ class ClientsView(ctk.CTkFrame):
             self.cpf_entry.delete(0, "end")
             self.cpf_entry.insert(0, masked)
 
+    def show_load_error(self, exc):
+        self.show_error(f"Erro ao carregar clientes: {exc}")
+
     def show_error(self, message):
         self.validation_label.configure(text=message, text_color="red")
 
     def show_success(self, message):
         self.validation_label.configure(text=message, text_color="green")
 
+    def show_status(self, message, color):
+        self.validation_label.configure(text=message, text_color=color)
+
     def clear_error(self):
         self.validation_label.configure(text="", text_color="red")
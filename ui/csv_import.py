@@ -0,0 +1,65 @@
+from tkinter import TclError, filedialog, messagebox
+
+POLL_INTERVAL_MS = 200
+
+
+def start_csv_import(view, importer, show_status, on_finished=None):
+    path = filedialog.askopenfilename(
+        parent=view,
+        title="Selecione o arquivo CSV",
+        filetypes=[("Arquivos CSV", "*.csv"), ("Todos os arquivos", "*.*")],
+    )
+    if not path:
+        return
+
+    choice = messagebox.askyesnocancel(
+        "Importar CSV",
+        "Deseja gravar os dados agora?\n\nSim: importar\nNão: apenas simular, sem gravar",
+        parent=view,
+    )
+    if choice is None:
+        return
+    dry_run = not choice
+
+    state = {"progress": (0, 0, 0), "task": None}
+
+    def on_progress(processed, read_bytes, total_bytes):
+        state["progress"] = (processed, read_bytes, total_bytes)
+        # A tela só é ocultada ao trocar de tela, então a importação continua; o
+        # importador para no próximo aviso apenas se a tarefa for cancelada.
+        task = state["task"]
+        return task is None or not task.cancelled
+
+    def on_success(result):
+        action = "validadas (simulação)" if result["dry_run"] else "importadas"
+        message = f"{result['imported']} linhas {action} de {result['processed']} lidas."
+        if result["errors"]:
+            message += f" {result['errors']} com erro: {result['error_report_path']}"
+        show_status(message, "red" if result["errors"] else "green")
+
+        if on_finished is not None and not result["dry_run"]:
+            on_finished(result)
+
+    task = view.task_runner.run(
+        lambda: importer(path, dry_run=dry_run, progress_callback=on_progress),
+        on_success=on_success,
+        on_error=lambda exc: show_status(f"Erro ao importar CSV: {exc}", "red"),
+        key="csv_import",
+    )
+    state["task"] = task
+
+    def show_progress():
+        if not task.is_active():
+            return
+        try:
+            if not view.winfo_exists():
+                return
+        except TclError:
+            return
+
+        processed, read_bytes, total_bytes = state["progress"]
+        percent = int(read_bytes * 100 / total_bytes) if total_bytes else 0
+        show_status(f"Importando CSV... {percent}% ({processed} linhas lidas)", "#F59E0B")
+        view.after(POLL_INTERVAL_MS, show_progress)
+
+    show_progress()
@@ -1,41 +1,186 @@
+import tkinter as tk
+from datetime import datetime, timezone
 import customtkinter as ctk
-from services.dashboard_service import get_dashboard_data
+from services.dashboard_service import (
+    DEFAULT_PERIOD,
+    PERIOD_LAST_12_MONTHS,
+    PERIOD_MONTH,
+    PERIOD_TODAY,
+    get_dashboard_data,
+)
+from services.money import Money
+from ui.change_events import bind_changes
+from ui.task_runner import TaskRunner
+
+PERIOD_OPTIONS = {
+    "Hoje": PERIOD_TODAY,
+    "Este mês": PERIOD_MONTH,
+    "Últimos 12 meses": PERIOD_LAST_12_MONTHS,
+}
+MONTH_LABELS = ("Jan", "Fev", "Mar", "Abr", "Mai", "Jun", "Jul", "Ago", "Set", "Out", "Nov", "Dez")
+SALES_COLOR = "#F59E0B"
+PAYMENTS_COLOR = "#10B981"
+
+
+def current_day():
+    # Mesmo relógio (UTC) usado pelos períodos do serviço.
+    return datetime.now(timezone.utc).date()
+
 
 class DashboardView(ctk.CTkFrame):
 
     def __init__(self, master):
         super().__init__(master)
         self.pack(fill="both", expand=True)
+        self.task_runner = TaskRunner(self)
 
-        data = get_dashboard_data()
+        self.trend = []
+        self.period = DEFAULT_PERIOD
+        self.loaded_day = None
 
         ctk.CTkLabel(self, text="Resumo Financeiro", font=("Arial", 26, "bold")).pack(pady=(24, 6))
-        ctk.CTkLabel(self, text="Visão geral do desempenho atual", font=("Arial", 14)).pack(pady=(0, 18))
+        ctk.CTkLabel(self, text="Visão geral do desempenho atual", font=("Arial", 14)).pack(pady=(0, 6))
+
+        self.status_label = ctk.CTkLabel(self, text="", text_color="#F59E0B")
+        self.status_label.pack(pady=(0, 6))
 
         cards_container = ctk.CTkFrame(self)
-        cards_container.pack(fill="both", expand=True, padx=24, pady=(0, 24))
-        cards_container.grid_columnconfigure((0, 1), weight=1)
-        cards_container.grid_rowconfigure((0, 1), weight=1)
+        cards_container.pack(fill="x", padx=24, pady=(0, 12))
+        cards_container.grid_columnconfigure((0, 1, 2, 3), weight=1)
+
+        self.total_clients_label = self.create_metric_card(cards_container, "Clientes", 0, 0, value_color="#3B82F6")
+        self.total_sales_label = self.create_metric_card(cards_container, "Total Vendido", 0, 1, value_color=SALES_COLOR)
+        self.total_paid_label = self.create_metric_card(cards_container, "Total Recebido", 0, 2, value_color=PAYMENTS_COLOR)
+        self.total_open_label = self.create_metric_card(cards_container, "Em Aberto", 0, 3, highlight=True, value_color="#EF4444")
+
+        period_frame = ctk.CTkFrame(self)
+        period_frame.pack(fill="x", padx=24, pady=(0, 12))
+        period_frame.grid_columnconfigure((0, 1, 2), weight=1)
+
+        self.period_selector = ctk.CTkSegmentedButton(
+            period_frame,
+            values=list(PERIOD_OPTIONS),
+            command=self.on_period_changed,
+        )
+        self.period_selector.grid(row=0, column=0, columnspan=3, pady=(10, 0))
+
+        self.period_sales_label = self.create_metric_card(period_frame, "Vendas no período", 1, 0, value_color=SALES_COLOR)
+        self.period_paid_label = self.create_metric_card(period_frame, "Recebido no período", 1, 1, value_color=PAYMENTS_COLOR)
+        self.period_clients_label = self.create_metric_card(period_frame, "Novos clientes", 1, 2, value_color="#3B82F6")
+
+        chart_frame = ctk.CTkFrame(self)
+        chart_frame.pack(fill="both", expand=True, padx=24, pady=(0, 24))
+        ctk.CTkLabel(chart_frame, text="Vendas x Recebimentos (12 meses)", font=("Arial", 16, "bold")).pack(pady=(10, 0))
+
+        self.chart = tk.Canvas(chart_frame, height=220, highlightthickness=0, background="#FFFFFF")
+        self.chart.pack(fill="both", expand=True, padx=12, pady=12)
+        self.chart.bind("<Configure>", lambda _event: self.draw_trend())
+
+        default_label = next(label for label, period in PERIOD_OPTIONS.items() if period == DEFAULT_PERIOD)
+        self.period_selector.set(default_label)
+        self.load_data(DEFAULT_PERIOD)
+
+        # O resumo lê poucas linhas agregadas; qualquer gravação apenas o recarrega.
+        bind_changes(self, lambda _event: self.load_data(self.period))
+
+    def load_data(self, period):
+        self.period = period
+        self.loaded_day = current_day()
+        self.status_label.configure(text="Carregando...", text_color="#F59E0B")
+        self.task_runner.run(
+            get_dashboard_data,
+            period,
+            on_success=self.show_data,
+            on_error=lambda exc: self.status_label.configure(text=f"Erro ao carregar resumo: {exc}", text_color="red"),
+            key="dashboard",
+        )
+
+    def show_data(self, data):
+        self.status_label.configure(text="")
+        self.total_clients_label.configure(text=str(data["total_clients"]))
+        self.total_sales_label.configure(text=self.format_currency(data["total_sales"]))
+        self.total_paid_label.configure(text=self.format_currency(data["total_paid"]))
+        self.total_open_label.configure(text=self.format_currency(data["total_open"]))
+
+        summary = data["period_summary"]
+        self.period_sales_label.configure(
+            text=f"{self.format_currency(summary['sales_amount'])} ({summary['sales_count']})"
+        )
+        self.period_paid_label.configure(
+            text=f"{self.format_currency(summary['payments_amount'])} ({summary['payments_count']})"
+        )
+        self.period_clients_label.configure(text=str(summary["new_clients"]))
+
+        self.trend = data["trend"]
+        self.draw_trend()
+
+    def on_activate(self):
+        # Os eventos cobrem as gravações; só a virada do dia muda "Hoje" e o mês sem avisar.
+        if self.loaded_day != current_day():
+            self.load_data(self.period)
+
+    def on_period_changed(self, label):
+        self.load_data(PERIOD_OPTIONS[label])
+
+    def draw_trend(self):
+        self.chart.delete("all")
+        if not self.trend:
+            return
+
+        width = self.chart.winfo_width()
+        height = self.chart.winfo_height()
+        if width < 50 or height < 50:
+            return
+
+        top, bottom, left, right = 16, 28, 12, 12
+        plot_height = height - top - bottom
+        slot_width = (width - left - right) / len(self.trend)
+        bar_width = max(slot_width * 0.35, 2)
+        peak = max(max(item["sales_amount"], item["payments_amount"]) for item in self.trend) or 1
+
+        self.chart.create_line(left, height - bottom, width - right, height - bottom, fill="#D1D5DB")
+
+        for index, item in enumerate(self.trend):
+            slot_left = left + index * slot_width + (slot_width - bar_width * 2) / 2
+            for offset, amount, color in (
+                (0, item["sales_amount"], SALES_COLOR),
+                (bar_width, item["payments_amount"], PAYMENTS_COLOR),
+            ):
+                bar_height = plot_height * max(amount, 0) / peak
+                self.chart.create_rectangle(
+                    slot_left + offset,
+                    height - bottom - bar_height,
+                    slot_left + offset + bar_width,
+                    height - bottom,
+                    fill=color,
+                    width=0,
+                )
 
-        self.create_metric_card(cards_container, "Clientes", str(data["total_clients"]), 0, 0, value_color="#3B82F6")
-        self.create_metric_card(cards_container, "Total Vendido", self.format_currency(data["total_sales"]), 0, 1, value_color="#F59E0B")
-        self.create_metric_card(cards_container, "Total Recebido", self.format_currency(data["total_paid"]), 1, 0, value_color="#10B981")
-        self.create_metric_card(cards_container, "Em Aberto", self.format_currency(data["total_open"]), 1, 1, highlight=True, value_color="#EF4444")
+            month_label = MONTH_LABELS[int(item["month"][5:7]) - 1]
+            self.chart.create_text(
+                left + index * slot_width + slot_width / 2,
+                height - bottom / 2,
+                text=month_label,
+                fill="#374151",
+                font=("Arial", 10),
+            )
 
-    def create_metric_card(self, parent, title, value, row, column, highlight=False, value_color="#FFFFFF"):
+    def create_metric_card(self, parent, title, row, column, highlight=False, value_color="#FFFFFF"):
         card = ctk.CTkFrame(parent)
         card.grid(row=row, column=column, padx=10, pady=10, sticky="nsew")
         card.grid_rowconfigure(0, weight=1)
         card.grid_columnconfigure(0, weight=1)
 
         content = ctk.CTkFrame(card, fg_color="transparent")
-        content.grid(row=0, column=0)
+        content.grid(row=0, column=0, pady=10)
 
         title_font = ("Arial", 16, "bold")
-        value_font = ("Arial", 34, "bold") if highlight else ("Arial", 30, "bold")
+        value_font = ("Arial", 28, "bold") if highlight else ("Arial", 24, "bold")
 
         ctk.CTkLabel(content, text=title, font=title_font, justify="center").pack(pady=(0, 6))
-        ctk.CTkLabel(content, text=value, font=value_font, justify="center", text_color=value_color).pack()
+        value_label = ctk.CTkLabel(content, text="-", font=value_font, justify="center", text_color=value_color)
+        value_label.pack()
+        return value_label
 
     def format_currency(self, amount):
-        return f"R$ {amount:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+        return Money.from_cents(amount).format()
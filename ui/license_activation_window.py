@@ -2,6 +2,7 @@ import customtkinter as ctk
 
 from app_info import APP_NAME, APP_VERSION
 from licence.licences import ativar_licenca
+from ui.task_runner import TaskRunner
 
 
 class LicenseActivationWindow(ctk.CTkToplevel):
@@ -9,6 +10,7 @@ class LicenseActivationWindow(ctk.CTkToplevel):
     def __init__(self, master, on_success, icon_path=None):
         super().__init__(master)
         self.on_success = on_success
+        self.task_runner = TaskRunner(self)
 
         self.title(f"Ativação de Licença - {APP_NAME}")
         self.geometry("520x260")
@@ -53,9 +55,17 @@ class LicenseActivationWindow(ctk.CTkToplevel):
             return
 
         self.activate_button.configure(state="disabled", text="Validando...")
-        self.update_idletasks()
-
-        success, message = ativar_licenca(key)
+        # A validação roda em segundo plano: a janela segue respondendo enquanto o servidor não responde.
+        self.task_runner.run(
+            ativar_licenca,
+            key,
+            on_success=self.on_activation_finished,
+            on_error=self.on_activation_error,
+            key="activate",
+        )
+
+    def on_activation_finished(self, outcome):
+        success, message = outcome
         if not success:
             self.show_error(message)
             self.activate_button.configure(state="normal", text="Ativar")
@@ -64,6 +74,10 @@ class LicenseActivationWindow(ctk.CTkToplevel):
         self.show_success("Licença ativada com sucesso. Abrindo sistema...")
         self.after(150, self.finish_success)
 
+    def on_activation_error(self, exc):
+        self.show_error(f"Falha na ativação: {exc}")
+        self.activate_button.configure(state="normal", text="Ativar")
+
     def finish_success(self):
         self.grab_release()
         self.destroy()
@@ -1,16 +1,37 @@
+import importlib
+
 import customtkinter as ctk
 from app_paths import get_asset_path
 from app_info import APP_NAME, APP_VERSION
-from ui.dashboard_view import DashboardView
-from ui.clients_view import ClientsView
-from ui.sales_view import SalesView
-from ui.payments_view import PaymentsView
-from ui.reports_view import ReportsView
-from ui.backup_view import BackupView
+from app_profiling import span
+
+# Módulo e classe de cada tela. O módulo só é importado na primeira visita, para
+# que a abertura do app não carregue telas (e dependências) que não serão usadas.
+# Ao incluir uma tela, acrescente o módulo em hiddenimports no main.spec.
+VIEW_MODULES = {
+    "dashboard": ("ui.dashboard_view", "DashboardView"),
+    "clients": ("ui.clients_view", "ClientsView"),
+    "sales": ("ui.sales_view", "SalesView"),
+    "payments": ("ui.payments_view", "PaymentsView"),
+    "reports": ("ui.reports_view", "ReportsView"),
+    "backup": ("ui.backup_view", "BackupView"),
+}
+
+
+def load_view_class(name):
+    module_name, class_name = VIEW_MODULES[name]
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def prewarm_views():
+    # Roda em segundo plano na abertura: a primeira visita a cada tela já encontra o módulo carregado.
+    for name in VIEW_MODULES:
+        load_view_class(name)
+
 
 class MainWindow(ctk.CTk):
 
-    def __init__(self, license_active=False):
+    def __init__(self, license_active=False, initial_view="dashboard"):
         super().__init__()
         self.license_active = license_active
 
@@ -56,35 +77,50 @@ class MainWindow(ctk.CTk):
         self.main_area = ctk.CTkFrame(self)
         self.main_area.pack(side="right", fill="both", expand=True)
 
-        self.show_dashboard()
-
-    def clear(self):
-        for widget in self.main_area.winfo_children():
-            widget.destroy()
+        self.views = {}
+        self.active_view = None
+        if initial_view is not None:
+            self.show_view(initial_view)
+
+    def show_view(self, name):
+        # As telas são criadas uma vez e depois só ocultadas; os eventos de
+        # alteração recebidos enquanto ocultas são aplicados quando voltam.
+        view = self.views.get(name)
+        if view is self.active_view and view is not None:
+            return
+
+        if self.active_view is not None:
+            self.active_view.pack_forget()
+
+        with span(f"view.{name}", "ui"):
+            if view is None:
+                view = load_view_class(name)(self.main_area)
+                self.views[name] = view
+            else:
+                view.pack(fill="both", expand=True)
+                on_activate = getattr(view, "on_activate", None)
+                if on_activate is not None:
+                    on_activate()
+
+        self.active_view = view
 
     def show_dashboard(self):
-        self.clear()
-        DashboardView(self.main_area)
+        self.show_view("dashboard")
 
     def show_clients(self):
-        self.clear()
-        ClientsView(self.main_area)
+        self.show_view("clients")
 
     def show_sales(self):
-        self.clear()
-        SalesView(self.main_area)
+        self.show_view("sales")
 
     def show_payments(self):
-        self.clear()
-        PaymentsView(self.main_area)
+        self.show_view("payments")
 
     def show_reports(self):
-        self.clear()
-        ReportsView(self.main_area)
+        self.show_view("reports")
 
     def show_backup(self):
-        self.clear()
-        BackupView(self.main_area)
+        self.show_view("backup")
 
     def set_app_icon(self):
         icon_path = get_asset_path("icone.ico")
@@ -1,55 +1,78 @@
 import customtkinter as ctk
-from tkinter import ttk
 import re
 from datetime import datetime
-from services.payment_service import create_payment, get_all_payments
-from services.client_service import get_all_clients
+from services.payment_service import create_payment, get_payment, get_payments_page, get_payments_summary
+from services.client_directory import client_directory
+from ui.client_picker import ClientPicker
+from services.client_service import get_client
+from services.events import ENTITY_CLIENT, ENTITY_PAYMENT, OPERATION_DELETE, OPERATION_INSERT, OPERATION_RELOAD, OPERATION_UPDATE
+from services.money import Money
+from services.import_service import import_payments_csv
+from ui.change_events import bind_changes
+from ui.csv_import import start_csv_import
+from ui.task_runner import TaskRunner
+from ui.virtual_table import VirtualTable
+from ui.table_style import configure_table_style
+
+PAGE_SIZE = 200
+
+
+def fetch_payments_page(before_id):
+    # O resumo só é calculado na primeira página; depois a tela o mantém pelos eventos.
+    summary = get_payments_summary() if before_id is None else None
+    return get_payments_page(before_id=before_id, limit=PAGE_SIZE), summary
+
 
 class PaymentsView(ctk.CTkFrame):
 
     def __init__(self, master):
         super().__init__(master)
         self.pack(fill="both", expand=True)
+        self.task_runner = TaskRunner(self)
 
         ctk.CTkLabel(self, text="Registrar Pagamento Parcial", font=("Arial",22,"bold")).pack(pady=20)
 
         form = ctk.CTkFrame(self)
         form.pack(pady=10)
 
-        self.client_dict = {}
-        self.client_label_by_id = {}
-        self.client_option = ctk.CTkOptionMenu(form, values=["Selecione"])
-        self.client_option.set("Selecione")
-        self.client_option.pack(side="left", padx=5)
-        self.refresh_clients_options()
+        self.client_picker = ClientPicker(form)
+        self.client_picker.pack(side="left", padx=5)
+        self.load_client_options()
 
         self.amount_entry = ctk.CTkEntry(form, placeholder_text="Valor recebido")
         self.amount_entry.pack(side="left", padx=5)
 
         ctk.CTkButton(form, text="Registrar", command=self.save_payment).pack(side="left", padx=5)
+        ctk.CTkButton(form, text="Importar CSV", command=self.import_csv).pack(side="left", padx=5)
 
         self.validation_label = ctk.CTkLabel(self, text="", text_color="red")
         self.validation_label.pack(pady=(2, 8))
 
-        style = ttk.Style()
-        style.configure("Table.Treeview", rowheight=28, borderwidth=1, relief="solid")
-        style.configure("Table.Treeview.Heading", relief="solid")
+        configure_table_style()
+
+        self.table = VirtualTable(
+            self,
+            columns=("ID", "Cliente", "Valor", "Data"),
+            format_row=self.payment_values,
+            row_id=lambda payment: payment["id"],
+            fetch_more=self.load_more_payments,
+        )
+        self.table.pack(fill="both", expand=True, padx=20, pady=(20, 8))
 
-        self.tree = ttk.Treeview(self, columns=("ID", "Cliente", "Valor", "Data"), show="headings", style="Table.Treeview")
-        for col in ("ID", "Cliente", "Valor", "Data"):
-            self.tree.heading(col, text=col, anchor="center")
-            self.tree.column(col, anchor="center")
-        self.tree.tag_configure("evenrow", background="#FFFFFF")
-        self.tree.tag_configure("oddrow", background="#F3F4F6")
-        self.tree.pack(fill="both", expand=True, padx=20, pady=20)
+        footer = ctk.CTkFrame(self, fg_color="transparent")
+        footer.pack(fill="x", padx=20, pady=(0, 16))
+        self.summary_label = ctk.CTkLabel(footer, text="")
+        self.summary_label.pack(side="left")
 
+        self.next_before_id = None
+        self.summary = None
         self.load_payments()
 
-    def save_payment(self):
-        self.refresh_clients_options(keep_selection=True)
+        bind_changes(self, self.on_data_changed, (ENTITY_PAYMENT, ENTITY_CLIENT))
 
-        client_name = self.client_option.get()
-        if client_name not in self.client_dict:
+    def save_payment(self):
+        client_id = self.client_picker.get()
+        if client_id is None:
             self.show_error("Erro: selecione um cliente.")
             return
 
@@ -62,65 +85,124 @@ class PaymentsView(ctk.CTkFrame):
             self.show_error("Erro: valor inválido. Use até 2 casas decimais.")
             return
 
-        amount = float(raw_amount.replace(",", "."))
+        amount = Money.from_input(raw_amount)
         self.clear_feedback()
-        create_payment(self.client_dict[client_name], amount)
+        create_payment(client_id, amount)
         self.amount_entry.delete(0,"end")
-        self.load_payments()
         self.show_success("Pagamento registrado com sucesso.")
 
-    def refresh_clients_options(self, keep_selection=False):
-        current_selection = self.client_option.get() if keep_selection else "Selecione"
-
-        clients = get_all_clients()
-        self.client_dict = {}
-        self.client_label_by_id = {}
+    def import_csv(self):
+        start_csv_import(self, import_payments_csv, self.show_status)
 
-        for client in clients:
-            client_id = client["id"]
-            display_label = f"{client['name']} (#{client_id})"
-            self.client_dict[display_label] = client_id
-            self.client_label_by_id[client_id] = display_label
-
-        option_values = list(self.client_dict.keys()) if self.client_dict else ["Selecione"]
-
-        self.client_option.configure(values=option_values)
+    def on_data_changed(self, event):
+        if event.entity in (None, ENTITY_CLIENT):
+            self.on_client_changed(event)
+        if event.entity not in (None, ENTITY_PAYMENT):
+            return
 
-        selected_client_id = None
-        if keep_selection and current_selection in self.client_dict:
-            selected_client_id = self.client_dict[current_selection]
-        elif keep_selection:
-            match = re.search(r"\(#(\d+)\)$", current_selection)
-            if match:
-                selected_client_id = int(match.group(1))
+        if event.operation == OPERATION_RELOAD:
+            self.load_payments()
+        elif event.operation == OPERATION_INSERT:
+            self.task_runner.run(get_payment, event.entity_id, on_success=self.prepend_payment, on_error=self.show_load_error)
 
-        restored_selection = "Selecione"
-        if selected_client_id is not None:
-            restored_selection = self.client_label_by_id.get(selected_client_id, "Selecione")
+    def prepend_payment(self, payment):
+        if payment is None or self.summary is None:
+            return
 
-        self.client_option.set(restored_selection)
+        if self.table.contains(payment["id"]):
+            return
+        self.table.insert_row(0, payment)
+
+        self.summary["total_count"] += 1
+        self.summary["total_amount"] += payment["amount"] or 0
+        self.show_summary()
+
+    def load_client_options(self):
+        # Só a primeira carga do diretório consulta o banco; depois ele é mantido pelos eventos.
+        self.task_runner.run(
+            client_directory.ensure_loaded,
+            on_success=lambda _result: self.client_picker.refresh(),
+            on_error=self.show_load_error,
+            key="clients",
+        )
+
+    def on_client_changed(self, event):
+        self.load_client_options()
+        # A tela fica viva entre as visitas: as linhas já exibidas precisam
+        # acompanhar a edição do nome do cliente.
+        if event.operation not in (OPERATION_UPDATE, OPERATION_DELETE):
+            return
+        client_id = event.entity_id
+        if not any(payment["client_id"] == client_id for payment in self.table.rows):
+            return
+        self.task_runner.run(
+            get_client,
+            client_id,
+            on_success=lambda client: self.rename_client_rows(client_id, client),
+            on_error=self.show_load_error,
+            key=f"client:{client_id}",
+        )
+
+    def rename_client_rows(self, client_id, client):
+        if client is None:
+            self.load_payments()
+            return
+        self.table.replace_rows(
+            lambda payment: payment["client_id"] == client_id,
+            lambda payment: {**dict(payment), "client_name": client["name"]},
+        )
 
     def load_payments(self):
-        for row in self.tree.get_children():
-            self.tree.delete(row)
-
-        for idx, payment in enumerate(get_all_payments()):
-            tag = "evenrow" if idx % 2 == 0 else "oddrow"
-            self.tree.insert(
-                "",
-                "end",
-                values=(
-                    payment["id"],
-                    payment["client_name"],
-                    self.format_currency(payment["amount"]),
-                    self.format_date(payment["date"]),
-                ),
-                tags=(tag,)
+        # Descarta a página ou busca em andamento antes de recomeçar a lista.
+        self.task_runner.cancel("payments")
+        self.table.set_rows([])
+        self.next_before_id = None
+        self.summary = None
+        self.load_more_payments()
+
+    def load_more_payments(self):
+        # Chamado pela tabela ao rolar perto do fim; ignora enquanto uma página está a caminho.
+        if self.task_runner.is_busy("payments"):
+            return
+
+        self.show_loading("Carregando pagamentos...")
+        self.task_runner.run(
+            fetch_payments_page,
+            self.next_before_id,
+            on_success=self.show_payments_page,
+            on_error=self.show_load_error,
+            key="payments",
+        )
+
+    def show_payments_page(self, result):
+        payments, summary = result
+        if payments:
+            self.next_before_id = payments[-1]["id"]
+
+        if summary is not None:
+            self.summary = dict(summary)
+        has_more = len(payments) == PAGE_SIZE and self.table.row_count() + len(payments) < self.summary["total_count"]
+        self.table.append_rows(payments, has_more=has_more)
+        self.show_summary()
+
+    def show_summary(self):
+        self.summary_label.configure(
+            text=(
+                f"Exibindo {self.table.row_count()} de {self.summary['total_count']} pagamentos"
+                f" | Total recebido: {self.format_currency(self.summary['total_amount'])}"
             )
+        )
+
+    def payment_values(self, payment):
+        return (
+            payment["id"],
+            payment["client_name"],
+            self.format_currency(payment["amount"]),
+            self.format_date(payment["date"]),
+        )
 
     def format_currency(self, value):
-        amount = float(value or 0)
-        return f"R$ {amount:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+        return Money.from_cents(value).format()
 
     def format_date(self, value):
         raw_value = str(value or "").strip()
@@ -134,11 +216,21 @@ class PaymentsView(ctk.CTkFrame):
         except ValueError:
             return raw_value
 
+    def show_loading(self, message):
+        self.summary_label.configure(text=message)
+
+    def show_load_error(self, exc):
+        self.summary_label.configure(text="")
+        self.show_error(f"Erro ao carregar dados: {exc}")
+
     def show_error(self, message):
         self.validation_label.configure(text=message, text_color="red")
 
     def show_success(self, message):
         self.validation_label.configure(text=message, text_color="green")
 
+    def show_status(self, message, color):
+        self.validation_label.configure(text=message, text_color=color)
+
     def clear_feedback(self):
         self.validation_label.configure(text="", text_color="red")
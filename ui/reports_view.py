@@ -1,19 +1,27 @@
 import customtkinter as ctk
 import os
+from bisect import bisect_left
 from tkinter import ttk
-from database.connection import get_connection
-from services.client_service import get_all_clients
+from services.balance_service import get_client_open_balance, get_open_balances
+from services.client_directory import client_directory
+from ui.client_picker import ClientPicker
+from services.events import ENTITY_CLIENT, ENTITY_PAYMENT, ENTITY_SALE, OPERATION_DELETE, OPERATION_RELOAD
+from services.money import Money
 from services.report_pdf_service import (
     export_balances_pdf,
     export_client_statement_pdf,
     export_financial_position_pdf,
 )
+from ui.change_events import bind_changes
+from ui.task_runner import TaskRunner
+from ui.table_style import configure_table_style
 
 class ReportsView(ctk.CTkFrame):
 
     def __init__(self, master):
         super().__init__(master)
         self.pack(fill="both", expand=True)
+        self.task_runner = TaskRunner(self)
 
         ctk.CTkLabel(self, text="Central de Relatórios", font=("Arial", 24, "bold")).pack(pady=(20, 4))
         ctk.CTkLabel(self, text="Gere PDFs e acompanhe a prévia dos saldos em aberto", font=("Arial", 13)).pack(pady=(0, 12))
@@ -27,11 +35,12 @@ class ReportsView(ctk.CTkFrame):
 
         general_buttons = ctk.CTkFrame(general_actions, fg_color="transparent")
         general_buttons.pack(fill="x", padx=8, pady=(0, 8))
-        ctk.CTkButton(general_buttons, text="Posição Financeira (PDF)", command=self.generate_financial_position_pdf).pack(side="left", padx=(0, 8))
-        ctk.CTkButton(general_buttons, text="Saldos por Cliente (PDF)", command=self.generate_balances_pdf).pack(side="left")
+        self.financial_position_button = ctk.CTkButton(general_buttons, text="Posição Financeira (PDF)", command=self.generate_financial_position_pdf)
+        self.financial_position_button.pack(side="left", padx=(0, 8))
+        self.balances_button = ctk.CTkButton(general_buttons, text="Saldos por Cliente (PDF)", command=self.generate_balances_pdf)
+        self.balances_button.pack(side="left")
 
-        self.client_dict = {}
-        client_values = ["Selecione"]
+        self.balance_ids = []
 
         client_actions = ctk.CTkFrame(actions)
         client_actions.pack(fill="x", padx=10, pady=(0, 10))
@@ -42,21 +51,19 @@ class ReportsView(ctk.CTkFrame):
 
         ctk.CTkLabel(client_controls, text="Cliente:").pack(side="left", padx=(0, 6))
 
-        self.client_option = ctk.CTkOptionMenu(client_controls, values=client_values)
-        self.client_option.set("Selecione")
-        self.client_option.pack(side="left", padx=(0, 8))
+        self.client_picker = ClientPicker(client_controls)
+        self.client_picker.pack(side="left", padx=(0, 8))
         self.refresh_clients_options()
 
-        ctk.CTkButton(client_controls, text="Gerar Extrato (PDF)", command=self.generate_client_statement_pdf).pack(side="left")
+        self.statement_button = ctk.CTkButton(client_controls, text="Gerar Extrato (PDF)", command=self.generate_client_statement_pdf)
+        self.statement_button.pack(side="left")
 
         self.status_label = ctk.CTkLabel(self, text="", text_color="green")
         self.status_label.pack(pady=(0, 8))
 
         ctk.CTkLabel(self, text="Prévia de Saldos Devedores por Cliente", font=("Arial", 16, "bold")).pack(pady=(2, 6))
 
-        style = ttk.Style()
-        style.configure("Table.Treeview", rowheight=28, borderwidth=1, relief="solid")
-        style.configure("Table.Treeview.Heading", relief="solid")
+        configure_table_style()
 
         self.tree = ttk.Treeview(self, columns=("Cliente","Saldo"), show="headings", style="Table.Treeview")
         self.tree.heading("Cliente", text="Cliente", anchor="center")
@@ -69,73 +76,132 @@ class ReportsView(ctk.CTkFrame):
 
         self.load_data()
 
+        bind_changes(self, self.on_data_changed, (ENTITY_CLIENT, ENTITY_SALE, ENTITY_PAYMENT))
+
     def load_data(self):
+        self.task_runner.run(
+            get_open_balances,
+            on_success=self.show_balances,
+            on_error=lambda exc: self.show_error(f"Erro ao carregar saldos: {exc}"),
+            key="balances",
+        )
+
+    def show_balances(self, rows):
         for row in self.tree.get_children():
             self.tree.delete(row)
 
-        conn = get_connection()
-        cursor = conn.cursor()
-
-        cursor.execute("""
-            SELECT c.id,
-                   c.name,
-                   COALESCE(SUM(s.amount),0) - COALESCE((SELECT SUM(p.amount) FROM payments p WHERE p.client_id = c.id),0) as saldo
-            FROM clients c
-            LEFT JOIN sales s ON c.id = s.client_id
-            GROUP BY c.id
-        """)
-
-        rows = cursor.fetchall()
-        conn.close()
-
+        self.balance_ids = []
         visible_idx = 0
         for row in rows:
             if row["saldo"] > 0:
                 tag = "evenrow" if visible_idx % 2 == 0 else "oddrow"
-                client_label = f"{row['name']} (#{row['id']})"
-                self.tree.insert("", "end", values=(client_label, self.format_currency(row["saldo"])), tags=(tag,))
+                self.tree.insert("", "end", iid=str(row["id"]), values=self.balance_values(row), tags=(tag,))
+                self.balance_ids.append(row["id"])
                 visible_idx += 1
 
+    def balance_values(self, row):
+        client_label = f"{row['name']} (#{row['id']})"
+        return (client_label, self.format_currency(row["saldo"]))
+
+    def on_data_changed(self, event):
+        if event.operation == OPERATION_RELOAD:
+            if event.entity in (None, ENTITY_CLIENT):
+                self.refresh_clients_options()
+            self.load_data()
+            return
+
+        if event.entity == ENTITY_CLIENT:
+            self.refresh_clients_options()
+            if event.operation == OPERATION_DELETE:
+                self.task_runner.cancel(f"balance:{event.entity_id}")
+                self.update_balance_row(event.entity_id, None)
+
+        # Uma venda ou pagamento muda só a linha do próprio cliente. A chave por
+        # cliente descarta uma consulta anterior que terminasse depois da mais nova.
+        if event.client_id is not None and event.operation != OPERATION_DELETE:
+            self.task_runner.run(
+                get_client_open_balance,
+                event.client_id,
+                on_success=lambda row, client_id=event.client_id: self.update_balance_row(client_id, row),
+                on_error=lambda exc: self.show_error(f"Erro ao carregar saldos: {exc}"),
+                key=f"balance:{event.client_id}",
+            )
+
+    def update_balance_row(self, client_id, row):
+        item_id = str(client_id)
+        index = bisect_left(self.balance_ids, client_id)
+        exists = self.tree.exists(item_id)
+
+        if row is None or row["saldo"] <= 0:
+            if exists:
+                self.tree.delete(item_id)
+                del self.balance_ids[index]
+                self.restripe(index)
+            return
+
+        if exists:
+            self.tree.item(item_id, values=self.balance_values(row))
+            return
+
+        self.balance_ids.insert(index, client_id)
+        self.tree.insert("", index, iid=item_id, values=self.balance_values(row))
+        self.restripe(index)
+
+    def restripe(self, start_index):
+        for idx, item_id in enumerate(self.tree.get_children()[start_index:], start=start_index):
+            self.tree.item(item_id, tags=("evenrow" if idx % 2 == 0 else "oddrow",))
+
     def format_currency(self, value):
-        amount = float(value or 0)
-        return f"R$ {amount:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+        return Money.from_cents(value).format()
 
     def refresh_clients_options(self):
-        clients = get_all_clients()
-        self.client_dict = {f"{c['name']} (#{c['id']})": c["id"] for c in clients}
-
-        option_values = list(self.client_dict.keys()) if self.client_dict else ["Selecione"]
-        self.client_option.configure(values=option_values)
-        self.client_option.set("Selecione")
+        self.task_runner.run(
+            client_directory.ensure_loaded,
+            on_success=lambda _result: self.client_picker.refresh(),
+            on_error=lambda exc: self.show_error(f"Erro ao carregar clientes: {exc}"),
+            key="clients",
+        )
 
     def generate_financial_position_pdf(self):
-        try:
-            report_path = export_financial_position_pdf()
-            self.open_pdf(report_path)
-            self.show_success(f"PDF gerado e aberto: {report_path}")
-        except Exception as exc:
-            self.show_error(f"Erro ao gerar PDF: {exc}")
+        self.run_export(export_financial_position_pdf)
 
     def generate_balances_pdf(self):
-        try:
-            report_path = export_balances_pdf()
-            self.open_pdf(report_path)
-            self.show_success(f"PDF gerado e aberto: {report_path}")
-        except Exception as exc:
-            self.show_error(f"Erro ao gerar PDF: {exc}")
+        self.run_export(export_balances_pdf)
 
     def generate_client_statement_pdf(self):
-        selected_name = self.client_option.get()
-        if selected_name not in self.client_dict:
+        client_id = self.client_picker.get()
+        if client_id is None:
             self.show_error("Selecione um cliente para gerar o extrato.")
             return
 
+        self.run_export(export_client_statement_pdf, client_id, client_directory.label_for(client_id))
+
+    def run_export(self, export, *args):
+        if self.task_runner.is_busy("export"):
+            return
+
+        self.set_export_buttons_state("disabled")
+        self.status_label.configure(text="Gerando PDF...", text_color="#F59E0B")
+        self.task_runner.run(
+            export,
+            *args,
+            on_success=self.on_export_finished,
+            on_error=lambda exc: self.show_error(f"Erro ao gerar PDF: {exc}"),
+            on_done=lambda: self.set_export_buttons_state("normal"),
+            key="export",
+        )
+
+    def on_export_finished(self, report_path):
         try:
-            report_path = export_client_statement_pdf(self.client_dict[selected_name], selected_name)
             self.open_pdf(report_path)
-            self.show_success(f"PDF gerado e aberto: {report_path}")
         except Exception as exc:
-            self.show_error(f"Erro ao gerar PDF: {exc}")
+            self.show_error(f"PDF gerado em {report_path}, mas não foi possível abrir: {exc}")
+            return
+        self.show_success(f"PDF gerado e aberto: {report_path}")
+
+    def set_export_buttons_state(self, state):
+        for button in (self.financial_position_button, self.balances_button, self.statement_button):
+            button.configure(state=state)
 
     def open_pdf(self, report_path):
         os.startfile(report_path)
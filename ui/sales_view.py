@@ -1,15 +1,37 @@
 import customtkinter as ctk
-from tkinter import ttk
 import re
 from datetime import datetime
-from services.sale_service import create_sale, get_all_sales
-from services.client_service import get_all_clients
+from services.sale_service import create_sale, get_sale, get_sales_page, get_sales_summary
+from services.client_directory import client_directory
+from ui.client_picker import ClientPicker
+from services.client_service import get_client
+from services.events import ENTITY_CLIENT, ENTITY_SALE, OPERATION_DELETE, OPERATION_INSERT, OPERATION_RELOAD, OPERATION_UPDATE
+from services.money import Money
+from services.import_service import import_sales_csv
+from services.search_service import search_sales
+from ui.change_events import bind_changes
+from ui.csv_import import start_csv_import
+from ui.task_runner import TaskRunner
+from ui.virtual_table import VirtualTable
+from ui.table_style import configure_table_style
+
+PAGE_SIZE = 200
+SEARCH_DEBOUNCE_MS = 200
+SEARCH_RESULTS_LIMIT = 200
+
+
+def fetch_sales_page(before_id):
+    # O resumo só é calculado na primeira página; depois a tela o mantém pelos eventos.
+    summary = get_sales_summary() if before_id is None else None
+    return get_sales_page(before_id=before_id, limit=PAGE_SIZE), summary
+
 
 class SalesView(ctk.CTkFrame):
 
     def __init__(self, master):
         super().__init__(master)
         self.pack(fill="both", expand=True)
+        self.task_runner = TaskRunner(self)
 
         ctk.CTkLabel(self, text="Registrar Venda", font=("Arial",22,"bold")).pack(pady=20)
 
@@ -17,12 +39,9 @@ class SalesView(ctk.CTkFrame):
         form.pack(fill="x", padx=20, pady=10)
         form.grid_columnconfigure(1, weight=1)
 
-        self.client_dict = {}
-        self.client_label_by_id = {}
-        self.client_option = ctk.CTkOptionMenu(form, values=["Selecione"])
-        self.client_option.set("Selecione")
-        self.client_option.grid(row=0, column=0, padx=5, pady=5, sticky="ew")
-        self.refresh_clients_options()
+        self.client_picker = ClientPicker(form)
+        self.client_picker.grid(row=0, column=0, padx=5, pady=5, sticky="ew")
+        self.load_client_options()
 
         self.description_entry = ctk.CTkEntry(form, placeholder_text="Descricao do que foi vendido")
         self.description_entry.grid(row=0, column=1, padx=5, pady=5, sticky="ew")
@@ -31,39 +50,46 @@ class SalesView(ctk.CTkFrame):
         self.amount_entry.grid(row=0, column=2, padx=5, pady=5, sticky="ew")
 
         ctk.CTkButton(form, text="Salvar", command=self.save_sale).grid(row=0, column=3, padx=5, pady=5)
+        ctk.CTkButton(form, text="Importar CSV", command=self.import_csv).grid(row=0, column=4, padx=5, pady=5)
 
         self.validation_label = ctk.CTkLabel(self, text="", text_color="red")
         self.validation_label.pack(pady=(2, 8))
 
-        style = ttk.Style()
-        style.configure("Table.Treeview", rowheight=28, borderwidth=1, relief="solid")
-        style.configure("Table.Treeview.Heading", relief="solid")
+        self.search_job = None
+        self.search_entry = ctk.CTkEntry(self, placeholder_text="Buscar venda pela descrição")
+        self.search_entry.pack(fill="x", padx=20)
+        self.search_entry.bind("<KeyRelease>", self.on_search_changed)
+
+        configure_table_style()
 
-        self.tree = ttk.Treeview(
+        self.table = VirtualTable(
             self,
             columns=("ID", "Cliente", "Descricao", "Valor", "Data"),
-            show="headings",
-            style="Table.Treeview",
+            format_row=self.sale_values,
+            row_id=lambda sale: sale["id"],
+            fetch_more=self.load_more_sales,
         )
-        for col in ("ID", "Cliente", "Descricao", "Valor", "Data"):
-            self.tree.heading(col, text=col, anchor="center")
-            self.tree.column(col, anchor="center")
-        self.tree.column("ID", width=70, stretch=False)
-        self.tree.column("Cliente", width=220)
-        self.tree.column("Descricao", width=320)
-        self.tree.column("Valor", width=120, stretch=False)
-        self.tree.column("Data", width=120, stretch=False)
-        self.tree.tag_configure("evenrow", background="#FFFFFF")
-        self.tree.tag_configure("oddrow", background="#F3F4F6")
-        self.tree.pack(fill="both", expand=True, padx=20, pady=20)
-
+        self.table.tree.column("ID", width=70, stretch=False)
+        self.table.tree.column("Cliente", width=220)
+        self.table.tree.column("Descricao", width=320)
+        self.table.tree.column("Valor", width=120, stretch=False)
+        self.table.tree.column("Data", width=120, stretch=False)
+        self.table.pack(fill="both", expand=True, padx=20, pady=(20, 8))
+
+        footer = ctk.CTkFrame(self, fg_color="transparent")
+        footer.pack(fill="x", padx=20, pady=(0, 16))
+        self.summary_label = ctk.CTkLabel(footer, text="")
+        self.summary_label.pack(side="left")
+
+        self.next_before_id = None
+        self.summary = None
         self.load_sales()
 
-    def save_sale(self):
-        self.refresh_clients_options(keep_selection=True)
+        bind_changes(self, self.on_data_changed, (ENTITY_SALE, ENTITY_CLIENT))
 
-        client_name = self.client_option.get()
-        if client_name not in self.client_dict:
+    def save_sale(self):
+        client_id = self.client_picker.get()
+        if client_id is None:
             self.show_error("Erro: selecione um cliente.")
             return
 
@@ -81,67 +107,154 @@ class SalesView(ctk.CTkFrame):
             self.show_error("Erro: valor inválido. Use até 2 casas decimais.")
             return
 
-        amount = float(raw_amount.replace(",", "."))
+        amount = Money.from_input(raw_amount)
         self.clear_feedback()
-        create_sale(self.client_dict[client_name], description, amount)
+        create_sale(client_id, description, amount)
         self.description_entry.delete(0,"end")
         self.amount_entry.delete(0,"end")
-        self.load_sales()
         self.show_success("Venda salva com sucesso.")
 
-    def refresh_clients_options(self, keep_selection=False):
-        current_selection = self.client_option.get() if keep_selection else "Selecione"
-
-        clients = get_all_clients()
-        self.client_dict = {}
-        self.client_label_by_id = {}
+    def import_csv(self):
+        start_csv_import(self, import_sales_csv, self.show_status)
 
-        for client in clients:
-            client_id = client["id"]
-            display_label = f"{client['name']} (#{client_id})"
-            self.client_dict[display_label] = client_id
-            self.client_label_by_id[client_id] = display_label
+    def on_data_changed(self, event):
+        if event.entity in (None, ENTITY_CLIENT):
+            self.on_client_changed(event)
+        if event.entity not in (None, ENTITY_SALE):
+            return
 
-        option_values = list(self.client_dict.keys()) if self.client_dict else ["Selecione"]
+        if event.operation == OPERATION_RELOAD:
+            self.load_sales()
+        elif event.operation == OPERATION_INSERT:
+            self.task_runner.run(get_sale, event.entity_id, on_success=self.prepend_sale, on_error=self.show_load_error)
 
-        self.client_option.configure(values=option_values)
+    def prepend_sale(self, sale):
+        # Na busca a lista mostra só os resultados; a venda nova aparece ao limpar o filtro.
+        if sale is None or self.summary is None or self.search_entry.get().strip():
+            return
 
-        selected_client_id = None
-        if keep_selection and current_selection in self.client_dict:
-            selected_client_id = self.client_dict[current_selection]
-        elif keep_selection:
-            match = re.search(r"\(#(\d+)\)$", current_selection)
-            if match:
-                selected_client_id = int(match.group(1))
+        if self.table.contains(sale["id"]):
+            return
+        self.table.insert_row(0, sale)
+
+        self.summary["total_count"] += 1
+        self.summary["total_amount"] += sale["amount"] or 0
+        self.show_summary()
+
+    def load_client_options(self):
+        # Só a primeira carga do diretório consulta o banco; depois ele é mantido pelos eventos.
+        self.task_runner.run(
+            client_directory.ensure_loaded,
+            on_success=lambda _result: self.client_picker.refresh(),
+            on_error=self.show_load_error,
+            key="clients",
+        )
 
-        restored_selection = "Selecione"
-        if selected_client_id is not None:
-            restored_selection = self.client_label_by_id.get(selected_client_id, "Selecione")
+    def on_client_changed(self, event):
+        self.load_client_options()
+        # A tela fica viva entre as visitas: as linhas já exibidas precisam
+        # acompanhar a edição do nome do cliente.
+        if event.operation not in (OPERATION_UPDATE, OPERATION_DELETE):
+            return
+        client_id = event.entity_id
+        if not any(sale["client_id"] == client_id for sale in self.table.rows):
+            return
+        self.task_runner.run(
+            get_client,
+            client_id,
+            on_success=lambda client: self.rename_client_rows(client_id, client),
+            on_error=self.show_load_error,
+            key=f"client:{client_id}",
+        )
 
-        self.client_option.set(restored_selection)
+    def rename_client_rows(self, client_id, client):
+        if client is None:
+            self.load_sales()
+            return
+        self.table.replace_rows(
+            lambda sale: sale["client_id"] == client_id,
+            lambda sale: {**dict(sale), "client_name": client["name"]},
+        )
 
     def load_sales(self):
-        for row in self.tree.get_children():
-            self.tree.delete(row)
-
-        for idx, sale in enumerate(get_all_sales()):
-            tag = "evenrow" if idx % 2 == 0 else "oddrow"
-            self.tree.insert(
-                "",
-                "end",
-                values=(
-                    sale["id"],
-                    sale["client_name"],
-                    sale["description"],
-                    self.format_currency(sale["amount"]),
-                    self.format_date(sale["date"]),
-                ),
-                tags=(tag,)
+        # Descarta a página ou busca em andamento antes de recomeçar a lista.
+        self.task_runner.cancel("sales")
+        self.table.set_rows([])
+        self.next_before_id = None
+        self.summary = None
+
+        search_text = self.search_entry.get().strip()
+        if not search_text:
+            self.load_more_sales()
+            return
+
+        self.show_loading("Buscando vendas...")
+        self.task_runner.run(
+            search_sales,
+            search_text,
+            SEARCH_RESULTS_LIMIT,
+            on_success=lambda sales: self.show_search_results(search_text, sales),
+            on_error=self.show_load_error,
+            key="sales",
+        )
+
+    def show_search_results(self, search_text, sales):
+        self.table.set_rows(sales)
+        self.summary_label.configure(text=f"{len(sales)} venda(s) encontrada(s) para \"{search_text}\"")
+
+    def on_search_changed(self, _event=None):
+        if self.search_job is not None:
+            self.after_cancel(self.search_job)
+        self.search_job = self.after(SEARCH_DEBOUNCE_MS, self.run_search)
+
+    def run_search(self):
+        self.search_job = None
+        self.load_sales()
+
+    def load_more_sales(self):
+        # Chamado pela tabela ao rolar perto do fim; ignora enquanto uma página está a caminho.
+        if self.task_runner.is_busy("sales"):
+            return
+
+        self.show_loading("Carregando vendas...")
+        self.task_runner.run(
+            fetch_sales_page,
+            self.next_before_id,
+            on_success=self.show_sales_page,
+            on_error=self.show_load_error,
+            key="sales",
+        )
+
+    def show_sales_page(self, result):
+        sales, summary = result
+        if sales:
+            self.next_before_id = sales[-1]["id"]
+
+        if summary is not None:
+            self.summary = dict(summary)
+        has_more = len(sales) == PAGE_SIZE and self.table.row_count() + len(sales) < self.summary["total_count"]
+        self.table.append_rows(sales, has_more=has_more)
+        self.show_summary()
+
+    def show_summary(self):
+        self.summary_label.configure(
+            text=(
+                f"Exibindo {self.table.row_count()} de {self.summary['total_count']} vendas"
+                f" | Total vendido: {self.format_currency(self.summary['total_amount'])}"
             )
+        )
+
+    def sale_values(self, sale):
+        return (
+            sale["id"],
+            sale["client_name"],
+            sale["description"],
+            self.format_currency(sale["amount"]),
+            self.format_date(sale["date"]),
+        )
 
     def format_currency(self, value):
-        amount = float(value or 0)
-        return f"R$ {amount:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+        return Money.from_cents(value).format()
 
     def format_date(self, value):
         raw_value = str(value or "").strip()
@@ -155,11 +268,21 @@ class SalesView(ctk.CTkFrame):
         except ValueError:
             return raw_value
 
+    def show_loading(self, message):
+        self.summary_label.configure(text=message)
+
+    def show_load_error(self, exc):
+        self.summary_label.configure(text="")
+        self.show_error(f"Erro ao carregar dados: {exc}")
+
     def show_error(self, message):
         self.validation_label.configure(text=message, text_color="red")
 
     def show_success(self, message):
         self.validation_label.configure(text=message, text_color="green")
 
+    def show_status(self, message, color):
+        self.validation_label.configure(text=message, text_color=color)
+
     def clear_feedback(self):
         self.validation_label.configure(text="", text_color="red")
@@ -0,0 +1,109 @@
+from datetime import datetime
+from time import perf_counter
+
+from app_paths import get_app_data_path
+from app_profiling import span
+from ui.task_runner import TaskRunner
+
+STARTUP_LOG_FILE = "startup.log"
+
+
+class StartupStep:
+
+    def __init__(self, name, func, required=True, after=()):
+        self.name = name
+        self.func = func
+        # Só os passos obrigatórios seguram a splash; os demais terminam em segundo plano.
+        self.required = required
+        self.after = tuple(after)
+
+
+class StartupOrchestrator:
+
+    def __init__(self, widget, steps, on_ready, min_display_ms=0):
+        self.widget = widget
+        self.steps = list(steps)
+        self.on_ready = on_ready
+        self.min_display_ms = max(int(min_display_ms), 0)
+        self.task_runner = TaskRunner(widget)
+        self.started = None
+        self.ready = False
+        self.running = set()
+        self.finished = set()
+        self.timings = {}
+        self.errors = {}
+
+    def start(self):
+        self.started = perf_counter()
+        self._launch_ready_steps()
+        self._check_ready()
+
+    def elapsed_ms(self):
+        return (perf_counter() - self.started) * 1000
+
+    def _launch_ready_steps(self):
+        for step in self.steps:
+            if step.name in self.running or step.name in self.finished:
+                continue
+            if not all(name in self.finished for name in step.after):
+                continue
+            # Um passo cuja dependência falhou não roda: ele falha junto.
+            failed = [name for name in step.after if name in self.errors]
+            if failed:
+                self._finish(step, 0.0, RuntimeError(f"dependência falhou: {', '.join(failed)}"))
+                continue
+
+            self.running.add(step.name)
+            self.task_runner.run(
+                _run_step,
+                step,
+                on_success=lambda outcome, step=step: self._finish(step, *outcome),
+            )
+
+    def _finish(self, step, elapsed_ms, error):
+        self.running.discard(step.name)
+        self.finished.add(step.name)
+        self.timings[step.name] = elapsed_ms
+        if error is not None:
+            self.errors[step.name] = error
+        self._launch_ready_steps()
+        self._check_ready()
+
+        if len(self.finished) == len(self.steps):
+            write_startup_log(self.timings, self.errors, self.elapsed_ms())
+
+    def _check_ready(self):
+        if self.ready:
+            return
+        if any(step.required and step.name not in self.finished for step in self.steps):
+            return
+
+        self.ready = True
+        self.timings["ready"] = self.elapsed_ms()
+        # A splash fica ao menos min_display_ms na tela, para não piscar em aberturas rápidas.
+        remaining_ms = int(self.min_display_ms - self.timings["ready"])
+        if remaining_ms > 0:
+            self.widget.after(remaining_ms, self.on_ready, self)
+        else:
+            self.on_ready(self)
+
+
+def _run_step(step):
+    started = perf_counter()
+    try:
+        with span(f"startup.{step.name}", "startup"):
+            step.func()
+    except Exception as exc:
+        return (perf_counter() - started) * 1000, exc
+    return (perf_counter() - started) * 1000, None
+
+
+def write_startup_log(timings, errors, total_ms):
+    parts = [f"{name}={elapsed_ms:.0f}ms" for name, elapsed_ms in timings.items()]
+    parts.extend(f"{name}_erro={type(exc).__name__}: {exc}" for name, exc in errors.items())
+    try:
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        with open(get_app_data_path(STARTUP_LOG_FILE), "a", encoding="utf-8") as f:
+            f.write(f"[{timestamp}] {' '.join(parts)} total={total_ms:.0f}ms\n")
+    except Exception:
+        pass
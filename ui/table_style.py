@@ -0,0 +1,17 @@
+from tkinter import ttk
+
+TABLE_STYLE = "Table.Treeview"
+
+_configured = False
+
+
+def configure_table_style():
+    # O estilo ttk é global: basta configurá-lo uma vez por execução.
+    global _configured
+
+    if _configured:
+        return
+    style = ttk.Style()
+    style.configure(TABLE_STYLE, rowheight=28, borderwidth=1, relief="solid")
+    style.configure(f"{TABLE_STYLE}.Heading", relief="solid")
+    _configured = True
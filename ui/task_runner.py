@@ -0,0 +1,117 @@
+import threading
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+from tkinter import TclError
+
+from app_profiling import span
+
+POLL_INTERVAL_MS = 50
+MAX_WORKERS = 4
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="caderneta-task")
+        return _executor
+
+
+def shutdown_executor():
+    global _executor
+
+    with _executor_lock:
+        executor = _executor
+        _executor = None
+
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+class Task:
+
+    def __init__(self, future):
+        self.future = future
+        self.cancelled = False
+
+    def cancel(self):
+        # Não há como interromper uma thread em execução: a chamada termina em
+        # segundo plano e o resultado é descartado.
+        self.cancelled = True
+        self.future.cancel()
+
+    def is_active(self):
+        return not self.cancelled and not self.future.done()
+
+
+class TaskRunner:
+
+    def __init__(self, widget):
+        self.widget = widget
+        self.tasks = set()
+        self.keyed_tasks = {}
+
+    def run(self, func, *args, on_success=None, on_error=None, on_done=None, key=None):
+        if key is not None:
+            self.cancel(key)
+
+        task = Task(get_executor().submit(func, *args))
+        self.tasks.add(task)
+        if key is not None:
+            self.keyed_tasks[key] = task
+
+        def poll():
+            if task.cancelled:
+                self._forget(task, key)
+                return
+
+            try:
+                if not self.widget.winfo_exists():
+                    task.cancel()
+                    return
+            except TclError:
+                task.cancel()
+                return
+
+            if not task.future.done():
+                self.widget.after(POLL_INTERVAL_MS, poll)
+                return
+
+            self._forget(task, key)
+            try:
+                result = task.future.result()
+            except CancelledError:
+                return
+            except Exception as exc:
+                if on_error is not None:
+                    on_error(exc)
+            else:
+                if on_success is not None:
+                    with span(f"ui.{getattr(on_success, '__qualname__', 'on_success')}", "ui"):
+                        on_success(result)
+            finally:
+                if on_done is not None:
+                    on_done()
+
+        self.widget.after(POLL_INTERVAL_MS, poll)
+        return task
+
+    def cancel(self, key):
+        task = self.keyed_tasks.pop(key, None)
+        if task is not None:
+            task.cancel()
+            self.tasks.discard(task)
+
+    def is_busy(self, key=None):
+        if key is not None:
+            task = self.keyed_tasks.get(key)
+            return task is not None and task.is_active()
+        return any(task.is_active() for task in self.tasks)
+
+    def _forget(self, task, key):
+        self.tasks.discard(task)
+        if key is not None and self.keyed_tasks.get(key) is task:
+            del self.keyed_tasks[key]
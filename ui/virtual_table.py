@@ -0,0 +1,214 @@
+from tkinter import ttk
+
+import customtkinter as ctk
+
+from ui.table_style import TABLE_STYLE, configure_table_style
+
+# Linhas além do fim da janela visível que disparam a busca da próxima página.
+PREFETCH_ROWS = 60
+DEFAULT_ROW_HEIGHT = 28
+HEADING_HEIGHT = 28
+WHEEL_ROWS = 3
+
+
+class VirtualTable(ctk.CTkFrame):
+    # A Treeview guarda só os itens da área visível; rolar reaproveita esses itens
+    # com os valores de outra faixa de `rows`.
+
+    def __init__(self, master, columns, format_row, row_id, on_select=None, fetch_more=None, style=TABLE_STYLE):
+        super().__init__(master, fg_color="transparent")
+        self.format_row = format_row
+        self.row_id = row_id
+        self.on_select = on_select
+        self.fetch_more = fetch_more
+        self.rows = []
+        self.has_more = False
+        self.top = 0
+        self.visible_rows = 1
+        self.selected_id = None
+        configure_table_style()
+        self.row_height = int(ttk.Style().lookup(style, "rowheight") or DEFAULT_ROW_HEIGHT)
+
+        self.tree = ttk.Treeview(self, columns=columns, show="headings", style=style, selectmode="browse")
+        for col in columns:
+            self.tree.heading(col, text=col, anchor="center")
+            self.tree.column(col, anchor="center")
+        self.tree.tag_configure("evenrow", background="#FFFFFF")
+        self.tree.tag_configure("oddrow", background="#F3F4F6")
+
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+        self.tree.pack(side="left", fill="both", expand=True)
+
+        self.tree.bind("<Configure>", self.on_resize)
+        self.tree.bind("<<TreeviewSelect>>", self.on_tree_select)
+        self.tree.bind("<MouseWheel>", self.on_mouse_wheel)
+        self.tree.bind("<Button-4>", lambda _event: self.scroll_by(-WHEEL_ROWS))
+        self.tree.bind("<Button-5>", lambda _event: self.scroll_by(WHEEL_ROWS))
+        self.tree.bind("<Up>", lambda _event: self.move_selection(-1))
+        self.tree.bind("<Down>", lambda _event: self.move_selection(1))
+        self.tree.bind("<Prior>", lambda _event: self.move_selection(-self.visible_rows))
+        self.tree.bind("<Next>", lambda _event: self.move_selection(self.visible_rows))
+        self.tree.bind("<Home>", lambda _event: self.move_selection(-len(self.rows)))
+        self.tree.bind("<End>", lambda _event: self.move_selection(len(self.rows)))
+
+    def row_count(self):
+        return len(self.rows)
+
+    def set_rows(self, rows, has_more=False):
+        self.rows = list(rows)
+        self.has_more = has_more
+        self.top = 0
+        self.render()
+
+    def append_rows(self, rows, has_more=False):
+        self.rows.extend(rows)
+        self.has_more = has_more
+        self.render()
+
+    def insert_row(self, index, row):
+        self.rows.insert(index, row)
+        # Mantém na tela as mesmas linhas quando a inserção acontece acima delas.
+        if index < self.top:
+            self.top += 1
+        self.render()
+
+    def remove_row(self, index):
+        row = self.rows.pop(index)
+        if index < self.top:
+            self.top -= 1
+        if self.row_id(row) == self.selected_id:
+            self.selected_id = None
+        self.render()
+        return row
+
+    def replace_rows(self, predicate, transform):
+        changed = False
+        for index, row in enumerate(self.rows):
+            if predicate(row):
+                self.rows[index] = transform(row)
+                changed = True
+        if changed:
+            self.render()
+        return changed
+
+    def index_of(self, row_id):
+        for index, row in enumerate(self.rows):
+            if self.row_id(row) == row_id:
+                return index
+        return None
+
+    def contains(self, row_id):
+        return self.index_of(row_id) is not None
+
+    def clear_selection(self):
+        self.selected_id = None
+        selection = self.tree.selection()
+        if selection:
+            self.tree.selection_remove(selection)
+
+    def render(self):
+        self.top = max(0, min(self.top, len(self.rows) - self.visible_rows))
+        window = self.rows[self.top:self.top + self.visible_rows]
+
+        slots = self.tree.get_children()
+        for slot in slots[len(window):]:
+            self.tree.delete(slot)
+
+        selected_slot = None
+        for offset, row in enumerate(window):
+            index = self.top + offset
+            slot = f"slot{offset}"
+            values = self.format_row(row)
+            tags = ("evenrow" if index % 2 == 0 else "oddrow",)
+            if offset < len(slots):
+                self.tree.item(slot, values=values, tags=tags)
+            else:
+                self.tree.insert("", "end", iid=slot, values=values, tags=tags)
+            if self.selected_id is not None and self.row_id(row) == self.selected_id:
+                selected_slot = slot
+
+        if selected_slot is not None:
+            self.tree.selection_set(selected_slot)
+        elif self.tree.selection():
+            self.tree.selection_remove(self.tree.selection())
+
+        self.update_scrollbar()
+        if self.has_more and self.fetch_more is not None and self.top + self.visible_rows + PREFETCH_ROWS >= len(self.rows):
+            self.fetch_more()
+
+    def update_scrollbar(self):
+        if not self.rows:
+            self.scrollbar.set(0, 1)
+            return
+        total = len(self.rows)
+        self.scrollbar.set(self.top / total, min(self.top + self.visible_rows, total) / total)
+
+    def scroll_to(self, top):
+        top = max(0, min(int(top), len(self.rows) - self.visible_rows))
+        if top != self.top:
+            self.top = top
+            self.render()
+
+    def scroll_by(self, rows):
+        self.scroll_to(self.top + rows)
+        return "break"
+
+    def on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            self.scroll_to(float(amount) * len(self.rows))
+        elif unit == "pages":
+            self.scroll_by(int(amount) * self.visible_rows)
+        else:
+            self.scroll_by(int(amount))
+
+    def on_mouse_wheel(self, event):
+        # No Windows cada passo da roda vale 120; no macOS o delta já vem em passos.
+        steps = event.delta // 120 if abs(event.delta) >= 120 else event.delta
+        return self.scroll_by(-steps * WHEEL_ROWS)
+
+    def on_resize(self, event):
+        visible_rows = max(1, (event.height - HEADING_HEIGHT) // self.row_height)
+        if visible_rows != self.visible_rows:
+            self.visible_rows = visible_rows
+            self.render()
+
+    def move_selection(self, step):
+        if not self.rows:
+            return "break"
+
+        current = self.index_of(self.selected_id) if self.selected_id is not None else None
+        if current is None:
+            current = self.top - 1 if step > 0 else self.top + self.visible_rows
+        index = max(0, min(current + step, len(self.rows) - 1))
+
+        if index < self.top:
+            self.top = index
+        elif index >= self.top + self.visible_rows:
+            self.top = index - self.visible_rows + 1
+        self.select_index(index)
+        self.tree.focus(self.tree.selection()[0] if self.tree.selection() else "")
+        return "break"
+
+    def select_index(self, index):
+        row = self.rows[index]
+        self.selected_id = self.row_id(row)
+        self.render()
+        if self.on_select is not None:
+            self.on_select(row)
+
+    def on_tree_select(self, _event=None):
+        selection = self.tree.selection()
+        if not selection:
+            return
+
+        index = self.top + self.tree.index(selection[0])
+        if index >= len(self.rows):
+            return
+        row = self.rows[index]
+        # A seleção refeita pelo render volta como evento; só reage a cliques em outra linha.
+        if self.row_id(row) == self.selected_id:
+            return
+        self.selected_id = self.row_id(row)
+        if self.on_select is not None:
+            self.on_select(row)